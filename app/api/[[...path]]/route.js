@@ -1,31 +1,52 @@
-import { MongoClient } from 'mongodb';
-import Razorpay from 'razorpay';
+import { ObjectId } from 'mongodb';
 import jwt from 'jsonwebtoken';
 import { NextResponse } from 'next/server';
-import crypto from 'crypto';
 import { v4 as uuidv4 } from 'uuid';
+import { createCatalogCache, indexBy } from '@/lib/catalog';
+import { createTurfRepository } from '@/lib/turfs';
+import { compileSlotTemplate, customSlotsError, slotPrice, slotTemplateOf, stampSlots } from '@/lib/slots';
+import { clearPending, getAvailability, isBooked, markConfirmed, markPending, slotHour } from '@/lib/availability';
+import { createSlotFeed } from '@/lib/feed';
+import { ensureReservationIndexes, holdExpiry, releaseBookings, reserveSlots, startHoldReaper } from '@/lib/reservations';
+import { createPaymentGateway, PaymentGatewayError } from '@/lib/payments';
+import { createAuth } from '@/lib/auth';
+import { createRouter } from '@/lib/router';
+import { createDatabase } from '@/lib/db';
+import { metrics } from '@/lib/metrics';
+import { cachedJson, etagOf, hashOf } from '@/lib/responses';
+import { logTiming, measureSync, serverTimingHeader, timeRequest } from '@/lib/timing';
 
 const MONGO_URL = process.env.MONGO_URL;
 const DB_NAME = process.env.DB_NAME || 'turfhub';
 const JWT_SECRET = process.env.JWT_SECRET || 'turfhub_secret_key_2025';
+const CATALOG_TTL_MS = parseInt(process.env.CATALOG_TTL_SECONDS || '60', 10) * 1000;
+const TURF_MISS_TTL_MS = parseInt(process.env.TURF_MISS_TTL_SECONDS || '10', 10) * 1000;
+const MAX_SLOT_RANGE_DAYS = 14;
+const METRICS_TOKEN = process.env.METRICS_TOKEN;
 
-let cachedDb = null;
+const startedAt = Date.now();
 
-async function connectToDatabase() {
-  if (cachedDb) {
-    return cachedDb;
+// Single-flight client with a tuned pool; see lib/db.js
+const database = createDatabase({
+  url: MONGO_URL,
+  dbName: DB_NAME,
+  onConnect: async db => {
+    await ensureReservationIndexes(db);
+    startHoldReaper(db);
   }
-  const client = await MongoClient.connect(MONGO_URL);
-  const db = client.db(DB_NAME);
-  cachedDb = db;
-  return db;
+});
+
+function connectToDatabase() {
+  return database.get();
 }
 
-// Initialize Razorpay
-const razorpay = new Razorpay({
-  key_id: process.env.RAZORPAY_KEY_ID,
-  key_secret: process.env.RAZORPAY_KEY_SECRET,
-});
+// NextResponse.json, with serialization recorded as the request's `format` span
+function json(body, init) {
+  return measureSync('format', () => NextResponse.json(body, init));
+}
+
+// Razorpay, or the in-process fake when PAYMENT_GATEWAY=fake
+const paymentGateway = createPaymentGateway();
 
 // Mock turf data
 const mockTurfs = [
@@ -121,961 +142,1436 @@ const mockTurfs = [
   }
 ];
 
-// Generate time slots
-function generateSlots(date, currentTime = null) {
-  const slots = [];
-  const startHour = 6; // 6 AM
-  const endHour = 23; // 11 PM
-  
-  for (let hour = startHour; hour < endHour; hour++) {
-    const slotTime = `${hour.toString().padStart(2, '0')}:00`;
-    const endSlotTime = `${(hour + 1).toString().padStart(2, '0')}:00`;
-    
-    // If it's today, filter out past slots
-    if (currentTime) {
-      const slotDate = new Date(date);
-      slotDate.setHours(hour, 0, 0, 0);
-      
-      if (slotDate <= currentTime) {
-        continue;
-      }
+// Mock turfs keyed by id for constant-time fallback lookups
+const mockTurfsById = new Map(mockTurfs.map(turf => [turf.id, turf]));
+
+// Turf list cards carry only what the home page grid renders; the details
+// dialog loads the full turf from /api/turfs/:id
+const CARD_AMENITIES = 3;
+
+// Card fields projected by the database, so images, descriptions and
+// customSlots never leave MongoDB for the list
+const TURF_CARD_PROJECTION = {
+  _id: 0,
+  turfId: 1,
+  name: 1,
+  city: 1,
+  location: 1,
+  rating: 1,
+  sportTypes: 1,
+  pricePerHour: { $ifNull: ['$pricing.basePrice', 0] },
+  image: { $arrayElemAt: ['$images', 0] },
+  amenities: { $slice: [{ $ifNull: ['$amenities', []] }, CARD_AMENITIES] },
+  vendorActive: { $in: [true, '$vendor.isActive'] }
+};
+
+function turfCard(turf) {
+  return {
+    id: turf.turfId || turf.id,
+    name: turf.name,
+    city: turf.city,
+    location: turf.location,
+    pricePerHour: turf.pricePerHour || 0,
+    rating: turf.rating || 4.5,
+    image: turf.image ?? turf.images?.[0] ?? null,
+    amenities: (turf.amenities || []).slice(0, CARD_AMENITIES),
+    sportTypes: turf.sportTypes || []
+  };
+}
+
+// Build the customer catalogue in one aggregation over approved turfs, with
+// each turf's vendor joined in to flag whether it is active. Cities and
+// sports come from every approved turf, the turf list only from active vendors.
+async function loadCatalog() {
+  const db = await connectToDatabase();
+  const approvedTurfs = await db.collection('turfs').aggregate([
+    { $match: { status: 'approved' } },
+    { $lookup: { from: 'vendors', localField: 'vendorId', foreignField: 'vendorId', as: 'vendor' } },
+    { $project: TURF_CARD_PROJECTION }
+  ]).toArray();
+  
+  // Merge with mock turfs for backward compatibility
+  const turfs = [
+    ...approvedTurfs.filter(t => t.vendorActive).map(turfCard),
+    ...mockTurfs.map(turfCard)
+  ];
+  
+  const sports = new Set(['All']);
+  approvedTurfs.forEach(turf => {
+    if (turf.sportTypes && Array.isArray(turf.sportTypes)) {
+      turf.sportTypes.forEach(sport => sports.add(sport));
     }
-    
-    slots.push({
-      id: `slot-${date}-${hour}`,
-      time: slotTime,
-      endTime: endSlotTime,
-      available: true
-    });
-  }
+  });
   
-  return slots;
+  const cities = ['All', ...new Set([...approvedTurfs.map(t => t.city), ...mockTurfs.map(t => t.city)])];
+  return {
+    // Same content, same version, on every server instance; ETags derive from it
+    version: hashOf(JSON.stringify([turfs, cities, [...sports]])),
+    turfs,
+    byCity: indexBy(turfs, turf => [turf.city]),
+    bySport: indexBy(turfs, turf => turf.sportTypes),
+    views: new Map(),   // filtered and sorted lists, built on first request
+    cities,
+    sports: Array.from(sports)
+  };
+}
+
+// Invalidated on admin approvals, vendor activation and vendor turf writes
+const catalogCache = createCatalogCache({ load: loadCatalog, ttlMs: CATALOG_TTL_MS });
+
+// Slots for one day from the turf's compiled template, with booked hours
+// marked from its availability bitmap
+function slotsForDate(turf, date, availability, currentTime = null) {
+  return stampSlots(slotTemplateOf(turf), date, hour => isBooked(availability, hour), currentTime);
+}
+
+// Vendors and admins see a turf as it was written; the compiled template is internal
+const WITHOUT_TEMPLATE = { projection: { slotTemplate: 0 } };
+
+function withoutTemplate({ slotTemplate, ...turf }) {
+  return turf;
+}
+
+// What the detail dialog and the slot engine read of an approved turf
+const TURF_RECORD_PROJECTION = {
+  projection: {
+    _id: 0, turfId: 1, name: 1, city: 1, location: 1, area: 1, pricing: 1, images: 1, amenities: 1,
+    rating: 1, surface: 1, description: 1, capacity: 1,
+    operatingHours: 1, customSlots: 1, slotTemplate: 1, createdAt: 1, updatedAt: 1
+  }
+};
+
+// Database turf as the customer detail view shows it
+function turfDetail(turf) {
+  return {
+    id: turf.turfId,
+    name: turf.name,
+    city: turf.city,
+    location: turf.location,
+    area: turf.area || turf.location,
+    pricePerHour: turf.pricing?.basePrice || 0,
+    images: turf.images || [],
+    amenities: turf.amenities || [],
+    rating: turf.rating || 4.5,
+    surface: turf.surface || 'Artificial Grass',
+    description: turf.description || '',
+    capacity: turf.capacity || 0
+  };
+}
+
+// { detail, schedule, version } per turf id: mock turfs pinned, approved
+// database turfs loaded on first request. Invalidated by the turf writes that
+// change either. `version` hashes the detail once per load, for its ETag.
+function turfRecord(detail, schedule) {
+  return { detail, schedule, version: hashOf(JSON.stringify(detail)) };
+}
+
+const turfRepository = createTurfRepository({
+  seed: mockTurfs.map(turf => [turf.id, turfRecord(turf, turf)]),
+  load: async turfId => {
+    const db = await connectToDatabase();
+    const turf = await db.collection('turfs').findOne({ turfId, status: 'approved' }, TURF_RECORD_PROJECTION);
+    return turf && turfRecord(turfDetail(turf), turf);
+  },
+  ttlMs: CATALOG_TTL_MS,
+  missTtlMs: TURF_MISS_TTL_MS
+});
+
+async function findBookableTurf(turfId) {
+  return (await turfRepository.get(turfId))?.schedule || null;
 }
 
+// Live availability pushed to /api/slots/:turfId/stream subscribers
+const slotFeed = createSlotFeed({ connect: connectToDatabase });
+const STREAM_HEARTBEAT_MS = 15000;
+const STREAM_RETRY_MS = 3000;
+
+// Shared bearer-token layer with a cache of verified tokens
+const auth = createAuth({ secret: JWT_SECRET });
+
+// Cache and slot feed numbers for /api/metrics, read when it is scraped
+metrics.collect('turfhub_cache_lookups_total', 'In-process cache lookups; miss means a load or a jwt.verify',
+  'counter', () => {
+    const catalog = catalogCache.stats();
+    const turfs = turfRepository.stats();
+    const tokens = auth.cacheStats();
+    return [
+      [{ cache: 'catalog', result: 'hit' }, catalog.hits],
+      [{ cache: 'catalog', result: 'miss' }, catalog.loads],
+      [{ cache: 'turf', result: 'hit' }, turfs.hits],
+      [{ cache: 'turf', result: 'negative_hit' }, turfs.missHits],
+      [{ cache: 'turf', result: 'miss' }, turfs.loads],
+      [{ cache: 'auth', result: 'hit' }, tokens.hits],
+      [{ cache: 'auth', result: 'miss' }, tokens.misses]
+    ];
+  });
+metrics.collect('turfhub_cache_entries', 'Entries held per in-process cache', 'gauge', () => {
+  const turfs = turfRepository.stats();
+  return [[{ cache: 'turf' }, turfs.cached + turfs.cachedMisses], [{ cache: 'auth' }, auth.cacheSize()]];
+});
+metrics.collect('turfhub_slot_stream_subscribers', 'Open /api/slots/:turfId/stream connections', 'gauge',
+  () => slotFeed.stats().subscribers);
+metrics.collect('turfhub_slot_feed_events_total', 'Availability changes pushed to a turf-day', 'counter',
+  () => slotFeed.stats().events);
+metrics.collect('turfhub_slot_feed_deliveries_total', 'Changes sent to stream subscribers', 'counter',
+  () => slotFeed.stats().deliveries);
+metrics.collect('turfhub_slot_feed_reads_total', 'slotAvailability reads made by the slot feed', 'counter',
+  () => slotFeed.stats().reads);
+metrics.collect('process_start_time_seconds', 'When this server instance started, in Unix seconds', 'gauge',
+  () => startedAt / 1000);
+
 // Helper to verify JWT token
 function verifyToken(request) {
-  try {
-    const authHeader = request.headers.get('authorization');
-    if (!authHeader || !authHeader.startsWith('Bearer ')) {
-      return null;
-    }
-    const token = authHeader.split(' ')[1];
-    const decoded = jwt.verify(token, JWT_SECRET);
-    return decoded;
-  } catch (error) {
-    return null;
-  }
+  return auth.authenticate(request).user;
 }
 
 // Helper to verify vendor JWT token
 function verifyVendorToken(request) {
+  return auth.authenticate(request).vendor;
+}
+
+// Keyset pagination over (createdAt desc, _id desc)
+const DEFAULT_PAGE_SIZE = 50;
+const MAX_PAGE_SIZE = 200;
+const STREAM_BATCH_SIZE = 100;
+
+function encodeCursor(doc) {
+  return Buffer.from(JSON.stringify({
+    c: new Date(doc.createdAt).toISOString(),
+    i: doc._id.toString()
+  })).toString('base64url');
+}
+
+function decodeCursor(token) {
   try {
-    const authHeader = request.headers.get('authorization');
-    if (!authHeader || !authHeader.startsWith('Bearer ')) {
+    const { c, i } = JSON.parse(Buffer.from(token, 'base64url').toString());
+    const createdAt = new Date(c);
+    if (isNaN(createdAt.getTime()) || !ObjectId.isValid(i)) {
       return null;
     }
-    const token = authHeader.split(' ')[1];
-    const decoded = jwt.verify(token, JWT_SECRET);
-    if (decoded.role !== 'vendor') {
-      return null;
-    }
-    return decoded;
+    return { createdAt, id: new ObjectId(i) };
   } catch (error) {
     return null;
   }
 }
 
-export async function GET(request) {
-  const { pathname, searchParams } = new URL(request.url);
+// Returns null when the request did not ask for a page (no limit/cursor),
+// so existing clients keep receiving the full list
+function getPageParams(searchParams) {
+  const limitParam = searchParams.get('limit');
+  const cursorParam = searchParams.get('cursor');
+  if (limitParam === null && cursorParam === null) {
+    return null;
+  }
+  const limit = Math.min(Math.max(parseInt(limitParam, 10) || DEFAULT_PAGE_SIZE, 1), MAX_PAGE_SIZE);
+  const after = cursorParam ? decodeCursor(cursorParam) : null;
+  return { limit, after, invalid: Boolean(cursorParam) && !after };
+}
 
-  try {
-    // GET /api/ - Test endpoint
-    if (pathname === '/api/' || pathname === '/api') {
-      return NextResponse.json({ message: 'TurfHub API is running!' });
+async function findPage(collection, filter, page) {
+  const query = page.after ? {
+    $and: [filter, {
+      $or: [
+        { createdAt: { $lt: page.after.createdAt } },
+        { createdAt: page.after.createdAt, _id: { $lt: page.after.id } }
+      ]
+    }]
+  } : filter;
+  
+  // Fetch one extra document to know whether another page exists
+  const docs = await collection.find(query)
+    .sort({ createdAt: -1, _id: -1 })
+    .limit(page.limit + 1)
+    .toArray();
+  
+  const hasMore = docs.length > page.limit;
+  const items = hasMore ? docs.slice(0, page.limit) : docs;
+  return { items, next: hasMore ? encodeCursor(items[items.length - 1]) : null };
+}
+
+// Stream a cursor as {"<key>": [...]} batch by batch instead of buffering the
+// whole collection with toArray(); pull-based so a slow client applies backpressure
+function streamJsonList(key, cursor, transformBatch = async docs => docs) {
+  const encoder = new TextEncoder();
+  let first = true;
+  cursor.batchSize(STREAM_BATCH_SIZE);
+  
+  const stream = new ReadableStream({
+    start(controller) {
+      controller.enqueue(encoder.encode(`{"${key}":[`));
+    },
+    async pull(controller) {
+      try {
+        const batch = [];
+        while (batch.length < STREAM_BATCH_SIZE) {
+          const doc = await cursor.next();
+          if (!doc) break;
+          batch.push(doc);
+        }
+        
+        const docs = await transformBatch(batch);
+        if (docs.length > 0) {
+          controller.enqueue(encoder.encode((first ? '' : ',') + docs.map(d => JSON.stringify(d)).join(',')));
+          first = false;
+        }
+        
+        if (batch.length < STREAM_BATCH_SIZE) {
+          controller.enqueue(encoder.encode(']}'));
+          controller.close();
+          await cursor.close();
+        }
+      } catch (error) {
+        console.error('Stream Error:', error);
+        controller.error(error);
+        await cursor.close();
+      }
+    },
+    async cancel() {
+      await cursor.close();
     }
+  });
+  
+  return new NextResponse(stream, { headers: { 'Content-Type': 'application/json' } });
+}
 
-    // GET /api/turfs - Get all turfs with optional city filter
-    if (pathname === '/api/turfs') {
-      const city = searchParams.get('city');
-      const sport = searchParams.get('sport');
-      
-      // Fetch approved turfs from active vendors only
-      const db = await connectToDatabase();
-      
-      // First get active vendors
-      const activeVendors = await db.collection('vendors')
-        .find({ isActive: true })
-        .toArray();
-      
-      const activeVendorIds = activeVendors.map(v => v.vendorId);
-      
-      // Then get turfs from active vendors only
-      let query = { 
-        status: 'approved',
-        vendorId: { $in: activeVendorIds }
-      };
-      
-      let dbTurfs = await db.collection('turfs')
-        .find(query)
-        .toArray();
-      
-      // Convert database turfs to customer format
-      const formattedDbTurfs = dbTurfs.map(turf => ({
-        id: turf.turfId,
+// Serve a newest-first list either as one keyset page ({ <key>, next }) or,
+// when no page was requested, as a stream of the full list
+async function listResponse(request, collection, filter, key, transformBatch = async docs => docs) {
+  const { searchParams } = new URL(request.url);
+  const page = getPageParams(searchParams);
+  
+  if (!page) {
+    return streamJsonList(key, collection.find(filter).sort({ createdAt: -1, _id: -1 }), transformBatch);
+  }
+  if (page.invalid) {
+    return json({ error: 'Invalid cursor' }, { status: 400 });
+  }
+  
+  const { items, next } = await findPage(collection, filter, page);
+  return json({ [key]: await transformBatch(items), next });
+}
+
+// Enrich bookings with turf details: one $in lookup over the distinct
+// turfIds, then the mock turfs for anything not in the database
+async function enrichBookings(db, bookings) {
+  const turfIds = [...new Set(bookings.map(b => b.turfId))];
+  const dbTurfs = await db.collection('turfs')
+    .find(
+      { turfId: { $in: turfIds } },
+      { projection: { _id: 0, turfId: 1, name: 1, location: 1, city: 1 } }
+    )
+    .toArray();
+  const dbTurfsById = new Map(dbTurfs.map(t => [t.turfId, t]));
+  
+  return bookings.map(booking => {
+    const turf = dbTurfsById.get(booking.turfId) || mockTurfsById.get(booking.turfId);
+    return {
+      ...booking,
+      turfDetails: turf ? {
         name: turf.name,
-        city: turf.city,
         location: turf.location,
-        area: turf.area || turf.location,
-        pricePerHour: turf.pricing?.basePrice || 0,
-        images: turf.images || [],
-        amenities: turf.amenities || [],
-        rating: turf.rating || 4.5,
-        surface: turf.surface || 'Artificial Grass',
-        description: turf.description || '',
-        capacity: turf.capacity || 0,
-        sportTypes: turf.sportTypes || [],
-        customSlots: turf.customSlots || [] // NEW: vendor-defined slots
-      }));
-      
-      // Merge with mock turfs for backward compatibility
-      let allTurfs = [...formattedDbTurfs, ...mockTurfs];
-      
-      // Filter by city if specified
-      if (city && city !== 'All') {
-        allTurfs = allTurfs.filter(turf => turf.city === city);
-      }
-      
-      // Filter by sport if specified
-      if (sport && sport !== 'All') {
-        allTurfs = allTurfs.filter(turf => 
-          turf.sportTypes && turf.sportTypes.includes(sport)
-        );
-      }
-      
-      return NextResponse.json({ turfs: allTurfs });
-    }
+        city: turf.city
+      } : null
+    };
+  });
+}
 
-    // GET /api/turfs/:id - Get turf details
-    if (pathname.startsWith('/api/turfs/') && !pathname.includes('slots')) {
-      const turfId = pathname.split('/').pop();
-      
-      // Try to find in database first
-      const db = await connectToDatabase();
-      const dbTurf = await db.collection('turfs').findOne({ 
-        $or: [
-          { turfId: turfId },
-          { turfId: turfId }
-        ],
-        status: 'approved'
-      });
-      
-      if (dbTurf) {
-        // Format database turf for customer view
-        const formattedTurf = {
-          id: dbTurf.turfId,
-          name: dbTurf.name,
-          city: dbTurf.city,
-          location: dbTurf.location,
-          area: dbTurf.area || dbTurf.location,
-          pricePerHour: dbTurf.pricing?.basePrice || 0,
-          images: dbTurf.images || [],
-          amenities: dbTurf.amenities || [],
-          rating: dbTurf.rating || 4.5,
-          surface: dbTurf.surface || 'Artificial Grass',
-          description: dbTurf.description || '',
-          capacity: dbTurf.capacity || 0
-        };
-        return NextResponse.json({ turf: formattedTurf });
-      }
-      
-      // Fallback to mock turfs
-      const turf = mockTurfs.find(t => t.id === turfId);
-      
-      if (!turf) {
-        return NextResponse.json({ error: 'Turf not found' }, { status: 404 });
-      }
-      
-      return NextResponse.json({ turf });
-    }
+// GET /api/ - Test endpoint
+async function apiIndex(request) {
+  return json({ message: 'TurfHub API is running!' });
+}
 
-    // GET /api/slots/:turfId - Get available slots for a turf
-    if (pathname.startsWith('/api/slots/')) {
-      const turfId = pathname.split('/').pop();
-      const date = searchParams.get('date');
-      
-      // Try to find in database first
-      const db = await connectToDatabase();
-      let turf = await db.collection('turfs').findOne({ 
-        turfId: turfId,
-        status: 'approved'
-      });
-      
-      // Fallback to mock turfs
-      if (!turf) {
-        turf = mockTurfs.find(t => t.id === turfId);
-      }
-      
-      if (!turf) {
-        return NextResponse.json({ error: 'Turf not found' }, { status: 404 });
-      }
-      
-      const currentDate = new Date();
-      const requestedDate = date ? new Date(date + 'T00:00:00') : new Date(currentDate.toISOString().split('T')[0] + 'T00:00:00');
-      
-      // Compare dates (ignoring time)
-      const currentDateOnly = new Date(currentDate.toISOString().split('T')[0] + 'T00:00:00');
-      const isToday = requestedDate.getTime() === currentDateOnly.getTime();
-      
-      const slots = generateSlots(
-        requestedDate.toISOString().split('T')[0],
-        isToday ? currentDate : null
-      );
-      
-      // Get booked slots from database - use turfId for both mock and DB turfs
-      const bookings = await db.collection('bookings')
-        .find({
-          turfId: turf.turfId || turf.id,
-          date: requestedDate.toISOString().split('T')[0],
-          status: { $in: ['confirmed', 'pending'] }
-        })
-        .toArray();
-      
-      const bookedSlotIds = bookings.map(b => b.slotId);
-      
-      // Mark booked slots as unavailable
-      slots.forEach(slot => {
-        if (bookedSlotIds.includes(slot.id)) {
-          slot.available = false;
-        }
-      });
-      
-      return NextResponse.json({ slots, date: requestedDate.toISOString().split('T')[0] });
-    }
+// GET /api/metrics - Prometheus text format; with METRICS_TOKEN set, only for that bearer token
+async function getMetrics(request) {
+  if (METRICS_TOKEN && request.headers.get('authorization') !== `Bearer ${METRICS_TOKEN}`) {
+    return json({ error: 'Unauthorized' }, { status: 401 });
+  }
+  return new NextResponse(metrics.render(), {
+    headers: { 'Content-Type': 'text/plain; version=0.0.4; charset=utf-8', 'Cache-Control': 'no-store' }
+  });
+}
 
-    // GET /api/cities - Get list of cities
-    if (pathname === '/api/cities') {
-      // Get cities from database turfs
-      const db = await connectToDatabase();
-      const dbTurfs = await db.collection('turfs')
-        .find({ status: 'approved' })
-        .toArray();
-      
-      const dbCities = [...new Set(dbTurfs.map(t => t.city))];
-      const mockCities = [...new Set(mockTurfs.map(t => t.city))];
-      const allCities = ['All', ...new Set([...dbCities, ...mockCities])];
-      
-      return NextResponse.json({ cities: allCities });
-    }
+// GET /api/health - Database ping latency and connection pool stats
+async function getHealth(request) {
+  const uptimeSeconds = Math.round((Date.now() - startedAt) / 1000);
+  try {
+    return json({
+      status: 'ok',
+      uptimeSeconds,
+      mongo: await database.health(),
+      paymentGateway: paymentGateway.state()
+    }, { headers: { 'Cache-Control': 'no-store' } });
+  } catch (error) {
+    return json({
+      status: 'error',
+      uptimeSeconds,
+      error: error.message,
+      paymentGateway: paymentGateway.state()
+    }, { status: 503, headers: { 'Cache-Control': 'no-store' } });
+  }
+}
 
-    // GET /api/sports - Get list of sport categories
-    if (pathname === '/api/sports') {
-      const db = await connectToDatabase();
-      const dbTurfs = await db.collection('turfs')
-        .find({ status: 'approved' })
-        .toArray();
-      
-      // Extract all sport types from turfs
-      const allSports = new Set(['All']);
-      dbTurfs.forEach(turf => {
-        if (turf.sportTypes && Array.isArray(turf.sportTypes)) {
-          turf.sportTypes.forEach(sport => allSports.add(sport));
-        }
-      });
-      
-      return NextResponse.json({ sports: Array.from(allSports) });
-    }
+// ?sort= values for GET /api/turfs and the card field each one orders by
+const TURF_SORT_KEYS = { price: 'pricePerHour', rating: 'rating' };
 
-    // GET /api/bookings - Get user bookings
-    if (pathname === '/api/bookings') {
-      const user = verifyToken(request);
-      if (!user) {
-        return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
-      }
-      
-      const db = await connectToDatabase();
-      const bookings = await db.collection('bookings')
-        .find({ userId: user.userId })
-        .sort({ createdAt: -1 })
-        .toArray();
-      
-      // Enrich bookings with turf details from database first, then mock
-      const enrichedBookings = await Promise.all(bookings.map(async booking => {
-        // Try database first
-        let dbTurf = await db.collection('turfs').findOne({ 
-          turfId: booking.turfId 
-        });
-        
-        if (dbTurf) {
-          return {
-            ...booking,
-            turfDetails: {
-              name: dbTurf.name,
-              location: dbTurf.location,
-              city: dbTurf.city
-            }
-          };
-        }
-        
-        // Fallback to mock turfs
-        const mockTurf = mockTurfs.find(t => t.id === booking.turfId);
-        return {
-          ...booking,
-          turfDetails: mockTurf ? {
-            name: mockTurf.name,
-            location: mockTurf.location,
-            city: mockTurf.city
-          } : null
-        };
-      }));
-      
-      return NextResponse.json({ bookings: enrichedBookings });
-    }
+// city/sport/sort/order/limit of a turf list request, or { error } for a 400
+function turfListQuery(searchParams) {
+  const city = searchParams.get('city');
+  const sport = searchParams.get('sport');
+  const sort = searchParams.get('sort');
+  const order = searchParams.get('order') || (sort === 'rating' ? 'desc' : 'asc');
+  const limitParam = searchParams.get('limit');
+  
+  if (sort && !TURF_SORT_KEYS[sort]) {
+    return { error: 'sort must be one of: price, rating' };
+  }
+  if (order !== 'asc' && order !== 'desc') {
+    return { error: 'order must be asc or desc' };
+  }
+  
+  const limit = limitParam
+    ? Math.min(Math.max(parseInt(limitParam, 10) || DEFAULT_PAGE_SIZE, 1), MAX_PAGE_SIZE)
+    : null;
+  return { city, sport, sort, order, limit, viewKey: `${city}|${sport}|${sort}|${order}` };
+}
 
-    // GET /api/admin/vendors - Get all vendors (admin only)
-    if (pathname === '/api/admin/vendors') {
-      // Simple admin check (in production, use proper JWT)
-      const db = await connectToDatabase();
-      const vendors = await db.collection('vendors')
-        .find({})
-        .sort({ createdAt: -1 })
-        .toArray();
-      
-      return NextResponse.json({ vendors });
-    }
+function listedTurfs(catalog, query) {
+  const turfs = turfView(catalog, query.viewKey, query);
+  return query.limit ? turfs.slice(0, query.limit) : turfs;
+}
 
-    // GET /api/admin/turfs - Get all turfs (admin only)
-    if (pathname === '/api/admin/turfs') {
-      const db = await connectToDatabase();
-      const turfs = await db.collection('turfs')
-        .find({})
-        .sort({ createdAt: -1 })
-        .toArray();
-      
-      return NextResponse.json({ turfs });
-    }
+// GET /api/turfs - Get all turfs with optional city filter
+async function listTurfs(request, { searchParams }) {
+  const query = turfListQuery(searchParams);
+  if (query.error) {
+    return json({ error: query.error }, { status: 400 });
+  }
+  
+  const catalog = await catalogCache.get();
+  return cachedJson(request, () => ({ turfs: listedTurfs(catalog, query) }), {
+    etag: etagOf(catalog.version, 'turfs', query.viewKey, query.limit ?? '')
+  });
+}
 
-    // GET /api/vendor/profile - Get vendor profile
-    if (pathname === '/api/vendor/profile') {
-      const vendor = verifyVendorToken(request);
-      if (!vendor) {
-        return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
-      }
-      
-      const db = await connectToDatabase();
-      const vendorData = await db.collection('vendors').findOne({ vendorId: vendor.vendorId });
-      
-      if (!vendorData) {
-        return NextResponse.json({ error: 'Vendor not found' }, { status: 404 });
-      }
-      
-      return NextResponse.json({ 
-        vendor: {
-          vendorId: vendorData.vendorId,
-          businessName: vendorData.businessName,
-          ownerName: vendorData.ownerName,
-          mobile: vendorData.mobile,
-          email: vendorData.email,
-          gst: vendorData.gst,
-          pan: vendorData.pan,
-          status: vendorData.status,
-          bankDetails: vendorData.bankDetails || {}
+// GET /api/bootstrap - Cities, sports and the turf list for the home page's
+// first render in one response; takes the same filters as GET /api/turfs
+async function getBootstrap(request, { searchParams }) {
+  const query = turfListQuery(searchParams);
+  if (query.error) {
+    return json({ error: query.error }, { status: 400 });
+  }
+  
+  const catalog = await catalogCache.get();
+  return cachedJson(request, () => ({
+    cities: catalog.cities,
+    sports: catalog.sports,
+    turfs: listedTurfs(catalog, query)
+  }), { etag: etagOf(catalog.version, 'bootstrap', query.viewKey, query.limit ?? '') });
+}
+
+// Filtered and sorted catalogue list, memoised per catalogue
+function turfView(catalog, viewKey, { city, sport, sort, order }) {
+  let allTurfs = catalog.views.get(viewKey);
+  if (allTurfs) {
+    return allTurfs;
+  }
+  const byCity = city && city !== 'All' ? (catalog.byCity.get(city) || []) : null;
+  const bySport = sport && sport !== 'All' ? (catalog.bySport.get(sport) || []) : null;
+  
+  allTurfs = byCity || bySport || catalog.turfs;
+  
+  // Both filters: walk the city list, keeping its order
+  if (byCity && bySport) {
+    allTurfs = byCity.filter(turf => turf.sportTypes.includes(sport));
+  }
+  if (sort) {
+    const key = TURF_SORT_KEYS[sort];
+    const direction = order === 'desc' ? -1 : 1;
+    allTurfs = [...allTurfs].sort((a, b) => (a[key] - b[key]) * direction);
+  }
+  // Only known cities and sports are kept, so arbitrary query strings cannot grow the map
+  if ((!byCity || catalog.byCity.has(city)) && (!bySport || catalog.bySport.has(sport))) {
+    catalog.views.set(viewKey, allTurfs);
+  }
+  return allTurfs;
+}
+
+// GET /api/turfs/:id - Get turf details
+async function getTurf(request, { params }) {
+  const record = await turfRepository.get(params.turfId);
+  
+  if (!record) {
+    return json({ error: 'Turf not found' }, { status: 404 });
+  }
+  
+  const catalog = await catalogCache.get();
+  return cachedJson(request, { turf: record.detail }, {
+    etag: etagOf(catalog.version, 'turf', params.turfId, record.version)
+  });
+}
+
+// GET /api/slots/:turfId/range?from=YYYY-MM-DD&days=7 - Slots for several days
+async function getSlotRange(request, { params, searchParams }) {
+  const { turfId } = params;
+  const currentDate = new Date();
+  const today = currentDate.toISOString().split('T')[0];
+  const from = searchParams.get('from') || today;
+  const days = Math.min(Math.max(parseInt(searchParams.get('days'), 10) || 7, 1), MAX_SLOT_RANGE_DAYS);
+  
+  const fromDate = new Date(from + 'T00:00:00Z');
+  if (!/^\d{4}-\d{2}-\d{2}$/.test(from) || isNaN(fromDate.getTime())) {
+    return json({ error: 'Invalid from date' }, { status: 400 });
+  }
+  
+  const turf = await findBookableTurf(turfId);
+  if (!turf) {
+    return json({ error: 'Turf not found' }, { status: 404 });
+  }
+  
+  const db = await connectToDatabase();
+  
+  const dates = Array.from({ length: days }, (_, i) =>
+    new Date(fromDate.getTime() + i * 24 * 60 * 60 * 1000).toISOString().split('T')[0]
+  );
+  const availability = await getAvailability(db, turf.turfId || turf.id, dates);
+  
+  return json({
+    turfId,
+    days: dates.map(date => ({
+      date,
+      slots: slotsForDate(turf, date, availability.get(date), date === today ? currentDate : null)
+    }))
+  });
+}
+
+// GET /api/slots/:turfId - Get available slots for a turf
+async function getSlots(request, { params, searchParams }) {
+  const { turfId } = params;
+  const date = searchParams.get('date');
+  
+  const turf = await findBookableTurf(turfId);
+  
+  if (!turf) {
+    return json({ error: 'Turf not found' }, { status: 404 });
+  }
+  
+  const currentDate = new Date();
+  const requestedDate = date ? new Date(date + 'T00:00:00') : new Date(currentDate.toISOString().split('T')[0] + 'T00:00:00');
+  
+  // Compare dates (ignoring time)
+  const currentDateOnly = new Date(currentDate.toISOString().split('T')[0] + 'T00:00:00');
+  const isToday = requestedDate.getTime() === currentDateOnly.getTime();
+  const day = requestedDate.toISOString().split('T')[0];
+  
+  // One point read of the turf-day bitmap - use turfId for both mock and DB turfs
+  const db = await connectToDatabase();
+  const availability = await getAvailability(db, turf.turfId || turf.id, [day]);
+  const slots = slotsForDate(turf, day, availability.get(day), isToday ? currentDate : null);
+  
+  return json({ slots, date: day });
+}
+
+// GET /api/slots/:turfId/stream?date=YYYY-MM-DD - Live slot availability as
+// Server-Sent Events: a `snapshot` event with the day's slots, then a `slots`
+// event with { id, available } for every slot that is taken or freed
+async function streamSlots(request, { params, searchParams }) {
+  const { turfId } = params;
+  const date = searchParams.get('date');
+  if (!/^\d{4}-\d{2}-\d{2}$/.test(date || '')) {
+    return json({ error: 'date must be YYYY-MM-DD' }, { status: 400 });
+  }
+  
+  const turf = await findBookableTurf(turfId);
+  if (!turf) {
+    return json({ error: 'Turf not found' }, { status: 404 });
+  }
+  
+  const db = await connectToDatabase();
+  const availabilityKey = turf.turfId || turf.id;
+  const availability = await getAvailability(db, availabilityKey, [date]);
+  const currentDate = new Date();
+  const isToday = date === currentDate.toISOString().split('T')[0];
+  
+  const encoder = new TextEncoder();
+  let close = () => {};
+  const body = new ReadableStream({
+    start(controller) {
+      let hours = new Set();
+      const write = text => {
+        try {
+          controller.enqueue(encoder.encode(text));
+        } catch (error) {
+          close();
+        }
+      };
+      const send = (event, data) => write(`event: ${event}\ndata: ${JSON.stringify(data)}\n\n`);
+      
+      const subscription = slotFeed.subscribe(availabilityKey, date, changes => {
+        const slots = changes
+          .filter(change => hours.has(change.hour))
+          .map(change => ({ id: `slot-${date}-${change.hour}`, available: change.available }));
+        if (slots.length > 0) {
+          send('slots', { date, slots });
+        }
+      }, availability.get(date));
+      const slots = slotsForDate(turf, date, subscription.availability, isToday ? currentDate : null);
+      hours = new Set(slots.map(slot => slotHour(slot.id)));
+      
+      write(`retry: ${STREAM_RETRY_MS}\n\n`);
+      send('snapshot', { date, slots });
+      const heartbeat = setInterval(() => write(': ping\n\n'), STREAM_HEARTBEAT_MS);
+      
+      let open = true;
+      close = () => {
+        if (!open) return;
+        open = false;
+        clearInterval(heartbeat);
+        subscription.unsubscribe();
+        try {
+          controller.close();
+        } catch (error) {
+          // Already closed by the client
         }
-      });
+      };
+      request.signal?.addEventListener('abort', () => close());
+    },
+    cancel() {
+      close();
     }
-
-    // GET /api/vendor/turfs - Get vendor's turfs
-    if (pathname === '/api/vendor/turfs') {
-      const vendor = verifyVendorToken(request);
-      if (!vendor) {
-        return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
-      }
-      
-      const db = await connectToDatabase();
-      const turfs = await db.collection('turfs')
-        .find({ vendorId: vendor.vendorId })
-        .sort({ createdAt: -1 })
-        .toArray();
-      
-      return NextResponse.json({ turfs });
+  });
+  
+  return new Response(body, {
+    headers: {
+      'Content-Type': 'text/event-stream',
+      'Cache-Control': 'no-cache, no-transform',
+      Connection: 'keep-alive',
+      'X-Accel-Buffering': 'no'
     }
+  });
+}
 
-    // GET /api/vendor/turfs/:id - Get single turf details
-    if (pathname.startsWith('/api/vendor/turfs/') && pathname.split('/').length === 5) {
-      const vendor = verifyVendorToken(request);
-      if (!vendor) {
-        return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
-      }
-      
-      const turfId = pathname.split('/').pop();
-      const db = await connectToDatabase();
-      const turf = await db.collection('turfs').findOne({ turfId, vendorId: vendor.vendorId });
-      
-      if (!turf) {
-        return NextResponse.json({ error: 'Turf not found' }, { status: 404 });
-      }
-      
-      return NextResponse.json({ turf });
-    }
+// GET /api/cities - Get list of cities
+async function listCities(request) {
+  // Cities of every approved turf plus the mock turfs
+  const catalog = await catalogCache.get();
+  
+  return cachedJson(request, () => ({ cities: catalog.cities }), { etag: etagOf(catalog.version, 'cities') });
+}
 
-    return NextResponse.json({ error: 'Not found' }, { status: 404 });
-  } catch (error) {
-    console.error('GET Error:', error);
-    return NextResponse.json({ error: error.message }, { status: 500 });
+// GET /api/sports - Get list of sport categories
+async function listSports(request) {
+  // Sport types of every approved turf
+  const catalog = await catalogCache.get();
+  
+  return cachedJson(request, () => ({ sports: catalog.sports }), { etag: etagOf(catalog.version, 'sports') });
+}
+
+// GET /api/bookings - Get user bookings
+async function listBookings(request) {
+  const user = verifyToken(request);
+  if (!user) {
+    return json({ error: 'Unauthorized' }, { status: 401 });
   }
+  
+  const db = await connectToDatabase();
+  return listResponse(
+    request,
+    db.collection('bookings'),
+    { userId: user.userId },
+    'bookings',
+    bookings => enrichBookings(db, bookings)
+  );
 }
 
-export async function POST(request) {
-  const { pathname } = new URL(request.url);
+// GET /api/admin/vendors - Get all vendors (admin only)
+async function listAllVendors(request) {
+  // Simple admin check (in production, use proper JWT)
+  const db = await connectToDatabase();
+  return listResponse(request, db.collection('vendors'), {}, 'vendors');
+}
 
-  try {
-    // POST /api/auth/send-otp - Send OTP (dummy implementation)
-    if (pathname === '/api/auth/send-otp') {
-      const body = await request.json();
-      const { mobile } = body;
-      
-      if (!mobile || mobile.length !== 10) {
-        return NextResponse.json({ error: 'Invalid mobile number' }, { status: 400 });
-      }
-      
-      // Dummy OTP - always use 123456
-      // In production, integrate with SMS gateway
-      
-      return NextResponse.json({ 
-        success: true, 
-        message: 'OTP sent successfully',
-        // For demo purposes, returning OTP
-        otp: '123456'
-      });
-    }
+// GET /api/admin/turfs - Get all turfs (admin only)
+async function listAllTurfs(request) {
+  const db = await connectToDatabase();
+  return listResponse(request, db.collection('turfs'), {}, 'turfs', async docs => docs.map(withoutTemplate));
+}
 
-    // POST /api/auth/verify-otp - Verify OTP and login
-    if (pathname === '/api/auth/verify-otp') {
-      const body = await request.json();
-      const { mobile, otp } = body;
-      
-      // Dummy verification - accept any 10-digit mobile with OTP 123456
-      if (!mobile || mobile.length !== 10) {
-        return NextResponse.json({ error: 'Invalid mobile number' }, { status: 400 });
-      }
-      
-      if (otp !== '123456') {
-        return NextResponse.json({ error: 'Invalid OTP' }, { status: 400 });
-      }
-      
-      // Create or get user
-      const db = await connectToDatabase();
-      let user = await db.collection('users').findOne({ mobile });
-      
-      if (!user) {
-        const userId = uuidv4();
-        user = {
-          userId,
-          mobile,
-          name: '',
-          email: '',
-          dob: '',
-          createdAt: new Date()
-        };
-        await db.collection('users').insertOne(user);
-      }
-      
-      // Generate JWT token
-      const token = jwt.sign(
-        { userId: user.userId, mobile: user.mobile },
-        JWT_SECRET,
-        { expiresIn: '30d' }
-      );
-      
-      return NextResponse.json({ 
-        success: true,
-        token,
-        user: {
-          userId: user.userId,
-          mobile: user.mobile,
-          name: user.name || '',
-          email: user.email || '',
-          dob: user.dob || ''
-        }
-      });
+// GET /api/vendor/profile - Get vendor profile
+async function getVendorProfile(request) {
+  const vendor = verifyVendorToken(request);
+  if (!vendor) {
+    return json({ error: 'Unauthorized' }, { status: 401 });
+  }
+  
+  const db = await connectToDatabase();
+  const vendorData = await db.collection('vendors').findOne({ vendorId: vendor.vendorId });
+  
+  if (!vendorData) {
+    return json({ error: 'Vendor not found' }, { status: 404 });
+  }
+  
+  return json({ 
+    vendor: {
+      vendorId: vendorData.vendorId,
+      businessName: vendorData.businessName,
+      ownerName: vendorData.ownerName,
+      mobile: vendorData.mobile,
+      email: vendorData.email,
+      gst: vendorData.gst,
+      pan: vendorData.pan,
+      status: vendorData.status,
+      bankDetails: vendorData.bankDetails || {}
     }
+  });
+}
 
-    // POST /api/vendor/register - Vendor registration
-    if (pathname === '/api/vendor/register') {
-      const body = await request.json();
-      const { businessName, ownerName, mobile, email, gst, pan } = body;
-      
-      if (!businessName || !ownerName || !mobile || !email) {
-        return NextResponse.json({ error: 'Missing required fields' }, { status: 400 });
-      }
-      
-      const db = await connectToDatabase();
-      const existingVendor = await db.collection('vendors').findOne({ mobile });
-      
-      if (existingVendor) {
-        return NextResponse.json({ error: 'Vendor already registered with this mobile' }, { status: 400 });
-      }
-      
-      const vendorId = uuidv4();
-      const vendor = {
-        vendorId,
-        businessName,
-        ownerName,
-        mobile,
-        email,
-        gst: gst || '',
-        pan: pan || '',
-        status: 'pending', // pending, approved, rejected
-        isActive: true, // NEW: active/deactive toggle
-        bankDetails: {},
-        createdAt: new Date()
-      };
-      
-      await db.collection('vendors').insertOne(vendor);
-      
-      return NextResponse.json({ 
-        success: true,
-        message: 'Registration successful! Please login with your mobile number.',
-        vendorId
-      });
-    }
+// GET /api/vendor/turfs - Get vendor's turfs
+async function listVendorTurfs(request) {
+  const vendor = verifyVendorToken(request);
+  if (!vendor) {
+    return json({ error: 'Unauthorized' }, { status: 401 });
+  }
+  
+  const db = await connectToDatabase();
+  return listResponse(request, db.collection('turfs'), { vendorId: vendor.vendorId }, 'turfs',
+    async docs => docs.map(withoutTemplate));
+}
 
-    // POST /api/vendor/send-otp - Send OTP for vendor login
-    if (pathname === '/api/vendor/send-otp') {
-      const body = await request.json();
-      const { mobile } = body;
-      
-      if (!mobile || mobile.length !== 10) {
-        return NextResponse.json({ error: 'Invalid mobile number' }, { status: 400 });
-      }
-      
-      // Check if vendor exists
-      const db = await connectToDatabase();
-      const vendor = await db.collection('vendors').findOne({ mobile });
-      
-      if (!vendor) {
-        return NextResponse.json({ error: 'Vendor not registered. Please register first.' }, { status: 404 });
-      }
-      
-      // Dummy OTP - same as user OTP
-      return NextResponse.json({ 
-        success: true, 
-        message: 'OTP sent successfully',
-        otp: '123456'
-      });
-    }
+// GET /api/vendor/turfs/:id - Get single turf details
+async function getVendorTurf(request, { params }) {
+  const vendor = verifyVendorToken(request);
+  if (!vendor) {
+    return json({ error: 'Unauthorized' }, { status: 401 });
+  }
+  
+  const { turfId } = params;
+  const db = await connectToDatabase();
+  const turf = await db.collection('turfs').findOne({ turfId, vendorId: vendor.vendorId }, WITHOUT_TEMPLATE);
+  
+  if (!turf) {
+    return json({ error: 'Turf not found' }, { status: 404 });
+  }
+  
+  return json({ turf });
+}
 
-    // POST /api/vendor/verify-otp - Verify OTP and vendor login
-    if (pathname === '/api/vendor/verify-otp') {
-      const body = await request.json();
-      const { mobile, otp } = body;
-      
-      if (!mobile || mobile.length !== 10) {
-        return NextResponse.json({ error: 'Invalid mobile number' }, { status: 400 });
-      }
-      
-      if (otp !== '123456') {
-        return NextResponse.json({ error: 'Invalid OTP' }, { status: 400 });
-      }
-      
-      const db = await connectToDatabase();
-      const vendor = await db.collection('vendors').findOne({ mobile });
-      
-      if (!vendor) {
-        return NextResponse.json({ error: 'Vendor not found' }, { status: 404 });
-      }
-      
-      // Generate JWT token with vendor role
-      const token = jwt.sign(
-        { vendorId: vendor.vendorId, mobile: vendor.mobile, role: 'vendor' },
-        JWT_SECRET,
-        { expiresIn: '30d' }
-      );
-      
-      return NextResponse.json({ 
-        success: true,
-        token,
-        vendor: {
-          vendorId: vendor.vendorId,
-          businessName: vendor.businessName,
-          ownerName: vendor.ownerName,
-          mobile: vendor.mobile,
-          email: vendor.email,
-          status: vendor.status
-        }
-      });
-    }
+// POST /api/auth/send-otp - Send OTP (dummy implementation)
+async function sendOtp(request) {
+  const body = await request.json();
+  const { mobile } = body;
+  
+  if (!mobile || mobile.length !== 10) {
+    return json({ error: 'Invalid mobile number' }, { status: 400 });
+  }
+  
+  // Dummy OTP - always use 123456
+  // In production, integrate with SMS gateway
+  
+  return json({ 
+    success: true, 
+    message: 'OTP sent successfully',
+    // For demo purposes, returning OTP
+    otp: '123456'
+  });
+}
 
-    // POST /api/vendor/turfs - Add new turf
-    if (pathname === '/api/vendor/turfs') {
-      const vendor = verifyVendorToken(request);
-      if (!vendor) {
-        return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
-      }
-      
-      const body = await request.json();
-      const { 
-        name, description, location, city, area, pincode, 
-        sportTypes, turfType, surface, size, capacity,
-        amenities, pricing, operatingHours, images,
-        policies, googleMapsLink
-      } = body;
-      
-      if (!name || !location || !city || !pricing) {
-        return NextResponse.json({ error: 'Missing required fields' }, { status: 400 });
-      }
-      
-      const db = await connectToDatabase();
-      const turfId = uuidv4();
-      
-      const turf = {
-        turfId,
-        vendorId: vendor.vendorId,
-        name,
-        description: description || '',
-        location,
-        city,
-        area: area || '',
-        pincode: pincode || '',
-        sportTypes: sportTypes || [],
-        turfType: turfType || 'outdoor',
-        surface: surface || 'Artificial Grass',
-        size: size || '',
-        capacity: capacity || 0,
-        amenities: amenities || [],
-        pricing: pricing, // { basePrice, weekdayMorning, weekdayEvening, etc. }
-        operatingHours: operatingHours || { opening: '06:00', closing: '23:00' },
-        images: images || [],
-        policies: policies || {},
-        googleMapsLink: googleMapsLink || '',
-        rating: 0,
-        totalBookings: 0,
-        status: 'pending', // pending, approved, rejected
-        createdAt: new Date()
-      };
-      
-      await db.collection('turfs').insertOne(turf);
-      
-      return NextResponse.json({ 
-        success: true,
-        message: 'Turf added successfully! It will be visible after admin approval.',
-        turfId,
-        turf
-      });
+// POST /api/auth/verify-otp - Verify OTP and login
+async function verifyOtp(request) {
+  const body = await request.json();
+  const { mobile, otp } = body;
+  
+  // Dummy verification - accept any 10-digit mobile with OTP 123456
+  if (!mobile || mobile.length !== 10) {
+    return json({ error: 'Invalid mobile number' }, { status: 400 });
+  }
+  
+  if (otp !== '123456') {
+    return json({ error: 'Invalid OTP' }, { status: 400 });
+  }
+  
+  // Create or get user
+  const db = await connectToDatabase();
+  let user = await db.collection('users').findOne({ mobile });
+  
+  if (!user) {
+    const userId = uuidv4();
+    user = {
+      userId,
+      mobile,
+      name: '',
+      email: '',
+      dob: '',
+      createdAt: new Date()
+    };
+    await db.collection('users').insertOne(user);
+  }
+  
+  // Generate JWT token
+  const token = jwt.sign(
+    { userId: user.userId, mobile: user.mobile },
+    JWT_SECRET,
+    { expiresIn: '30d' }
+  );
+  
+  return json({ 
+    success: true,
+    token,
+    user: {
+      userId: user.userId,
+      mobile: user.mobile,
+      name: user.name || '',
+      email: user.email || '',
+      dob: user.dob || ''
     }
+  });
+}
 
-    // POST /api/admin/vendors/approve - Approve/Reject vendor
-    if (pathname === '/api/admin/vendors/approve') {
-      const body = await request.json();
-      const { vendorId, action } = body;
-      
-      if (!vendorId || !action) {
-        return NextResponse.json({ error: 'Missing required fields' }, { status: 400 });
-      }
-      
-      const status = action === 'approve' ? 'approved' : 'rejected';
-      
-      const db = await connectToDatabase();
-      await db.collection('vendors').updateOne(
-        { vendorId },
-        { $set: { status, updatedAt: new Date() } }
-      );
-      
-      return NextResponse.json({ success: true, message: `Vendor ${status}` });
-    }
+// POST /api/vendor/register - Vendor registration
+async function registerVendor(request) {
+  const body = await request.json();
+  const { businessName, ownerName, mobile, email, gst, pan } = body;
+  
+  if (!businessName || !ownerName || !mobile || !email) {
+    return json({ error: 'Missing required fields' }, { status: 400 });
+  }
+  
+  const db = await connectToDatabase();
+  const existingVendor = await db.collection('vendors').findOne({ mobile });
+  
+  if (existingVendor) {
+    return json({ error: 'Vendor already registered with this mobile' }, { status: 400 });
+  }
+  
+  const vendorId = uuidv4();
+  const vendor = {
+    vendorId,
+    businessName,
+    ownerName,
+    mobile,
+    email,
+    gst: gst || '',
+    pan: pan || '',
+    status: 'pending', // pending, approved, rejected
+    isActive: true, // NEW: active/deactive toggle
+    bankDetails: {},
+    createdAt: new Date()
+  };
+  
+  await db.collection('vendors').insertOne(vendor);
+  
+  return json({ 
+    success: true,
+    message: 'Registration successful! Please login with your mobile number.',
+    vendorId
+  });
+}
 
-    // POST /api/admin/turfs/approve - Approve/Reject turf
-    if (pathname === '/api/admin/turfs/approve') {
-      const body = await request.json();
-      const { turfId, action } = body;
-      
-      if (!turfId || !action) {
-        return NextResponse.json({ error: 'Missing required fields' }, { status: 400 });
-      }
-      
-      const status = action === 'approve' ? 'approved' : 'rejected';
-      
-      const db = await connectToDatabase();
-      await db.collection('turfs').updateOne(
-        { turfId },
-        { $set: { status, updatedAt: new Date() } }
-      );
-      
-      return NextResponse.json({ success: true, message: `Turf ${status}` });
+// POST /api/vendor/send-otp - Send OTP for vendor login
+async function sendVendorOtp(request) {
+  const body = await request.json();
+  const { mobile } = body;
+  
+  if (!mobile || mobile.length !== 10) {
+    return json({ error: 'Invalid mobile number' }, { status: 400 });
+  }
+  
+  // Check if vendor exists
+  const db = await connectToDatabase();
+  const vendor = await db.collection('vendors').findOne({ mobile });
+  
+  if (!vendor) {
+    return json({ error: 'Vendor not registered. Please register first.' }, { status: 404 });
+  }
+  
+  // Dummy OTP - same as user OTP
+  return json({ 
+    success: true, 
+    message: 'OTP sent successfully',
+    otp: '123456'
+  });
+}
+
+// POST /api/vendor/verify-otp - Verify OTP and vendor login
+async function verifyVendorOtp(request) {
+  const body = await request.json();
+  const { mobile, otp } = body;
+  
+  if (!mobile || mobile.length !== 10) {
+    return json({ error: 'Invalid mobile number' }, { status: 400 });
+  }
+  
+  if (otp !== '123456') {
+    return json({ error: 'Invalid OTP' }, { status: 400 });
+  }
+  
+  const db = await connectToDatabase();
+  const vendor = await db.collection('vendors').findOne({ mobile });
+  
+  if (!vendor) {
+    return json({ error: 'Vendor not found' }, { status: 404 });
+  }
+  
+  // Generate JWT token with vendor role
+  const token = jwt.sign(
+    { vendorId: vendor.vendorId, mobile: vendor.mobile, role: 'vendor' },
+    JWT_SECRET,
+    { expiresIn: '30d' }
+  );
+  
+  return json({ 
+    success: true,
+    token,
+    vendor: {
+      vendorId: vendor.vendorId,
+      businessName: vendor.businessName,
+      ownerName: vendor.ownerName,
+      mobile: vendor.mobile,
+      email: vendor.email,
+      status: vendor.status
     }
+  });
+}
 
-    // POST /api/admin/vendors/toggle-active - Toggle vendor active status
-    if (pathname === '/api/admin/vendors/toggle-active') {
-      const body = await request.json();
-      const { vendorId, isActive } = body;
-      
-      if (!vendorId || isActive === undefined) {
-        return NextResponse.json({ error: 'Missing required fields' }, { status: 400 });
-      }
-      
-      const db = await connectToDatabase();
-      await db.collection('vendors').updateOne(
-        { vendorId },
-        { $set: { isActive, updatedAt: new Date() } }
+// POST /api/vendor/turfs - Add new turf
+async function createVendorTurf(request) {
+  const vendor = verifyVendorToken(request);
+  if (!vendor) {
+    return json({ error: 'Unauthorized' }, { status: 401 });
+  }
+  
+  const body = await request.json();
+  const { 
+    name, description, location, city, area, pincode, 
+    sportTypes, turfType, surface, size, capacity,
+    amenities, pricing, operatingHours, customSlots, images,
+    policies, googleMapsLink
+  } = body;
+  
+  if (!name || !location || !city || !pricing) {
+    return json({ error: 'Missing required fields' }, { status: 400 });
+  }
+  const slotsError = customSlotsError(customSlots);
+  if (slotsError) {
+    return json({ error: slotsError }, { status: 400 });
+  }
+  
+  const db = await connectToDatabase();
+  const turfId = uuidv4();
+  
+  const turf = {
+    turfId,
+    vendorId: vendor.vendorId,
+    name,
+    description: description || '',
+    location,
+    city,
+    area: area || '',
+    pincode: pincode || '',
+    sportTypes: sportTypes || [],
+    turfType: turfType || 'outdoor',
+    surface: surface || 'Artificial Grass',
+    size: size || '',
+    capacity: capacity || 0,
+    amenities: amenities || [],
+    pricing: pricing, // { basePrice, weekdayMorning, weekdayEvening, etc. }
+    operatingHours: operatingHours || { opening: '06:00', closing: '23:00' },
+    customSlots: customSlots || [], // see lib/slots.js for the shape
+    images: images || [],
+    policies: policies || {},
+    googleMapsLink: googleMapsLink || '',
+    rating: 0,
+    totalBookings: 0,
+    status: 'pending', // pending, approved, rejected
+    createdAt: new Date()
+  };
+  turf.slotTemplate = compileSlotTemplate(turf);
+  
+  await db.collection('turfs').insertOne(turf);
+  catalogCache.invalidate();
+  turfRepository.invalidate(turfId);
+  
+  return json({ 
+    success: true,
+    message: 'Turf added successfully! It will be visible after admin approval.',
+    turfId,
+    turf: withoutTemplate(turf)
+  });
+}
+
+// POST /api/admin/vendors/approve - Approve/Reject vendor
+async function approveVendor(request) {
+  const body = await request.json();
+  const { vendorId, action } = body;
+  
+  if (!vendorId || !action) {
+    return json({ error: 'Missing required fields' }, { status: 400 });
+  }
+  
+  const status = action === 'approve' ? 'approved' : 'rejected';
+  
+  const db = await connectToDatabase();
+  await db.collection('vendors').updateOne(
+    { vendorId },
+    { $set: { status, updatedAt: new Date() } }
+  );
+  
+  return json({ success: true, message: `Vendor ${status}` });
+}
+
+// POST /api/admin/turfs/approve - Approve/Reject turf
+async function approveTurf(request) {
+  const body = await request.json();
+  const { turfId, action } = body;
+  
+  if (!turfId || !action) {
+    return json({ error: 'Missing required fields' }, { status: 400 });
+  }
+  
+  const status = action === 'approve' ? 'approved' : 'rejected';
+  
+  const db = await connectToDatabase();
+  await db.collection('turfs').updateOne(
+    { turfId },
+    { $set: { status, updatedAt: new Date() } }
+  );
+  catalogCache.invalidate();
+  turfRepository.invalidate(turfId);
+  
+  return json({ success: true, message: `Turf ${status}` });
+}
+
+// POST /api/admin/vendors/toggle-active - Toggle vendor active status
+async function toggleVendorActive(request) {
+  const body = await request.json();
+  const { vendorId, isActive } = body;
+  
+  if (!vendorId || isActive === undefined) {
+    return json({ error: 'Missing required fields' }, { status: 400 });
+  }
+  
+  const db = await connectToDatabase();
+  await db.collection('vendors').updateOne(
+    { vendorId },
+    { $set: { isActive, updatedAt: new Date() } }
+  );
+  catalogCache.invalidate();
+  
+  return json({ 
+    success: true, 
+    message: `Vendor ${isActive ? 'activated' : 'deactivated'}` 
+  });
+}
+
+// Booking throughput for /api/metrics
+const orderResults = metrics.counter(
+  'turfhub_orders_total', 'Create-order calls by result: created, conflict or gateway_unavailable', ['result']);
+const bookingSlots = metrics.counter(
+  'turfhub_booking_slots_total', 'Slots held by created orders and confirmed by verified payments', ['status']);
+const paymentResults = metrics.counter(
+  'turfhub_payment_verifications_total', 'Payment verifications by result: confirmed, expired or invalid_signature',
+  ['result']);
+
+// POST /api/payment/create-order - Create Razorpay order
+async function createOrder(request) {
+  const user = verifyToken(request);
+  if (!user) {
+    return json({ error: 'Unauthorized' }, { status: 401 });
+  }
+  
+  const body = await request.json();
+  const { turfId, slots, amount } = body;
+  
+  if (!turfId || !slots || !Array.isArray(slots) || slots.length === 0 || !amount) {
+    return json({ error: 'Missing required fields' }, { status: 400 });
+  }
+  
+  // Price every slot from the turf's template; the client's total must match
+  const turf = await findBookableTurf(turfId);
+  if (!turf) {
+    return json({ error: 'Turf not found' }, { status: 404 });
+  }
+  const template = slotTemplateOf(turf);
+  const prices = slots.map(slotInfo => slotPrice(template, slotInfo?.date, slotInfo?.slotId));
+  const unknownSlots = slots.filter((slotInfo, index) => prices[index] === null).map(slotInfo => slotInfo?.slotId);
+  if (unknownSlots.length > 0) {
+    return json({ error: 'Slot not offered by this turf', unknownSlots }, { status: 400 });
+  }
+  const total = prices.reduce((sum, price) => sum + price, 0);
+  if (Math.round(Number(amount) * 100) !== Math.round(total * 100)) {
+    return json({ error: 'Amount does not match the slot prices', expectedAmount: total }, { status: 400 });
+  }
+  
+  // Reserve every slot in one insertMany; the active-slot unique index
+  // rejects slots someone else already holds
+  const db = await connectToDatabase();
+  const createdAt = new Date();
+  const expiresAt = holdExpiry(createdAt);
+  const bookings = slots.map((slotInfo, index) => ({
+    bookingId: uuidv4(),
+    userId: user.userId,
+    turfId,
+    slotId: slotInfo.slotId,
+    date: slotInfo.date,
+    amount: prices[index],
+    orderId: null,
+    status: 'pending',
+    active: true,
+    createdAt,
+    expiresAt // Slots are released if payment is not verified by then
+  }));
+  const bookingIds = bookings.map(b => b.bookingId);
+  
+  const unavailableSlots = await reserveSlots(db, bookings);
+  if (unavailableSlots.length > 0) {
+    orderResults.inc({ result: 'conflict' });
+    return json({ 
+      error: 'Slot already booked',
+      unavailableSlots
+    }, { status: 409 });
+  }
+  // Mark the hold before the slow gateway call, so availability reads stop
+  // offering these slots as soon as they are ours
+  await markPending(db, turfId, slots, expiresAt);
+  
+  // Create the gateway order only once the slots are ours; the call is
+  // bounded, so a slow provider costs at most the timeout per request
+  const options = {
+    amount: Math.round(total * 100), // Convert to paise
+    currency: 'INR',
+    receipt: `receipt_${Date.now()}`,
+    notes: {
+      turfId,
+      userId: user.userId,
+      slotsCount: slots.length
+    }
+  };
+  
+  let order;
+  try {
+    order = await paymentGateway.createOrder(options);
+  } catch (error) {
+    // Free the slots again if the order could not be created; bits first, so
+    // a new hold taken once the bookings are released keeps its own bits
+    await clearPending(db, turfId, slots);
+    await releaseBookings(db, bookingIds);
+    if (error instanceof PaymentGatewayError) {
+      orderResults.inc({ result: 'gateway_unavailable' });
+      return json(
+        { error: error.message },
+        { status: 503, headers: { 'Retry-After': String(error.retryAfterSeconds) } }
       );
-      
-      return NextResponse.json({ 
-        success: true, 
-        message: `Vendor ${isActive ? 'activated' : 'deactivated'}` 
-      });
     }
+    throw error;
+  }
+  
+  await db.collection('bookings').updateMany(
+    { bookingId: { $in: bookingIds } },
+    { $set: { orderId: order.id } }
+  );
+  orderResults.inc({ result: 'created' });
+  bookingSlots.inc({ status: 'held' }, bookings.length);
+  
+  return json({ 
+    orderId: order.id,
+    amount: order.amount,
+    currency: order.currency,
+    bookingIds,
+    expiresAt
+  });
+}
 
-    // POST /api/payment/create-order - Create Razorpay order
-    if (pathname === '/api/payment/create-order') {
-      const user = verifyToken(request);
-      if (!user) {
-        return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+// POST /api/payment/verify - Verify payment
+async function verifyPayment(request) {
+  const user = verifyToken(request);
+  if (!user) {
+    return json({ error: 'Unauthorized' }, { status: 401 });
+  }
+  
+  const body = await request.json();
+  const { razorpay_order_id, razorpay_payment_id, razorpay_signature, bookingIds } = body;
+  
+  // Verify signature
+  if (!paymentGateway.verifySignature(razorpay_order_id, razorpay_payment_id, razorpay_signature)) {
+    paymentResults.inc({ result: 'invalid_signature' });
+    return json({ error: 'Invalid signature' }, { status: 400 });
+  }
+  
+  // Update all booking statuses
+  const db = await connectToDatabase();
+  
+  if (Array.isArray(bookingIds)) {
+    // Multiple bookings
+    await db.collection('bookings').updateMany(
+      { bookingId: { $in: bookingIds }, userId: user.userId, active: true },
+      { 
+        $set: { 
+          status: 'confirmed',
+          paymentId: razorpay_payment_id,
+          confirmedAt: new Date()
+        } 
       }
-      
-      const body = await request.json();
-      const { turfId, slots, amount } = body;
-      
-      if (!turfId || !slots || !Array.isArray(slots) || slots.length === 0 || !amount) {
-        return NextResponse.json({ error: 'Missing required fields' }, { status: 400 });
+    );
+  } else {
+    // Single booking (backward compatibility)
+    await db.collection('bookings').updateOne(
+      { bookingId: bookingIds, userId: user.userId, active: true },
+      { 
+        $set: { 
+          status: 'confirmed',
+          paymentId: razorpay_payment_id,
+          confirmedAt: new Date()
+        } 
       }
-      
-      // Create Razorpay order
-      const options = {
-        amount: amount * 100, // Convert to paise
-        currency: 'INR',
-        receipt: `receipt_${Date.now()}`,
-        notes: {
-          turfId,
-          userId: user.userId,
-          slotsCount: slots.length
-        }
-      };
-      
-      const order = await razorpay.orders.create(options);
-      
-      // Store bookings as pending for all slots
-      const db = await connectToDatabase();
-      const bookingIds = [];
-      
-      for (const slotInfo of slots) {
-        const bookingId = uuidv4();
-        bookingIds.push(bookingId);
-        
-        await db.collection('bookings').insertOne({
-          bookingId,
-          userId: user.userId,
-          turfId,
-          slotId: slotInfo.slotId,
-          date: slotInfo.date,
-          amount: amount / slots.length, // Divide amount evenly
-          orderId: order.id,
-          status: 'pending',
-          createdAt: new Date()
-        });
+    );
+  }
+  
+  const bookings = await db.collection('bookings')
+    .find({ 
+      bookingId: Array.isArray(bookingIds) ? { $in: bookingIds } : bookingIds 
+    })
+    .toArray();
+  
+  const confirmed = bookings.filter(b => b.status === 'confirmed');
+  await markConfirmed(db, confirmed);
+  bookingSlots.inc({ status: 'confirmed' }, confirmed.length);
+  
+  // Holds released by the reaper are not confirmed; the slot may already be someone else's
+  const expiredBookingIds = bookings.filter(b => b.status === 'expired').map(b => b.bookingId);
+  paymentResults.inc({ result: expiredBookingIds.length > 0 ? 'expired' : 'confirmed' });
+  if (expiredBookingIds.length > 0) {
+    // The customer was charged for these: record the payment for a refund and
+    // drop expiredAt so the TTL index keeps them until then
+    const paidAt = new Date();
+    await db.collection('bookings').updateMany(
+      { bookingId: { $in: expiredBookingIds }, userId: user.userId, status: 'expired' },
+      { $set: { paymentId: razorpay_payment_id, paidAfterExpiry: true, paidAt }, $unset: { expiredAt: '' } }
+    );
+    for (const booking of bookings) {
+      if (booking.status === 'expired' && booking.userId === user.userId) {
+        Object.assign(booking, { paymentId: razorpay_payment_id, paidAfterExpiry: true, paidAt });
+        delete booking.expiredAt;
       }
-      
-      return NextResponse.json({ 
-        orderId: order.id,
-        amount: order.amount,
-        currency: order.currency,
-        bookingIds
-      });
     }
+    console.error('Payment verified for expired holds:', razorpay_payment_id, expiredBookingIds);
+    return json({ 
+      error: 'Booking hold expired',
+      expiredBookingIds,
+      bookings
+    }, { status: 409 });
+  }
+  
+  return json({ 
+    success: true,
+    bookings
+  });
+}
 
-    // POST /api/payment/verify - Verify payment
-    if (pathname === '/api/payment/verify') {
-      const user = verifyToken(request);
-      if (!user) {
-        return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
-      }
-      
-      const body = await request.json();
-      const { razorpay_order_id, razorpay_payment_id, razorpay_signature, bookingIds } = body;
-      
-      // Verify signature
-      const sign = razorpay_order_id + '|' + razorpay_payment_id;
-      const expectedSign = crypto
-        .createHmac('sha256', process.env.RAZORPAY_KEY_SECRET)
-        .update(sign.toString())
-        .digest('hex');
-      
-      if (razorpay_signature !== expectedSign) {
-        return NextResponse.json({ error: 'Invalid signature' }, { status: 400 });
-      }
-      
-      // Update all booking statuses
-      const db = await connectToDatabase();
-      
-      if (Array.isArray(bookingIds)) {
-        // Multiple bookings
-        await db.collection('bookings').updateMany(
-          { bookingId: { $in: bookingIds }, userId: user.userId },
-          { 
-            $set: { 
-              status: 'confirmed',
-              paymentId: razorpay_payment_id,
-              confirmedAt: new Date()
-            } 
-          }
-        );
-      } else {
-        // Single booking (backward compatibility)
-        await db.collection('bookings').updateOne(
-          { bookingId: bookingIds, userId: user.userId },
-          { 
-            $set: { 
-              status: 'confirmed',
-              paymentId: razorpay_payment_id,
-              confirmedAt: new Date()
-            } 
-          }
-        );
-      }
-      
-      const bookings = await db.collection('bookings')
-        .find({ 
-          bookingId: Array.isArray(bookingIds) ? { $in: bookingIds } : bookingIds 
-        })
-        .toArray();
-      
-      return NextResponse.json({ 
-        success: true,
-        bookings
-      });
+// PUT /api/profile - Update user profile
+async function updateProfile(request) {
+  const user = verifyToken(request);
+  if (!user) {
+    return json({ error: 'Unauthorized' }, { status: 401 });
+  }
+  
+  const body = await request.json();
+  const { name, email, dob } = body;
+  
+  const db = await connectToDatabase();
+  await db.collection('users').updateOne(
+    { userId: user.userId },
+    { 
+      $set: { 
+        name: name || '',
+        email: email || '',
+        dob: dob || '',
+        updatedAt: new Date()
+      } 
+    }
+  );
+  
+  const updatedUser = await db.collection('users').findOne({ userId: user.userId });
+  
+  return json({ 
+    success: true,
+    user: {
+      userId: updatedUser.userId,
+      mobile: updatedUser.mobile,
+      name: updatedUser.name || '',
+      email: updatedUser.email || '',
+      dob: updatedUser.dob || ''
     }
+  });
+}
 
-    return NextResponse.json({ error: 'Not found' }, { status: 404 });
-  } catch (error) {
-    console.error('POST Error:', error);
-    return NextResponse.json({ error: error.message }, { status: 500 });
+// PUT /api/vendor/profile - Update vendor profile
+async function updateVendorProfile(request) {
+  const vendor = verifyVendorToken(request);
+  if (!vendor) {
+    return json({ error: 'Unauthorized' }, { status: 401 });
   }
+  
+  const body = await request.json();
+  const { businessName, ownerName, email, gst, pan, bankDetails } = body;
+  
+  const db = await connectToDatabase();
+  const updateData = {};
+  if (businessName) updateData.businessName = businessName;
+  if (ownerName) updateData.ownerName = ownerName;
+  if (email) updateData.email = email;
+  if (gst) updateData.gst = gst;
+  if (pan) updateData.pan = pan;
+  if (bankDetails) updateData.bankDetails = bankDetails;
+  updateData.updatedAt = new Date();
+  
+  await db.collection('vendors').updateOne(
+    { vendorId: vendor.vendorId },
+    { $set: updateData }
+  );
+  
+  const updatedVendor = await db.collection('vendors').findOne({ vendorId: vendor.vendorId });
+  
+  return json({ 
+    success: true,
+    vendor: {
+      vendorId: updatedVendor.vendorId,
+      businessName: updatedVendor.businessName,
+      ownerName: updatedVendor.ownerName,
+      mobile: updatedVendor.mobile,
+      email: updatedVendor.email,
+      gst: updatedVendor.gst,
+      pan: updatedVendor.pan,
+      status: updatedVendor.status
+    }
+  });
 }
 
-export async function PUT(request) {
-  const { pathname } = new URL(request.url);
+// PUT /api/vendor/turfs/:id - Update turf
+async function updateVendorTurf(request, { params }) {
+  const vendor = verifyVendorToken(request);
+  if (!vendor) {
+    return json({ error: 'Unauthorized' }, { status: 401 });
+  }
+  
+  const { turfId } = params;
+  const body = await request.json();
+  const slotsError = customSlotsError(body.customSlots);
+  if (slotsError) {
+    return json({ error: slotsError }, { status: 400 });
+  }
+  
+  const db = await connectToDatabase();
+  const turf = await db.collection('turfs').findOne({ turfId, vendorId: vendor.vendorId });
+  
+  if (!turf) {
+    return json({ error: 'Turf not found' }, { status: 404 });
+  }
+  
+  const updateData = { ...body, updatedAt: new Date() };
+  delete updateData.vendorId; // Prevent changing vendor
+  delete updateData.turfId; // Prevent changing ID
+  delete updateData.status; // Prevent changing status directly
+  // Recompile the slot template from the turf as it will be after the update
+  updateData.slotTemplate = compileSlotTemplate({ ...turf, ...updateData });
+  
+  await db.collection('turfs').updateOne(
+    { turfId, vendorId: vendor.vendorId },
+    { $set: updateData }
+  );
+  catalogCache.invalidate();
+  turfRepository.invalidate(turfId);
+  
+  const updatedTurf = await db.collection('turfs').findOne({ turfId }, WITHOUT_TEMPLATE);
+  
+  return json({ 
+    success: true,
+    message: 'Turf updated successfully',
+    turf: updatedTurf
+  });
+}
 
-  try {
-    // PUT /api/profile - Update user profile
-    if (pathname === '/api/profile') {
-      const user = verifyToken(request);
-      if (!user) {
-        return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
-      }
-      
-      const body = await request.json();
-      const { name, email, dob } = body;
-      
-      const db = await connectToDatabase();
-      await db.collection('users').updateOne(
-        { userId: user.userId },
-        { 
-          $set: { 
-            name: name || '',
-            email: email || '',
-            dob: dob || '',
-            updatedAt: new Date()
-          } 
-        }
-      );
-      
-      const updatedUser = await db.collection('users').findOne({ userId: user.userId });
-      
-      return NextResponse.json({ 
-        success: true,
-        user: {
-          userId: updatedUser.userId,
-          mobile: updatedUser.mobile,
-          name: updatedUser.name || '',
-          email: updatedUser.email || '',
-          dob: updatedUser.dob || ''
-        }
-      });
-    }
+// Method + path -> handler; see lib/router.js
+const router = createRouter([
+  ['GET', '/api', apiIndex],
+  ['GET', '/api/health', getHealth],
+  ['GET', '/api/metrics', getMetrics],
+  ['GET', '/api/bootstrap', getBootstrap],
+  ['GET', '/api/turfs', listTurfs],
+  ['GET', '/api/turfs/:turfId', getTurf],
+  ['GET', '/api/slots/:turfId/range', getSlotRange],
+  ['GET', '/api/slots/:turfId/stream', streamSlots],
+  ['GET', '/api/slots/:turfId', getSlots],
+  ['GET', '/api/cities', listCities],
+  ['GET', '/api/sports', listSports],
+  ['GET', '/api/bookings', listBookings],
+  ['GET', '/api/admin/vendors', listAllVendors],
+  ['GET', '/api/admin/turfs', listAllTurfs],
+  ['GET', '/api/vendor/profile', getVendorProfile],
+  ['GET', '/api/vendor/turfs', listVendorTurfs],
+  ['GET', '/api/vendor/turfs/:turfId', getVendorTurf],
+  ['POST', '/api/auth/send-otp', sendOtp],
+  ['POST', '/api/auth/verify-otp', verifyOtp],
+  ['POST', '/api/vendor/register', registerVendor],
+  ['POST', '/api/vendor/send-otp', sendVendorOtp],
+  ['POST', '/api/vendor/verify-otp', verifyVendorOtp],
+  ['POST', '/api/vendor/turfs', createVendorTurf],
+  ['POST', '/api/admin/vendors/approve', approveVendor],
+  ['POST', '/api/admin/turfs/approve', approveTurf],
+  ['POST', '/api/admin/vendors/toggle-active', toggleVendorActive],
+  ['POST', '/api/payment/create-order', createOrder],
+  ['POST', '/api/payment/verify', verifyPayment],
+  ['PUT', '/api/profile', updateProfile],
+  ['PUT', '/api/vendor/profile', updateVendorProfile],
+  ['PUT', '/api/vendor/turfs/:turfId', updateVendorTurf]
+]);
 
-    // PUT /api/vendor/profile - Update vendor profile
-    if (pathname === '/api/vendor/profile') {
-      const vendor = verifyVendorToken(request);
-      if (!vendor) {
-        return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
-      }
-      
-      const body = await request.json();
-      const { businessName, ownerName, email, gst, pan, bankDetails } = body;
-      
-      const db = await connectToDatabase();
-      const updateData = {};
-      if (businessName) updateData.businessName = businessName;
-      if (ownerName) updateData.ownerName = ownerName;
-      if (email) updateData.email = email;
-      if (gst) updateData.gst = gst;
-      if (pan) updateData.pan = pan;
-      if (bankDetails) updateData.bankDetails = bankDetails;
-      updateData.updatedAt = new Date();
-      
-      await db.collection('vendors').updateOne(
-        { vendorId: vendor.vendorId },
-        { $set: updateData }
-      );
-      
-      const updatedVendor = await db.collection('vendors').findOne({ vendorId: vendor.vendorId });
-      
-      return NextResponse.json({ 
-        success: true,
-        vendor: {
-          vendorId: updatedVendor.vendorId,
-          businessName: updatedVendor.businessName,
-          ownerName: updatedVendor.ownerName,
-          mobile: updatedVendor.mobile,
-          email: updatedVendor.email,
-          gst: updatedVendor.gst,
-          pan: updatedVendor.pan,
-          status: updatedVendor.status
-        }
-      });
-    }
+// Per-route request metrics, labelled by pattern so ids in paths never become series
+const httpRequests = metrics.counter(
+  'turfhub_http_requests_total', 'API requests by route pattern and status', ['method', 'route', 'status']);
+const httpSeconds = metrics.histogram(
+  'turfhub_http_request_duration_seconds', 'API request latency; streams are timed to the first byte',
+  ['method', 'route']);
+const httpUnhandled = metrics.counter(
+  'turfhub_http_unhandled_errors_total', 'Handler exceptions answered with a 500', ['method', 'route']);
+const httpInFlight = metrics.gauge('turfhub_http_requests_in_flight', 'Requests being handled');
 
-    // PUT /api/vendor/turfs/:id - Update turf
-    if (pathname.startsWith('/api/vendor/turfs/')) {
-      const vendor = verifyVendorToken(request);
-      if (!vendor) {
-        return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
-      }
-      
-      const turfId = pathname.split('/').pop();
-      const body = await request.json();
-      
-      const db = await connectToDatabase();
-      const turf = await db.collection('turfs').findOne({ turfId, vendorId: vendor.vendorId });
-      
-      if (!turf) {
-        return NextResponse.json({ error: 'Turf not found' }, { status: 404 });
+async function handle(method, request) {
+  const { pathname, searchParams } = new URL(request.url);
+  const route = router.match(method, pathname);
+  const routeLabel = route ? route.pattern : 'unmatched';
+
+  httpInFlight.inc();
+  const { result: response, timing } = await timeRequest(async () => {
+    try {
+      if (!route) {
+        return json({ error: 'Not found' }, { status: 404 });
       }
-      
-      const updateData = { ...body, updatedAt: new Date() };
-      delete updateData.vendorId; // Prevent changing vendor
-      delete updateData.turfId; // Prevent changing ID
-      delete updateData.status; // Prevent changing status directly
-      
-      await db.collection('turfs').updateOne(
-        { turfId, vendorId: vendor.vendorId },
-        { $set: updateData }
-      );
-      
-      const updatedTurf = await db.collection('turfs').findOne({ turfId });
-      
-      return NextResponse.json({ 
-        success: true,
-        message: 'Turf updated successfully',
-        turf: updatedTurf
-      });
+      return await route.handler(request, { params: route.params, searchParams });
+    } catch (error) {
+      console.error(`${method} Error:`, error);
+      httpUnhandled.inc({ method, route: routeLabel });
+      return json({ error: error.message }, { status: 500 });
     }
+  });
+  httpInFlight.dec();
+  response.headers.set('Server-Timing', serverTimingHeader(timing));
+  logTiming({ method, path: pathname, handler: route?.handler.name, status: response.status }, timing);
+  httpRequests.inc({ method, route: routeLabel, status: response.status });
+  httpSeconds.observe({ method, route: routeLabel }, timing.totalMs / 1000);
+  return response;
+}
 
-    return NextResponse.json({ error: 'Not found' }, { status: 404 });
-  } catch (error) {
-    console.error('PUT Error:', error);
-    return NextResponse.json({ error: error.message }, { status: 500 });
-  }
+export async function GET(request) {
+  return handle('GET', request);
+}
+
+export async function POST(request) {
+  return handle('POST', request);
+}
+
+export async function PUT(request) {
+  return handle('PUT', request);
 }
 
 export async function DELETE(request) {
-  return NextResponse.json({ error: 'Method not implemented' }, { status: 501 });
+  return json({ error: 'Method not implemented' }, { status: 501 });
 }
\ No newline at end of file
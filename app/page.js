@@ -43,11 +43,9 @@ const App = () => {
     }
   }, []);
 
-  // Load cities and turfs
+  // Load cities, sports and turfs in one request
   useEffect(() => {
-    loadCities();
-    loadSports();
-    loadTurfs('All', 'All');
+    loadBootstrap();
   }, []);
 
   // Get user's location
@@ -82,23 +80,15 @@ const App = () => {
     setSelectedDate(dates[0]);
   }, []);
 
-  const loadCities = async () => {
+  const loadBootstrap = async () => {
     try {
-      const response = await fetch('/api/cities');
+      const response = await fetch('/api/bootstrap');
       const data = await response.json();
       setCities(data.cities);
-    } catch (error) {
-      console.error('Error loading cities:', error);
-    }
-  };
-
-  const loadSports = async () => {
-    try {
-      const response = await fetch('/api/sports');
-      const data = await response.json();
       setSports(data.sports || ['All']);
+      setTurfs(data.turfs);
     } catch (error) {
-      console.error('Error loading sports:', error);
+      console.error('Error loading turfs:', error);
     }
   };
 
@@ -129,9 +119,22 @@ const App = () => {
   };
 
   const handleTurfClick = async (turf) => {
-    setSelectedTurf(turf);
+    // List cards only carry the grid's fields; show the card while the full turf loads
+    setSelectedTurf({ ...turf, images: turf.image ? [turf.image] : [] });
     setShowTurfDetails(true);
-    await loadSlots(turf.id, selectedDate);
+    await Promise.all([loadTurfDetails(turf.id), loadSlots(turf.id, selectedDate)]);
+  };
+
+  const loadTurfDetails = async (turfId) => {
+    try {
+      const response = await fetch(`/api/turfs/${turfId}`);
+      const data = await response.json();
+      if (data.turf) {
+        setSelectedTurf(current => (current && current.id === turfId ? data.turf : current));
+      }
+    } catch (error) {
+      console.error('Error loading turf details:', error);
+    }
   };
 
   const loadSlots = async (turfId, date) => {
@@ -144,6 +147,24 @@ const App = () => {
     }
   };
 
+  // While the details dialog is open, keep the day's slots live: the server
+  // pushes every slot that is taken or freed, so nobody has to refresh
+  useEffect(() => {
+    if (!showTurfDetails || !selectedTurf?.id || !selectedDate || typeof EventSource === 'undefined') {
+      return undefined;
+    }
+    const source = new EventSource(`/api/slots/${selectedTurf.id}/stream?date=${selectedDate}`);
+    // The snapshot is the state the pushed changes apply to
+    source.addEventListener('snapshot', (event) => setSlots(JSON.parse(event.data).slots));
+    source.addEventListener('slots', (event) => {
+      const changed = new Map(JSON.parse(event.data).slots.map(slot => [slot.id, slot.available]));
+      setSlots(current => current.map(slot =>
+        changed.has(slot.id) ? { ...slot, available: changed.get(slot.id) } : slot
+      ));
+    });
+    return () => source.close();
+  }, [showTurfDetails, selectedTurf?.id, selectedDate]);
+
   const handleDateChange = async (date) => {
     setSelectedDate(date);
     if (selectedTurf) {
@@ -151,6 +172,10 @@ const App = () => {
     }
   };
 
+  // Slots are priced by time band and day type, so totals add up each slot
+  const slotsTotal = (slotList) =>
+    slotList.reduce((total, slot) => total + (slot.price ?? selectedTurf.pricePerHour), 0);
+
   const handleSlotSelect = (slot) => {
     if (!slot.available) {
       toast.error('This slot is already booked');
@@ -252,7 +277,7 @@ const App = () => {
 
     try {
       const token = localStorage.getItem('token');
-      const totalAmount = selectedSlots.length * selectedTurf.pricePerHour;
+      const totalAmount = slotsTotal(selectedSlots);
       
       const response = await fetch('/api/payment/create-order', {
         method: 'POST',
@@ -270,6 +295,15 @@ const App = () => {
       const data = await response.json();
       if (data.orderId) {
         openRazorpay(data);
+      } else if (response.status === 409) {
+        // Someone else took the slot first - drop it and show fresh availability
+        const taken = new Set(data.unavailableSlots || []);
+        setSelectedSlots(selectedSlots.filter(s => !taken.has(s.id)));
+        toast.error('Sorry, that slot was just booked by someone else');
+        await loadSlots(selectedTurf.id, selectedDate);
+      } else if (response.status === 503) {
+        // The slots were released again; the customer can simply retry
+        toast.error('Payments are temporarily unavailable. Please try again in a moment.');
       } else {
         toast.error(data.error || 'Failed to create order');
       }
@@ -280,7 +314,7 @@ const App = () => {
   };
 
   const openRazorpay = (orderData) => {
-    const totalAmount = selectedSlots.length * selectedTurf.pricePerHour;
+    const totalAmount = slotsTotal(selectedSlots);
     
     const options = {
       key: process.env.NEXT_PUBLIC_RAZORPAY_KEY_ID,
@@ -328,6 +362,10 @@ const App = () => {
         setSelectedSlots([]);
         // Reload slots to show updated availability
         await loadSlots(selectedTurf.id, selectedDate);
+      } else if (response.status === 409) {
+        toast.error('Your slot hold expired before payment completed. Please contact support for a refund.');
+        setSelectedSlots([]);
+        await loadSlots(selectedTurf.id, selectedDate);
       } else {
         toast.error('Payment verification failed');
       }
@@ -505,7 +543,7 @@ const App = () => {
             <Card key={turf.id} className="hover:shadow-xl transition-shadow cursor-pointer overflow-hidden group" onClick={() => handleTurfClick(turf)}>
               <div className="relative h-48 overflow-hidden">
                 <img 
-                  src={turf.images[0]} 
+                  src={turf.image} 
                   alt={turf.name} 
                   className="w-full h-full object-cover group-hover:scale-110 transition-transform duration-300"
                 />
@@ -674,7 +712,7 @@ const App = () => {
                           >
                             <div className="text-center">
                               <div className="font-semibold">{slot.time}</div>
-                              <div className="text-xs text-gray-500">₹{selectedTurf.pricePerHour}</div>
+                              <div className="text-xs text-gray-500">₹{slot.price ?? selectedTurf.pricePerHour}</div>
                             </div>
                           </Button>
                         );
@@ -722,7 +760,7 @@ const App = () => {
                           <div>
                             <div className="text-sm text-gray-600">Total Amount</div>
                             <div className="text-2xl font-bold text-green-700">
-                              ₹{selectedSlots.length * selectedTurf.pricePerHour}
+                              ₹{slotsTotal(selectedSlots)}
                             </div>
                           </div>
                           <Button 
@@ -1,15 +1,20 @@
 #!/usr/bin/env python3
 
-import requests
 import json
 import os
+import random
+import threading
 from datetime import datetime, timedelta
+from tests.http_client import ApiClient
+from tests.stand_in_server import start_if_requested
 
 # Configuration
-BASE_URL = "https://turf-hub-1.preview.emergentagent.com/api"
 TEST_MOBILE = "7777777777"  # Using the specific mobile from test scenario
 TEST_OTP = "123456"
 
+# Shared keep-alive client for every API call in this script
+api = ApiClient()
+
 def log_test(test_name, success, details=""):
     """Log test results"""
     status = "✅ PASS" if success else "❌ FAIL"
@@ -24,7 +29,7 @@ def login_and_get_token():
         print("🔐 Testing Login Process...")
         
         # Send OTP
-        otp_response = requests.post(f"{BASE_URL}/auth/send-otp", 
+        otp_response = api.post("/auth/send-otp", 
                                    json={"mobile": TEST_MOBILE})
         
         if otp_response.status_code != 200:
@@ -34,7 +39,7 @@ def login_and_get_token():
         log_test("OTP Send for Profile Test", True, f"OTP sent successfully for {TEST_MOBILE}")
             
         # Verify OTP and get token
-        verify_response = requests.post(f"{BASE_URL}/auth/verify-otp",
+        verify_response = api.post("/auth/verify-otp",
                                       json={"mobile": TEST_MOBILE, "otp": TEST_OTP})
         
         if verify_response.status_code != 200:
@@ -62,7 +67,7 @@ def test_get_bookings_empty(token):
         print("📋 Testing GET /api/bookings...")
         
         headers = {"Authorization": f"Bearer {token}"}
-        response = requests.get(f"{BASE_URL}/bookings", headers=headers)
+        response = api.get("/bookings", headers=headers)
         
         if response.status_code != 200:
             log_test("GET Bookings API", False, f"Failed to get bookings: {response.status_code} - {response.text}")
@@ -114,17 +119,24 @@ def test_create_booking_and_verify_history(token):
         # Get tomorrow's date for booking
         tomorrow = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
         
+        # Slots can only be held once, so take tomorrow's first free slot on turf-002
+        slots_response = api.get(f"/slots/turf-002?date={tomorrow}")
+        free_slots = [s["id"] for s in slots_response.json().get("slots", []) if s.get("available")]
+        if not free_slots:
+            log_test("Test Booking Creation", False, f"No free slots on turf-002 for {tomorrow}")
+            return None, None
+        
         # Create booking using POST /api/payment/create-order with turf-002
         order_data = {
             "turfId": "turf-002",
             "slots": [
-                {"slotId": f"slot-{tomorrow}-15", "date": tomorrow}  # 3 PM slot
+                {"slotId": free_slots[0], "date": tomorrow}
             ],
             "amount": 2000
         }
         
         # Create order
-        create_response = requests.post(f"{BASE_URL}/payment/create-order",
+        create_response = api.post("/payment/create-order",
                                      headers=headers, json=order_data)
         
         if create_response.status_code != 200:
@@ -141,7 +153,7 @@ def test_create_booking_and_verify_history(token):
         log_test("Test Booking Creation", True, f"Booking created successfully with ID: {booking_ids[0]}")
         
         # Get bookings again to verify the new booking appears
-        get_response = requests.get(f"{BASE_URL}/bookings", headers=headers)
+        get_response = api.get("/bookings", headers=headers)
         
         if get_response.status_code != 200:
             log_test("Verify Booking in History", False, f"Failed to get updated bookings: {get_response.text}")
@@ -244,7 +256,7 @@ def test_date_filtering_verification(token):
         tomorrow = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
         
         # Test today's slots - should only return future slots
-        today_response = requests.get(f"{BASE_URL}/slots/turf-001?date={today}")
+        today_response = api.get(f"/slots/turf-001?date={today}")
         
         if today_response.status_code != 200:
             log_test("Today Slots API", False, f"Failed to get today's slots: {today_response.text}")
@@ -274,7 +286,7 @@ def test_date_filtering_verification(token):
             log_test("Today Slots Filtering", True, f"Only future slots returned for today ({future_slots_count} slots)")
         
         # Test tomorrow's slots - should return all slots (6 AM - 11 PM = 17 slots)
-        tomorrow_response = requests.get(f"{BASE_URL}/slots/turf-001?date={tomorrow}")
+        tomorrow_response = api.get(f"/slots/turf-001?date={tomorrow}")
         
         if tomorrow_response.status_code != 200:
             log_test("Tomorrow Slots API", False, f"Failed to get tomorrow's slots: {tomorrow_response.text}")
@@ -310,6 +322,96 @@ def test_date_filtering_verification(token):
         log_test("Date Filtering Verification", False, f"Exception: {str(e)}")
         return False
 
+def create_far_future_order(headers):
+    """Book one random slot a year or more out so concurrent runs never collide"""
+    date = (datetime.now() + timedelta(days=random.randint(365, 730))).strftime("%Y-%m-%d")
+    # Mock turfs are priced per hour, and the amount must match
+    turf_id, price = random.choice([("turf-001", 1500), ("turf-002", 2000), ("turf-003", 1200)])
+    order_data = {
+        "turfId": turf_id,
+        "slots": [{"slotId": f"slot-{date}-{random.randint(6, 22)}", "date": date}],
+        "amount": price
+    }
+    response = api.post("/payment/create-order", headers=headers, json=order_data)
+    return response.json().get("bookingIds", []) if response.status_code == 200 else []
+
+def test_booking_pagination(token, page_size=3, concurrent_orders=6):
+    """Test Scenario 5: Walk GET /api/bookings page by page while new bookings arrive"""
+    try:
+        print("📄 Testing Booking History Pagination...")
+        
+        headers = {"Authorization": f"Bearer {token}"}
+        
+        # Make sure there are several pages to walk
+        for _ in range(page_size * 2):
+            create_far_future_order(headers)
+        
+        full_response = api.get("/bookings", headers=headers)
+        if full_response.status_code != 200:
+            log_test("Pagination Baseline", False, f"Status code: {full_response.status_code}")
+            return False
+        existing_ids = [b["bookingId"] for b in full_response.json().get("bookings", [])]
+        
+        # Insert new bookings while the pages are being walked
+        stop = threading.Event()
+        inserted = []
+        
+        def insert_orders():
+            for _ in range(concurrent_orders):
+                if stop.is_set():
+                    break
+                inserted.extend(create_far_future_order(headers))
+        
+        writer = threading.Thread(target=insert_orders)
+        writer.start()
+        
+        seen = []
+        pages = 0
+        cursor = None
+        try:
+            while True:
+                path = f"/bookings?limit={page_size}" + (f"&cursor={cursor}" if cursor else "")
+                response = api.get(path, headers=headers)
+                if response.status_code != 200:
+                    log_test("Pagination Walk", False, f"Page {pages + 1} status code: {response.status_code}")
+                    return False
+                data = response.json()
+                page = data.get("bookings", [])
+                if len(page) > page_size:
+                    log_test("Pagination Page Size", False, f"Page {pages + 1} has {len(page)} bookings")
+                    return False
+                seen.extend(b["bookingId"] for b in page)
+                pages += 1
+                cursor = data.get("next")
+                if not cursor:
+                    break
+        finally:
+            stop.set()
+            writer.join()
+        
+        duplicates = len(seen) - len(set(seen))
+        missing = set(existing_ids) - set(seen)
+        if duplicates:
+            log_test("Pagination No Duplicates", False, f"{duplicates} booking(s) returned twice")
+            return False
+        if missing:
+            log_test("Pagination Completeness", False, f"{len(missing)} existing booking(s) never returned")
+            return False
+        log_test("Pagination Walk", True,
+                 f"{pages} pages, {len(seen)} bookings, {len(existing_ids)} pre-existing all seen, "
+                 f"{len(inserted)} inserted concurrently, no duplicates")
+        
+        invalid_response = api.get("/bookings?limit=2&cursor=not-a-cursor", headers=headers)
+        if invalid_response.status_code != 400:
+            log_test("Pagination Invalid Cursor", False, f"Expected 400, got {invalid_response.status_code}")
+            return False
+        log_test("Pagination Invalid Cursor", True, "Malformed cursor rejected with 400")
+        return True
+        
+    except Exception as e:
+        log_test("Booking Pagination", False, f"Exception: {str(e)}")
+        return False
+
 def main():
     """Main test execution for Profile and Booking History Features"""
     print("🚀 Starting TurfHub Profile and Booking History Tests")
@@ -352,6 +454,12 @@ def main():
     
     filtering_success = test_date_filtering_verification(token)
     
+    # Test Scenario 5: Pagination Under Concurrent Inserts
+    print("\n5️⃣  Testing Booking History Pagination")
+    print("-" * 50)
+    
+    pagination_success = test_booking_pagination(token)
+    
     # Summary
     print("\n" + "=" * 70)
     print("📊 PROFILE & BOOKING HISTORY TEST SUMMARY")
@@ -362,10 +470,11 @@ def main():
         initial_bookings is not None,
         test_booking is not None,
         enrichment_success,
-        filtering_success
+        filtering_success,
+        pagination_success
     ])
     
-    total_tests = 5
+    total_tests = 6
     
     print(f"✅ Tests Passed: {tests_passed}/{total_tests}")
     
@@ -383,9 +492,19 @@ def main():
     print("• Booking sort order (newest first)")
     print("• Date filtering - only future slots for today")
     print("• Date filtering - all slots (6 AM-11 PM) for future dates")
+    print("• Cursor pagination - no duplicates or gaps under concurrent inserts")
     
-    print(f"\n🔍 Test Environment: {BASE_URL}")
+    print(f"\n🔍 Test Environment: {api.base_url}")
     print(f"👤 Test User Mobile: {TEST_MOBILE}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    local_server = start_if_requested()
+    if local_server:
+        api.base_url = local_server.base_url
+    try:
+        main()
+    finally:
+        api.print_timings()
+        api.close()
+        if local_server:
+            local_server.stop()
\ No newline at end of file
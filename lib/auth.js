@@ -0,0 +1,83 @@
+// Bearer-token authentication shared by every route.
+//
+// Verified tokens are kept in a bounded LRU keyed by the SHA-256 of the
+// token, so a repeat request costs one hash instead of a full jwt.verify.
+// Entries are dropped at the token's `exp`; AUTH_CACHE_SIZE=0 disables the
+// cache. Each request is authenticated at most once: the result, including
+// the vendor role check, is remembered for the lifetime of the request.
+
+import crypto from 'crypto';
+import jwt from 'jsonwebtoken';
+
+const AUTH_CACHE_SIZE = parseInt(process.env.AUTH_CACHE_SIZE || '10000', 10);
+
+const ANONYMOUS = Object.freeze({ user: null, vendor: null });
+
+function tokenHash(token) {
+  return crypto.createHash('sha256').update(token).digest('base64');
+}
+
+// A Map iterates in insertion order, so re-inserting on a hit keeps the
+// least recently used entry first
+export function createTokenCache({ secret, maxEntries = AUTH_CACHE_SIZE }) {
+  const entries = new Map();   // token hash -> { claims, expiresAt }
+  const counters = { hits: 0, misses: 0 };
+
+  function verify(token) {
+    if (maxEntries <= 0) {
+      counters.misses += 1;
+      return jwt.verify(token, secret);
+    }
+    const key = tokenHash(token);
+    const entry = entries.get(key);
+    if (entry) {
+      entries.delete(key);
+      if (entry.expiresAt > Date.now()) {
+        entries.set(key, entry);
+        counters.hits += 1;
+        return entry.claims;
+      }
+    }
+
+    counters.misses += 1;
+    // Throws on a bad signature or an expired token; failures are not cached
+    const claims = jwt.verify(token, secret);
+    entries.set(key, { claims, expiresAt: claims.exp ? claims.exp * 1000 : Infinity });
+    if (entries.size > maxEntries) {
+      entries.delete(entries.keys().next().value);
+    }
+    return claims;
+  }
+
+  return { verify, size: () => entries.size, stats: () => ({ ...counters }) };
+}
+
+export function createAuth({ secret, maxEntries }) {
+  const tokens = createTokenCache({ secret, maxEntries });
+  const resolved = new WeakMap();   // request -> { user, vendor }
+
+  function resolve(request) {
+    const header = request.headers.get('authorization');
+    if (!header || !header.startsWith('Bearer ')) {
+      return ANONYMOUS;
+    }
+    try {
+      const claims = tokens.verify(header.split(' ')[1]);
+      return { user: claims, vendor: claims.role === 'vendor' ? claims : null };
+    } catch (error) {
+      return ANONYMOUS;
+    }
+  }
+
+  // { user, vendor } claims for the request; either may be null
+  function authenticate(request) {
+    let auth = resolved.get(request);
+    if (!auth) {
+      auth = resolve(request);
+      resolved.set(request, auth);
+    }
+    return auth;
+  }
+
+  return { authenticate, cacheSize: tokens.size, cacheStats: tokens.stats };
+}
@@ -0,0 +1,240 @@
+// Per-(turf, date) slot availability kept as hour bitmaps.
+//
+// One `slotAvailability` document per turf-day holds two int32 masks where
+// bit N is the slot starting at hour N: `pending` (order created, payment
+// not yet verified) and `confirmed`. A slot is free when neither bit is set.
+// Writes use $bit with upsert so concurrent orders never lose each other's
+// bits, and reads are a point lookup by _id.
+//
+// Pending bits are holds: `holdUntil.<hour>` records when the current hold
+// on that hour expires, and reads ignore a pending bit whose hold has
+// passed, so an abandoned checkout frees its slot without waiting for the
+// reaper. Bits without a holdUntil (older documents) count until reaped.
+//
+// Turf-days written before the bitmaps existed are backfilled from the
+// bookings collection on first read; OR-ing is idempotent, so a backfill
+// racing a create-order is harmless. A turf-day without bookings gets no
+// document and reads as all free, so reads of arbitrary dates never write.
+//
+// Every mask write tells the listeners registered with onAvailabilityChange()
+// which turf-days it touched; lib/feed.js uses that to push live updates.
+
+const COLLECTION = 'slotAvailability';
+
+const changeListeners = new Set();
+
+// `listener(ids)` is called with the availability ids of each mask write;
+// returns a function that removes it
+export function onAvailabilityChange(listener) {
+  changeListeners.add(listener);
+  return () => changeListeners.delete(listener);
+}
+
+function notifyChanged(ids) {
+  for (const listener of changeListeners) {
+    listener([...new Set(ids)]);
+  }
+}
+
+export function availabilityId(turfId, date) {
+  return `${turfId}|${date}`;
+}
+
+// slot-YYYY-MM-DD-H -> H
+export function slotHour(slotId) {
+  const hour = parseInt(String(slotId).split('-').pop(), 10);
+  return hour >= 0 && hour < 24 ? hour : null;
+}
+
+export function hourMask(slotIds) {
+  let mask = 0;
+  for (const slotId of slotIds) {
+    const hour = slotHour(slotId);
+    if (hour !== null) {
+      mask |= 1 << hour;
+    }
+  }
+  return mask;
+}
+
+export function isBooked(availability, hour, now = new Date()) {
+  if (!availability || hour === null) {
+    return false;
+  }
+  if ((availability.confirmed >> hour) & 1) {
+    return true;
+  }
+  if (!((availability.pending >> hour) & 1)) {
+    return false;
+  }
+  const holdUntil = availability.holdUntil?.[hour];
+  return !holdUntil || new Date(holdUntil) > now;
+}
+
+// { "<turfId>|<date>": { turfId, date, mask } } for a list of bookings/slots
+function groupByTurfDate(items) {
+  const groups = new Map();
+  for (const { turfId, date, slotId } of items) {
+    const id = availabilityId(turfId, date);
+    if (!groups.has(id)) {
+      groups.set(id, { turfId, date, slotIds: [] });
+    }
+    groups.get(id).slotIds.push(slotId);
+  }
+  return [...groups.entries()].map(([id, group]) => ({ id, ...group, mask: hourMask(group.slotIds) }));
+}
+
+function orMasks(turfId, date, update) {
+  return {
+    $bit: update,
+    $set: { updatedAt: new Date() },
+    $setOnInsert: { turfId, date }
+  };
+}
+
+// Empty operator documents are rejected by older servers, so only add $max when needed
+function withMax(update, fields) {
+  return Object.keys(fields).length > 0 ? { ...update, $max: fields } : update;
+}
+
+function holdUntilFields(slotIds, expiresAt) {
+  const fields = {};
+  for (const slotId of slotIds) {
+    const hour = slotHour(slotId);
+    if (hour !== null) {
+      fields[`holdUntil.${hour}`] = expiresAt;
+    }
+  }
+  return fields;
+}
+
+// create-order: set the pending bits of every held slot and when the hold ends
+export async function markPending(db, turfId, slots, expiresAt) {
+  const groups = groupByTurfDate(slots.map(s => ({ turfId, date: s.date, slotId: s.slotId })));
+  if (groups.length === 0) return;
+  await db.collection(COLLECTION).bulkWrite(groups.map(g => ({
+    updateOne: {
+      filter: { _id: g.id },
+      update: withMax(orMasks(g.turfId, g.date, { pending: { or: g.mask } }), holdUntilFields(g.slotIds, expiresAt)),
+      upsert: true
+    }
+  })), { ordered: false });
+  notifyChanged(groups.map(g => g.id));
+}
+
+// create-order failed after markPending: clear the bits of a hold that was
+// never handed out. The bookings still own the slots (active-slot unique
+// index), so no other hold can have set them; call this before releasing them.
+export async function clearPending(db, turfId, slots) {
+  const groups = groupByTurfDate(slots.map(s => ({ turfId, date: s.date, slotId: s.slotId })));
+  if (groups.length === 0) return;
+  await db.collection(COLLECTION).bulkWrite(groups.map(g => ({
+    updateOne: {
+      filter: { _id: g.id },
+      update: { $bit: { pending: { and: ~g.mask } }, $set: { updatedAt: new Date() } }
+    }
+  })), { ordered: false });
+  notifyChanged(groups.map(g => g.id));
+}
+
+// Reaper: clear the pending bits of expired holds. Each hour is only cleared
+// while its holdUntil has passed, so a newer hold on the same slot survives.
+export async function releasePending(db, bookings, now = new Date()) {
+  const operations = [];
+  for (const { turfId, date, slotId } of bookings) {
+    const hour = slotHour(slotId);
+    if (hour === null) continue;
+    operations.push({
+      updateOne: {
+        filter: {
+          _id: availabilityId(turfId, date),
+          $or: [
+            { [`holdUntil.${hour}`]: { $lte: now } },
+            { [`holdUntil.${hour}`]: { $exists: false } }
+          ]
+        },
+        update: { $bit: { pending: { and: ~(1 << hour) } }, $set: { updatedAt: now } }
+      }
+    });
+  }
+  if (operations.length === 0) return;
+  await db.collection(COLLECTION).bulkWrite(operations, { ordered: false });
+  notifyChanged(operations.map(op => op.updateOne.filter._id));
+}
+
+// payment/verify: move the bits of the confirmed bookings from pending to confirmed
+export async function markConfirmed(db, bookings) {
+  const groups = groupByTurfDate(bookings);
+  if (groups.length === 0) return;
+  await db.collection(COLLECTION).bulkWrite(groups.map(g => ({
+    updateOne: {
+      filter: { _id: g.id },
+      update: orMasks(g.turfId, g.date, { confirmed: { or: g.mask }, pending: { and: ~g.mask } }),
+      upsert: true
+    }
+  })), { ordered: false });
+  notifyChanged(groups.map(g => g.id));
+}
+
+// Rebuild the masks of turf-days that predate the bitmaps from their bookings.
+// Only turf-days with a booking or an existing document are written.
+async function backfill(db, turfId, dates, existing) {
+  const bookings = await db.collection('bookings')
+    .find(
+      // Pending bookings count only while they still hold their slot
+      { turfId, date: { $in: dates }, $or: [{ status: 'confirmed' }, { status: 'pending', active: true }] },
+      { projection: { _id: 0, date: 1, slotId: 1, status: 1, expiresAt: 1 } }
+    )
+    .toArray();
+
+  const masks = new Map(dates.map(date => [date, { pending: 0, confirmed: 0, holdUntil: {} }]));
+  for (const booking of bookings) {
+    const hour = slotHour(booking.slotId);
+    if (hour !== null) {
+      const mask = masks.get(booking.date);
+      mask[booking.status] |= 1 << hour;
+      if (booking.status === 'pending' && booking.expiresAt) {
+        mask.holdUntil[`holdUntil.${hour}`] = booking.expiresAt;
+      }
+    }
+  }
+
+  const written = dates.filter(date =>
+    existing.has(date) || masks.get(date).pending !== 0 || masks.get(date).confirmed !== 0);
+  if (written.length === 0) return new Map();
+
+  await db.collection(COLLECTION).bulkWrite(written.map(date => ({
+    updateOne: {
+      filter: { _id: availabilityId(turfId, date) },
+      update: withMax({
+        $bit: { pending: { or: masks.get(date).pending }, confirmed: { or: masks.get(date).confirmed } },
+        $set: { backfilled: true, updatedAt: new Date() },
+        $setOnInsert: { turfId, date }
+      }, masks.get(date).holdUntil),
+      upsert: true
+    }
+  })), { ordered: false });
+
+  const docs = await db.collection(COLLECTION)
+    .find({ _id: { $in: written.map(date => availabilityId(turfId, date)) } })
+    .toArray();
+  return new Map(docs.map(doc => [doc.date, doc]));
+}
+
+// Availability documents for one turf over `dates`, as a Map keyed by date;
+// dates without one are all free
+export async function getAvailability(db, turfId, dates) {
+  const docs = await db.collection(COLLECTION)
+    .find({ _id: { $in: dates.map(date => availabilityId(turfId, date)) } })
+    .toArray();
+  const byDate = new Map(docs.filter(doc => doc.backfilled).map(doc => [doc.date, doc]));
+  const existing = new Set(docs.map(doc => doc.date));
+
+  const missing = dates.filter(date => !byDate.has(date));
+  if (missing.length > 0) {
+    for (const [date, doc] of await backfill(db, turfId, missing, existing)) {
+      byDate.set(date, doc);
+    }
+  }
+  return byDate;
+}
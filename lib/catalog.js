@@ -0,0 +1,64 @@
+// In-process cache for the customer-facing turf catalogue.
+//
+// `load` builds the catalogue from the database; the result is kept until it
+// is invalidated by a write that changes what customers see, or until `ttlMs`
+// passes as a safety net for writes made outside this process. Concurrent
+// misses share one load, and a load that was overtaken by an invalidation is
+// returned to its callers but never stored.
+export function createCatalogCache({ load, ttlMs }) {
+  let entry = null;      // { value, expiresAt }
+  let inflight = null;   // { promise, generation }
+  let generation = 0;
+  const counters = { hits: 0, loads: 0 };
+
+  async function get() {
+    if (entry && entry.expiresAt > Date.now()) {
+      counters.hits += 1;
+      return entry.value;
+    }
+    if (inflight && inflight.generation === generation) {
+      counters.hits += 1;
+      return inflight.promise;
+    }
+
+    counters.loads += 1;
+    const loadGeneration = generation;
+    const promise = load().then(value => {
+      if (loadGeneration === generation) {
+        entry = { value, expiresAt: Date.now() + ttlMs };
+      }
+      return value;
+    }).finally(() => {
+      if (inflight && inflight.promise === promise) {
+        inflight = null;
+      }
+    });
+    inflight = { promise, generation: loadGeneration };
+    return promise;
+  }
+
+  function invalidate() {
+    generation += 1;
+    entry = null;
+  }
+
+  function stats() {
+    return { ...counters };
+  }
+
+  return { get, invalidate, stats };
+}
+
+// Group catalogue turfs by a key; `keysOf` may return several keys per turf
+export function indexBy(turfs, keysOf) {
+  const index = new Map();
+  for (const turf of turfs) {
+    for (const key of keysOf(turf) || []) {
+      if (!index.has(key)) {
+        index.set(key, []);
+      }
+      index.get(key).push(turf);
+    }
+  }
+  return index;
+}
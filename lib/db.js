@@ -0,0 +1,158 @@
+// MongoDB client shared by every route.
+//
+// One client per process: concurrent cold requests share a single in-flight
+// connect, and a failed connect is retried by the next caller. The pool is
+// sized by MONGO_MAX_POOL_SIZE / MONGO_MIN_POOL_SIZE, and a request waits at
+// most MONGO_WAIT_QUEUE_TIMEOUT_MS for a free connection. Pool activity is
+// tracked from the driver's connection pool events and reported by
+// /api/health and /api/metrics; counters are cumulative so pollers can diff
+// them. Command durations are added to the calling request's `db` timing
+// span and, for every command including background ones, to a per-command
+// histogram.
+
+import { MongoClient } from 'mongodb';
+import { metrics } from '@/lib/metrics';
+import { addSpan, currentTiming } from '@/lib/timing';
+
+export const POOL_OPTIONS = {
+  maxPoolSize: parseInt(process.env.MONGO_MAX_POOL_SIZE || '50', 10),
+  minPoolSize: parseInt(process.env.MONGO_MIN_POOL_SIZE || '5', 10),
+  waitQueueTimeoutMS: parseInt(process.env.MONGO_WAIT_QUEUE_TIMEOUT_MS || '2000', 10)
+};
+
+function createPoolStats({ maxPoolSize, minPoolSize }) {
+  const counters = { totalConnections: 0, inUse: 0, checkOuts: 0, checkOutFailures: 0, waitTimeMsTotal: 0, maxWaitMs: 0 };
+  // Check-outs are served in order, so the oldest start matches the next result
+  const waiting = [];
+
+  function finishWait(event) {
+    const started = waiting.shift();
+    const waited = event.durationMS ?? (started === undefined ? 0 : performance.now() - started);
+    counters.waitTimeMsTotal += waited;
+    counters.maxWaitMs = Math.max(counters.maxWaitMs, waited);
+  }
+
+  function attach(client) {
+    client.on('connectionCreated', () => { counters.totalConnections += 1; });
+    client.on('connectionClosed', () => { counters.totalConnections -= 1; });
+    client.on('connectionCheckOutStarted', () => { waiting.push(performance.now()); });
+    client.on('connectionCheckedOut', event => {
+      counters.inUse += 1;
+      counters.checkOuts += 1;
+      finishWait(event);
+    });
+    client.on('connectionCheckOutFailed', event => {
+      counters.checkOutFailures += 1;
+      finishWait(event);
+    });
+    client.on('connectionCheckedIn', () => { counters.inUse -= 1; });
+  }
+
+  function snapshot() {
+    return {
+      maxPoolSize,
+      minPoolSize,
+      ...counters,
+      available: Math.max(counters.totalConnections - counters.inUse, 0),
+      waitQueueSize: waiting.length,
+      waitTimeMsTotal: Math.round(counters.waitTimeMsTotal * 1000) / 1000,
+      maxWaitMs: Math.round(counters.maxWaitMs * 1000) / 1000
+    };
+  }
+
+  return { attach, snapshot };
+}
+
+const commandSeconds = metrics.histogram(
+  'turfhub_mongo_command_duration_seconds', 'MongoDB command round trips by command name', ['command']);
+const commandFailures = metrics.counter(
+  'turfhub_mongo_command_failures_total', 'MongoDB commands that returned an error', ['command']);
+
+// Commands are started inside the request's async context, so the request is
+// looked up there and remembered until the command's result arrives
+function attachCommandTiming(client) {
+  const pending = new Map();   // requestId -> timing
+  client.on('commandStarted', event => {
+    const timing = currentTiming();
+    if (timing) pending.set(event.requestId, timing);
+  });
+  const finish = event => {
+    commandSeconds.observe({ command: event.commandName }, event.duration / 1000);
+    const timing = pending.get(event.requestId);
+    if (timing) {
+      pending.delete(event.requestId);
+      addSpan(timing, 'db', event.duration);
+    }
+  };
+  client.on('commandSucceeded', finish);
+  client.on('commandFailed', event => {
+    commandFailures.inc({ command: event.commandName });
+    finish(event);
+  });
+}
+
+function collectPoolMetrics(pool) {
+  const read = field => () => pool.snapshot()[field];
+  metrics.collect('turfhub_mongo_pool_connections', 'Open connections in the MongoDB pool', 'gauge',
+    () => {
+      const { inUse, available } = pool.snapshot();
+      return [[{ state: 'in_use' }, inUse], [{ state: 'available' }, available]];
+    });
+  metrics.collect('turfhub_mongo_pool_wait_queue', 'Requests waiting for a pooled connection', 'gauge',
+    read('waitQueueSize'));
+  metrics.collect('turfhub_mongo_pool_checkouts_total', 'Connection check-outs from the pool', 'counter',
+    read('checkOuts'));
+  metrics.collect('turfhub_mongo_pool_checkout_failures_total', 'Check-outs that timed out or failed', 'counter',
+    read('checkOutFailures'));
+  metrics.collect('turfhub_mongo_pool_wait_seconds_total', 'Time spent waiting for pooled connections', 'counter',
+    () => pool.snapshot().waitTimeMsTotal / 1000);
+}
+
+// `onConnect(db)` runs once per client before it is handed out (indexes, background jobs)
+export function createDatabase({ url, dbName, options = POOL_OPTIONS, onConnect = async () => {} }) {
+  const pool = createPoolStats(options);
+  collectPoolMetrics(pool);
+  let db = null;
+  let connecting = null;
+
+  async function connect() {
+    const client = new MongoClient(url, { ...options, monitorCommands: true });
+    pool.attach(client);
+    attachCommandTiming(client);
+    try {
+      await client.connect();
+      const database = client.db(dbName);
+      await onConnect(database);
+      db = database;
+      return db;
+    } catch (error) {
+      await client.close().catch(() => {});
+      throw error;
+    }
+  }
+
+  function get() {
+    if (db) {
+      return Promise.resolve(db);
+    }
+    if (!connecting) {
+      connecting = connect().finally(() => {
+        connecting = null;
+      });
+    }
+    return connecting;
+  }
+
+  // Ping round trip and pool counters; throws when the database is unreachable
+  async function health() {
+    const database = await get();
+    const started = performance.now();
+    await database.command({ ping: 1 });
+    return {
+      pingMs: Math.round((performance.now() - started) * 1000) / 1000,
+      pool: pool.snapshot()
+    };
+  }
+
+  return { get, health };
+}
@@ -0,0 +1,177 @@
+// Live slot availability: one change feed per process, fanned out to every
+// subscriber of a turf-day.
+//
+// Subscribers register per availability id (`turfId|date`). However many are
+// watching, each change is read once and every subscriber is sent only the
+// hours whose availability flipped:
+// - mask writes made by this process (create-order, payment verify, the hold
+//   reaper) are reported by lib/availability.js and re-read on the next tick,
+//   so a burst of writes costs one query;
+// - writes made by other server instances arrive on one MongoDB change stream
+//   over slotAvailability. Where change streams are unavailable (a standalone
+//   mongod), the subscribed ids are polled instead, in one query every
+//   SLOT_FEED_POLL_MS.
+// Holds that lapse without a write are caught on the same interval, since a
+// pending bit stops counting once its holdUntil passes. The upstream runs
+// only while someone is subscribed.
+
+import { availabilityId, isBooked, onAvailabilityChange } from '@/lib/availability';
+
+const COLLECTION = 'slotAvailability';
+const POLL_MS = parseInt(process.env.SLOT_FEED_POLL_MS || '2000', 10);
+
+// Bit N set when the slot starting at hour N is taken
+function bookedMask(availability, now) {
+  let mask = 0;
+  for (let hour = 0; hour < 24; hour++) {
+    if (isBooked(availability, hour, now)) {
+      mask |= 1 << hour;
+    }
+  }
+  return mask;
+}
+
+export function createSlotFeed({ connect, pollMs = POLL_MS }) {
+  const topics = new Map();  // availability id -> { availability, booked, listeners }
+  const dirty = new Set();
+  const counters = { events: 0, deliveries: 0, reads: 0 };
+  let flushScheduled = false;
+  let upstream = null;       // { mode: 'change-stream' | 'poll', timer, stream }
+
+  // Store the latest document of a turf-day and push the hours that flipped
+  function apply(id, availability, now = new Date()) {
+    const topic = topics.get(id);
+    if (!topic) return;
+    topic.availability = availability;
+    const booked = bookedMask(availability, now);
+    const flipped = booked ^ topic.booked;
+    if (!flipped) return;
+    topic.booked = booked;
+
+    const changes = [];
+    for (let hour = 0; hour < 24; hour++) {
+      if ((flipped >> hour) & 1) {
+        changes.push({ hour, available: !((booked >> hour) & 1) });
+      }
+    }
+    counters.events += 1;
+    counters.deliveries += topic.listeners.size;
+    for (const listener of topic.listeners) {
+      listener(changes);
+    }
+  }
+
+  async function read(ids) {
+    if (ids.length === 0) return;
+    const db = await connect();
+    counters.reads += 1;
+    const docs = await db.collection(COLLECTION).find({ _id: { $in: ids } }).toArray();
+    const byId = new Map(docs.map(doc => [doc._id, doc]));
+    const now = new Date();
+    ids.forEach(id => apply(id, byId.get(id) || null, now));
+  }
+
+  function markDirty(ids) {
+    ids.filter(id => topics.has(id)).forEach(id => dirty.add(id));
+    if (dirty.size === 0 || flushScheduled) return;
+    flushScheduled = true;
+    setImmediate(() => {
+      flushScheduled = false;
+      const batch = [...dirty];
+      dirty.clear();
+      read(batch).catch(error => console.error('Slot feed read error:', error));
+    });
+  }
+
+  onAvailabilityChange(markDirty);
+
+  function tick() {
+    if (upstream?.mode === 'poll') {
+      read([...topics.keys()]).catch(error => console.error('Slot feed poll error:', error));
+    } else {
+      const now = new Date();
+      topics.forEach((topic, id) => apply(id, topic.availability, now));
+    }
+  }
+
+  async function watch(state) {
+    try {
+      const db = await connect();
+      const stream = db.collection(COLLECTION).watch(
+        [{ $match: { operationType: { $in: ['insert', 'update', 'replace'] } } }],
+        { fullDocument: 'updateLookup' }
+      );
+      stream.on('change', change => {
+        if (topics.has(change.documentKey._id)) {
+          apply(change.documentKey._id, change.fullDocument);
+        }
+      });
+      stream.on('error', () => {
+        // Standalone servers reject change streams; poll from now on
+        stream.close().catch(() => {});
+        if (upstream === state) {
+          state.mode = 'poll';
+        }
+      });
+      if (upstream === state) {
+        state.stream = stream;
+      } else {
+        await stream.close();
+      }
+    } catch (error) {
+      state.mode = 'poll';
+    }
+  }
+
+  function start() {
+    const state = { mode: 'change-stream', stream: null, timer: setInterval(tick, pollMs) };
+    state.timer.unref?.();
+    upstream = state;
+    watch(state);
+  }
+
+  function stop() {
+    clearInterval(upstream.timer);
+    upstream.stream?.close().catch(() => {});
+    upstream = null;
+  }
+
+  // `listener(changes)` gets [{ hour, available }] whenever hours of the
+  // turf-day flip. `availability` is the caller's fresh read; the returned
+  // `availability` is the state deltas will be relative to, so snapshots
+  // built from it line up with the first delta.
+  function subscribe(turfId, date, listener, availability = null) {
+    const id = availabilityId(turfId, date);
+    let topic = topics.get(id);
+    if (!topic) {
+      topic = { availability, booked: bookedMask(availability, new Date()), listeners: new Set() };
+      topics.set(id, topic);
+    }
+    topic.listeners.add(listener);
+    if (!upstream) {
+      start();
+    }
+
+    let subscribed = true;
+    function unsubscribe() {
+      if (!subscribed) return;
+      subscribed = false;
+      topic.listeners.delete(listener);
+      if (topic.listeners.size === 0 && topics.get(id) === topic) {
+        topics.delete(id);
+      }
+      if (topics.size === 0 && upstream) {
+        stop();
+      }
+    }
+    return { availability: topic.availability, unsubscribe };
+  }
+
+  function stats() {
+    let subscribers = 0;
+    topics.forEach(topic => { subscribers += topic.listeners.size; });
+    return { upstream: upstream?.mode || 'idle', topics: topics.size, subscribers, ...counters };
+  }
+
+  return { subscribe, stats };
+}
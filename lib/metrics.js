@@ -0,0 +1,157 @@
+// Process-wide metrics, served by GET /api/metrics in the Prometheus text
+// exposition format (version 0.0.4).
+//
+// Counters and histograms are declared next to what they measure: route.js
+// counts requests and orders, lib/db.js times MongoDB commands and
+// lib/payments.js records gateway calls. Numbers other modules already keep
+// (pool counters, cache stats, slot feed subscribers) are read at scrape time
+// through collect(), so they cost nothing between scrapes. Label values must
+// come from small fixed sets (route patterns, command names, outcomes), never
+// from ids or raw paths. Declaring a name again replaces the old metric, so
+// a module re-evaluated by a dev-server reload does not export it twice.
+
+// Seconds; request and command latencies from 1 ms to 10 s
+export const DEFAULT_BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10];
+
+function escapeLabel(value) {
+  return String(value).replace(/\\/g, '\\\\').replace(/\n/g, '\\n').replace(/"/g, '\\"');
+}
+
+function labelText(labels) {
+  const pairs = Object.entries(labels).map(([name, value]) => `${name}="${escapeLabel(value)}"`);
+  return pairs.length > 0 ? `{${pairs.join(',')}}` : '';
+}
+
+function formatValue(value) {
+  if (Number.isFinite(value)) return String(value);
+  if (Number.isNaN(value)) return 'NaN';
+  return value > 0 ? '+Inf' : '-Inf';
+}
+
+export function createRegistry() {
+  const metrics = new Map();   // name -> { help, type, samples() -> [[suffix, labels, value]] }
+
+  // Series of one labelled metric, keyed by their label values in `labelNames` order
+  function seriesOf(labelNames, create) {
+    const series = new Map();
+    return {
+      get(labels) {
+        const key = labelNames.map(name => labels[name] ?? '').join('\u0000');
+        let entry = series.get(key);
+        if (!entry) {
+          const named = {};
+          labelNames.forEach(name => { named[name] = labels[name] ?? ''; });
+          entry = { labels: named, ...create() };
+          series.set(key, entry);
+        }
+        return entry;
+      },
+      values: () => series.values()
+    };
+  }
+
+  function counter(name, help, labelNames = []) {
+    const series = seriesOf(labelNames, () => ({ value: 0 }));
+    metrics.set(name, {
+      help,
+      type: 'counter',
+      samples: () => [...series.values()].map(({ labels, value }) => ['', labels, value])
+    });
+    return {
+      inc(labels = {}, amount = 1) {
+        series.get(labels).value += amount;
+      }
+    };
+  }
+
+  function gauge(name, help, labelNames = []) {
+    const series = seriesOf(labelNames, () => ({ value: 0 }));
+    metrics.set(name, {
+      help,
+      type: 'gauge',
+      samples: () => [...series.values()].map(({ labels, value }) => ['', labels, value])
+    });
+    return {
+      inc(labels = {}, amount = 1) {
+        series.get(labels).value += amount;
+      },
+      dec(labels = {}, amount = 1) {
+        series.get(labels).value -= amount;
+      }
+    };
+  }
+
+  // Bucket counts are kept per bucket and made cumulative when rendered
+  function histogram(name, help, labelNames = [], buckets = DEFAULT_BUCKETS) {
+    const series = seriesOf(labelNames, () => ({ counts: new Array(buckets.length + 1).fill(0), sum: 0 }));
+    metrics.set(name, {
+      help,
+      type: 'histogram',
+      samples: () => {
+        const samples = [];
+        for (const { labels, counts, sum } of series.values()) {
+          let cumulative = 0;
+          buckets.forEach((bound, index) => {
+            cumulative += counts[index];
+            samples.push(['_bucket', { ...labels, le: String(bound) }, cumulative]);
+          });
+          cumulative += counts[buckets.length];
+          samples.push(['_bucket', { ...labels, le: '+Inf' }, cumulative]);
+          samples.push(['_sum', labels, sum]);
+          samples.push(['_count', labels, cumulative]);
+        }
+        return samples;
+      }
+    });
+    return {
+      observe(labels, value) {
+        const entry = series.get(labels);
+        let index = 0;
+        while (index < buckets.length && value > buckets[index]) {
+          index += 1;
+        }
+        entry.counts[index] += 1;
+        entry.sum += value;
+      }
+    };
+  }
+
+  // `read()` returns a number, or [[labels, value]] for a labelled metric;
+  // called on every scrape
+  function collect(name, help, type, read) {
+    metrics.set(name, {
+      help,
+      type,
+      samples: () => {
+        const value = read();
+        return Array.isArray(value)
+          ? value.map(([labels, sample]) => ['', labels, sample])
+          : [['', {}, value]];
+      }
+    });
+  }
+
+  function render() {
+    const lines = [];
+    for (const [name, metric] of metrics) {
+      let samples;
+      try {
+        samples = metric.samples();
+      } catch (error) {
+        // A failing collector drops its own metric, not the whole scrape
+        console.error(`Metric ${name} failed:`, error);
+        continue;
+      }
+      lines.push(`# HELP ${name} ${metric.help.replace(/\\/g, '\\\\').replace(/\n/g, '\\n')}`);
+      lines.push(`# TYPE ${name} ${metric.type}`);
+      for (const [suffix, labels, value] of samples) {
+        lines.push(`${name}${suffix}${labelText(labels)} ${formatValue(value)}`);
+      }
+    }
+    return lines.join('\n') + '\n';
+  }
+
+  return { counter, gauge, histogram, collect, render };
+}
+
+export const metrics = createRegistry();
@@ -0,0 +1,176 @@
+// Payment gateway used by create-order and payment/verify.
+//
+// PAYMENT_GATEWAY selects the implementation: `razorpay` (default) or `fake`,
+// which creates Razorpay-shaped orders in-process for tests and load runs
+// (FAKE_GATEWAY_LATENCY_MS simulates a slow provider). Order creation is
+// bounded by PAYMENT_GATEWAY_TIMEOUT_MS and goes through a circuit breaker:
+// after PAYMENT_GATEWAY_FAILURE_THRESHOLD consecutive timeouts or provider
+// errors, calls fail immediately for PAYMENT_GATEWAY_RESET_SECONDS, then a
+// single trial call decides whether the circuit closes again. Every order
+// call is counted by outcome in /api/metrics, and the circuit state exported.
+
+import crypto from 'crypto';
+import Razorpay from 'razorpay';
+import { metrics } from '@/lib/metrics';
+import { measure } from '@/lib/timing';
+
+const TIMEOUT_MS = parseInt(process.env.PAYMENT_GATEWAY_TIMEOUT_MS || '5000', 10);
+const FAILURE_THRESHOLD = parseInt(process.env.PAYMENT_GATEWAY_FAILURE_THRESHOLD || '5', 10);
+const RESET_MS = parseInt(process.env.PAYMENT_GATEWAY_RESET_SECONDS || '30', 10) * 1000;
+const FAKE_LATENCY_MS = parseInt(process.env.FAKE_GATEWAY_LATENCY_MS || '0', 10);
+
+// The provider is unavailable; the caller should answer 503 with Retry-After
+export class PaymentGatewayError extends Error {
+  constructor(message, retryAfterSeconds) {
+    super(message);
+    this.name = 'PaymentGatewayError';
+    this.retryAfterSeconds = retryAfterSeconds;
+  }
+}
+
+function withTimeout(promise, ms) {
+  let timer;
+  const timeout = new Promise((_, reject) => {
+    timer = setTimeout(() => reject(new PaymentGatewayError('Payment provider timed out', 1)), ms);
+  });
+  return Promise.race([promise, timeout]).finally(() => clearTimeout(timer));
+}
+
+// Client errors (bad amount, auth) say nothing about the provider's health
+function isProviderFailure(error) {
+  return error instanceof PaymentGatewayError || !(error?.statusCode >= 400 && error.statusCode < 500);
+}
+
+const gatewayCalls = metrics.counter(
+  'turfhub_payment_gateway_calls_total',
+  'Order creations by outcome: ok, timeout, error, rejected (4xx) or circuit_open (not attempted)',
+  ['gateway', 'outcome']);
+const gatewaySeconds = metrics.histogram(
+  'turfhub_payment_gateway_call_duration_seconds', 'Attempted order creations, timeouts included',
+  ['gateway', 'outcome'], [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]);
+
+function outcomeOf(error) {
+  if (error instanceof PaymentGatewayError) return 'timeout';
+  return isProviderFailure(error) ? 'error' : 'rejected';
+}
+
+export function createCircuitBreaker({ failureThreshold, resetMs }) {
+  let failures = 0;
+  let openedAt = null;
+  let trialInFlight = false;
+
+  async function call(fn) {
+    const trial = openedAt !== null;
+    if (trial) {
+      const waited = Date.now() - openedAt;
+      if (waited < resetMs || trialInFlight) {
+        const retryAfter = Math.max(1, Math.ceil((resetMs - waited) / 1000));
+        throw new PaymentGatewayError('Payment provider unavailable', retryAfter);
+      }
+      trialInFlight = true;
+    }
+
+    try {
+      const result = await fn();
+      failures = 0;
+      openedAt = null;
+      return result;
+    } catch (error) {
+      if (isProviderFailure(error)) {
+        failures += 1;
+        if (trial || failures >= failureThreshold) {
+          openedAt = Date.now();
+        }
+      }
+      throw error;
+    } finally {
+      if (trial) {
+        trialInFlight = false;
+      }
+    }
+  }
+
+  function state() {
+    if (openedAt === null) return 'closed';
+    return Date.now() - openedAt < resetMs ? 'open' : 'half-open';
+  }
+
+  return { call, state };
+}
+
+function razorpayGateway() {
+  const client = new Razorpay({
+    key_id: process.env.RAZORPAY_KEY_ID,
+    key_secret: process.env.RAZORPAY_KEY_SECRET,
+  });
+  return { createOrder: options => client.orders.create(options) };
+}
+
+function fakeGateway(latencyMs) {
+  return {
+    async createOrder({ amount, currency, receipt, notes }) {
+      if (latencyMs > 0) {
+        await new Promise(resolve => setTimeout(resolve, latencyMs));
+      }
+      return {
+        id: `order_${crypto.randomBytes(7).toString('hex')}`,
+        entity: 'order',
+        amount,
+        currency,
+        receipt,
+        notes,
+        status: 'created'
+      };
+    }
+  };
+}
+
+// Both implementations sign payments like Razorpay, with RAZORPAY_KEY_SECRET
+function verifySignature(orderId, paymentId, signature) {
+  const expected = crypto
+    .createHmac('sha256', process.env.RAZORPAY_KEY_SECRET)
+    .update(`${orderId}|${paymentId}`)
+    .digest('hex');
+  return signature === expected;
+}
+
+export function createPaymentGateway({
+  kind = process.env.PAYMENT_GATEWAY || 'razorpay',
+  timeoutMs = TIMEOUT_MS,
+  failureThreshold = FAILURE_THRESHOLD,
+  resetMs = RESET_MS,
+  latencyMs = FAKE_LATENCY_MS
+} = {}) {
+  const gateway = kind === 'fake' ? fakeGateway(latencyMs) : razorpayGateway();
+  const breaker = createCircuitBreaker({ failureThreshold, resetMs });
+  metrics.collect('turfhub_payment_gateway_circuit_state', 'Current circuit breaker state (1 = current)', 'gauge',
+    () => ['closed', 'open', 'half-open'].map(state => [{ gateway: kind, state }, breaker.state() === state ? 1 : 0]));
+
+  // The breaker throws without calling fn while open, so `started` tells the two apart
+  async function createOrder(options) {
+    let started = null;
+    try {
+      const order = await breaker.call(() => {
+        started = performance.now();
+        return withTimeout(gateway.createOrder(options), timeoutMs);
+      });
+      gatewaySeconds.observe({ gateway: kind, outcome: 'ok' }, (performance.now() - started) / 1000);
+      gatewayCalls.inc({ gateway: kind, outcome: 'ok' });
+      return order;
+    } catch (error) {
+      const outcome = started === null ? 'circuit_open' : outcomeOf(error);
+      if (started !== null) {
+        gatewaySeconds.observe({ gateway: kind, outcome }, (performance.now() - started) / 1000);
+      }
+      gatewayCalls.inc({ gateway: kind, outcome });
+      throw error;
+    }
+  }
+
+  return {
+    kind,
+    createOrder: options => measure('gateway', () => createOrder(options)),
+    verifySignature,
+    state: breaker.state
+  };
+}
@@ -0,0 +1,142 @@
+// Atomic slot reservation and expiring holds.
+//
+// Pending and confirmed bookings carry `active: true`, and a unique index on
+// (turfId, date, slotId) restricted to active bookings lets MongoDB decide
+// which of several simultaneous create-order calls gets a slot. A booking
+// stops holding its slot by unsetting `active`.
+//
+// A pending booking is a hold that lasts until `expiresAt`. Expired holds
+// are released two ways: create-order releases the ones on the slots it is
+// about to take, and a background reaper sweeps the rest, marking them
+// `expired` and clearing their availability bits. Expired bookings are
+// deleted by a TTL index once EXPIRED_BOOKING_RETENTION_SECONDS has passed.
+
+import { releasePending } from '@/lib/availability';
+import { metrics } from '@/lib/metrics';
+
+const DUPLICATE_KEY = 11000;
+
+export const ACTIVE_SLOT_INDEX = 'active_slot_unique';
+export const HOLD_SECONDS = parseInt(process.env.BOOKING_HOLD_SECONDS || '600', 10);
+const REAPER_INTERVAL_MS = parseInt(process.env.HOLD_REAPER_INTERVAL_SECONDS || '30', 10) * 1000;
+const REAPER_BATCH_SIZE = 500;
+const EXPIRED_RETENTION_SECONDS = parseInt(process.env.EXPIRED_BOOKING_RETENTION_SECONDS || String(7 * 24 * 3600), 10);
+
+let reaperTimer = null;
+
+export function holdExpiry(from = new Date()) {
+  return new Date(from.getTime() + HOLD_SECONDS * 1000);
+}
+
+// Pending bookings whose hold has passed; bookings made before holds existed
+// have no expiresAt and are measured from createdAt instead
+function expiredHolds(now) {
+  return {
+    status: 'pending',
+    active: true,
+    $or: [
+      { expiresAt: { $lte: now } },
+      { expiresAt: { $exists: false }, createdAt: { $lte: new Date(now.getTime() - HOLD_SECONDS * 1000) } }
+    ]
+  };
+}
+
+// A failed index build is logged and the API keeps serving without it, so a
+// bad index never takes every request down with the connection. Existing
+// double bookings make the unique index fail until they are resolved.
+// Bookings made before the `active` flag existed are flagged once by
+// `python -m tests.migrate active-flag`, not here on every cold start.
+async function createIndexOrLog(collection, keys, options) {
+  try {
+    await collection.createIndex(keys, options);
+  } catch (error) {
+    console.error(`Could not create the ${options.name} index:`, error.message);
+  }
+}
+
+export async function ensureReservationIndexes(db) {
+  const bookings = db.collection('bookings');
+  await createIndexOrLog(
+    bookings,
+    { turfId: 1, date: 1, slotId: 1 },
+    { name: ACTIVE_SLOT_INDEX, unique: true, partialFilterExpression: { active: true } }
+  );
+  await createIndexOrLog(
+    bookings,
+    { expiresAt: 1 },
+    { name: 'pending_hold_expiry', partialFilterExpression: { status: 'pending' } }
+  );
+  await createIndexOrLog(
+    bookings,
+    { expiredAt: 1 },
+    { name: 'expired_booking_ttl', expireAfterSeconds: EXPIRED_RETENTION_SECONDS }
+  );
+}
+
+const holdsExpired = metrics.counter(
+  'turfhub_holds_expired_total', 'Pending bookings released because their hold lapsed');
+
+// Expire the matching holds and free their slots; returns how many were released
+export async function releaseExpiredHolds(db, filter = {}, now = new Date()) {
+  const bookings = db.collection('bookings');
+  const expired = await bookings
+    .find({ ...expiredHolds(now), ...filter }, { projection: { _id: 0, bookingId: 1, turfId: 1, date: 1, slotId: 1 } })
+    .limit(REAPER_BATCH_SIZE)
+    .toArray();
+  if (expired.length === 0) {
+    return 0;
+  }
+
+  // Re-check the expiry in the update so a hold confirmed in between is left alone
+  const result = await bookings.updateMany(
+    { ...expiredHolds(now), bookingId: { $in: expired.map(b => b.bookingId) } },
+    { $set: { status: 'expired', expiredAt: now }, $unset: { active: '' } }
+  );
+  await releasePending(db, expired, now);
+  holdsExpired.inc({}, result.modifiedCount);
+  return result.modifiedCount;
+}
+
+// Insert all bookings in one unordered insertMany. Returns the slotIds that
+// were already held; when any slot is lost the whole request is rolled back
+// so a customer is never left holding part of an order.
+export async function reserveSlots(db, bookings) {
+  // Abandoned checkouts on these slots must not block the new hold
+  const wanted = bookings.map(({ turfId, date, slotId }) => ({ turfId, date, slotId }));
+  await releaseExpiredHolds(db, { $and: [{ $or: wanted }] });
+
+  try {
+    await db.collection('bookings').insertMany(bookings, { ordered: false });
+    return [];
+  } catch (error) {
+    const writeErrors = [].concat(error.writeErrors || []);
+    const lost = writeErrors.filter(e => e.code === DUPLICATE_KEY);
+
+    await releaseBookings(db, bookings.map(b => b.bookingId));
+    if (lost.length === 0 || lost.length !== writeErrors.length) {
+      throw error;
+    }
+    return lost.map(e => bookings[e.index].slotId);
+  }
+}
+
+export async function releaseBookings(db, bookingIds) {
+  await db.collection('bookings').deleteMany({ bookingId: { $in: bookingIds } });
+}
+
+// Periodic sweep of expired holds; one timer per process, unref'd so it
+// never keeps a serverless instance alive on its own
+export function startHoldReaper(db) {
+  if (reaperTimer) {
+    return;
+  }
+  reaperTimer = setInterval(async () => {
+    try {
+      // Drain in batches so a backlog of abandoned checkouts clears in one tick
+      while (await releaseExpiredHolds(db) >= REAPER_BATCH_SIZE);
+    } catch (error) {
+      console.error('Hold reaper error:', error);
+    }
+  }, REAPER_INTERVAL_MS);
+  reaperTimer.unref?.();
+}
@@ -0,0 +1,116 @@
+// Cacheable JSON responses: strong ETags, conditional GET and compression.
+//
+// Catalogue endpoints tag responses with the catalogue version plus the
+// request's parameters, so a client's `If-None-Match` is answered with a 304
+// before any serialization; other endpoints tag a hash of the body. Bodies
+// over COMPRESS_MIN_BYTES are sent with brotli or gzip when the client
+// accepts them. Encoded bytes are kept per ETag, so a catalogue version is
+// serialized and compressed once however many clients fetch it. Each
+// encoding gets its own ETag (`-br`/`-gz` suffix); any of them revalidates.
+
+import crypto from 'crypto';
+import zlib from 'zlib';
+import { NextResponse } from 'next/server';
+import { measureSync } from '@/lib/timing';
+
+export const CATALOG_CACHE_CONTROL = `public, max-age=${parseInt(process.env.CATALOG_MAX_AGE_SECONDS || '30', 10)}, ` +
+  `stale-while-revalidate=${parseInt(process.env.CATALOG_STALE_SECONDS || '300', 10)}`;
+
+const COMPRESS_MIN_BYTES = 1024;
+const ENCODED_CACHE_SIZE = 256;
+
+const ENCODINGS = {
+  br: {
+    suffix: '-br',
+    encode: data => zlib.brotliCompressSync(data, {
+      params: {
+        [zlib.constants.BROTLI_PARAM_QUALITY]: 5,
+        [zlib.constants.BROTLI_PARAM_SIZE_HINT]: data.length
+      }
+    })
+  },
+  gzip: { suffix: '-gz', encode: data => zlib.gzipSync(data, { level: 6 }) }
+};
+
+// "etag" -> Buffer, least recently used first
+const encoded = new Map();
+
+export function hashOf(value) {
+  return crypto.createHash('sha1').update(value).digest('base64url').slice(0, 22);
+}
+
+// Strong ETag for a representation identified by `parts`
+export function etagOf(...parts) {
+  return `"${hashOf(parts.join('|'))}"`;
+}
+
+function opaque(tag) {
+  const value = tag.trim().replace(/^W\//, '');
+  return value.replace(/-(br|gz)"$/, '"');
+}
+
+export function isNotModified(request, etag) {
+  const header = request.headers.get('if-none-match');
+  if (!header) return false;
+  if (header.trim() === '*') return true;
+  return header.split(',').some(tag => opaque(tag) === etag);
+}
+
+// Preferred encoding the client accepts: br, then gzip, else null
+function negotiate(request) {
+  const accepted = new Map();
+  for (const part of (request.headers.get('accept-encoding') || '').split(',')) {
+    const [name, ...params] = part.trim().toLowerCase().split(';');
+    const q = params.map(p => p.trim()).find(p => p.startsWith('q='));
+    accepted.set(name, q ? parseFloat(q.slice(2)) : 1);
+  }
+  return ['br', 'gzip'].find(name => (accepted.get(name) ?? accepted.get('*') ?? 0) > 0) || null;
+}
+
+function remember(key, create) {
+  let value = encoded.get(key);
+  if (value) {
+    encoded.delete(key);
+  } else {
+    value = create();
+  }
+  encoded.set(key, value);
+  if (encoded.size > ENCODED_CACHE_SIZE) {
+    encoded.delete(encoded.keys().next().value);
+  }
+  return value;
+}
+
+// `body` may be a function so a 304 never builds it. Without `etag`, the
+// ETag is a hash of the serialized body.
+export function cachedJson(request, body, { etag, cacheControl = CATALOG_CACHE_CONTROL, status = 200 } = {}) {
+  const headers = { 'Cache-Control': cacheControl, Vary: 'Accept-Encoding' };
+  if (etag && isNotModified(request, etag)) {
+    return new NextResponse(null, { status: 304, headers: { ...headers, ETag: etag } });
+  }
+
+  const serialize = () => measureSync('format', () =>
+    Buffer.from(JSON.stringify(typeof body === 'function' ? body() : body)));
+  let data = etag ? remember(etag, serialize) : serialize();
+  if (!etag) {
+    etag = `"${hashOf(data)}"`;
+    if (isNotModified(request, etag)) {
+      return new NextResponse(null, { status: 304, headers: { ...headers, ETag: etag } });
+    }
+  }
+
+  const encoding = data.length >= COMPRESS_MIN_BYTES ? negotiate(request) : null;
+  if (encoding) {
+    const { suffix, encode } = ENCODINGS[encoding];
+    const plain = data;
+    data = remember(`${etag}${encoding}`, () => measureSync('compress', () => encode(plain)));
+    headers['Content-Encoding'] = encoding;
+    headers.ETag = etag.replace(/"$/, `${suffix}"`);
+  } else {
+    headers.ETag = etag;
+  }
+  return new NextResponse(data, {
+    status,
+    headers: { ...headers, 'Content-Type': 'application/json', 'Content-Length': String(data.length) }
+  });
+}
@@ -0,0 +1,90 @@
+// Route table for the API: method + path pattern -> handler.
+//
+// Patterns are compiled into a trie of path segments, with `:name` segments
+// capturing parameters. A lookup walks one node per segment of the request
+// path, so its cost depends on the path's depth and not on how many routes
+// are registered. Static segments are tried before parameters, so
+// `/api/slots/:turfId/range` and `/api/slots/:turfId` never shadow each
+// other; a static branch without a route for the request's method falls
+// back to the parameter branch. Empty segments are ignored: `/api/` matches `/api`. Routes without
+// parameters are also kept in a map keyed by method and path, so most
+// requests are answered by one hash lookup before any trie walk.
+//
+// This module has no imports so tests/route_bench.py can load it with plain node.
+
+function createNode() {
+  return { children: new Map(), param: null, handlers: new Map() };
+}
+
+function segmentsOf(path) {
+  return path.split('/').filter(Boolean);
+}
+
+// The { handler, pattern } for `method` below `node`, or null
+function find(node, method, segments, index, params) {
+  if (index === segments.length) {
+    return node.handlers.get(method) || null;
+  }
+  const child = node.children.get(segments[index]);
+  if (child) {
+    const found = find(child, method, segments, index + 1, params);
+    if (found) return found;
+  }
+  if (node.param) {
+    const found = find(node.param.node, method, segments, index + 1, params);
+    if (found) {
+      params[node.param.name] = segments[index];
+      return found;
+    }
+  }
+  return null;
+}
+
+// `routes` is a list of [method, pattern, handler]
+export function createRouter(routes = []) {
+  const root = createNode();
+  const exact = new Map();   // "METHOD /path" -> { handler, pattern }
+
+  function add(method, pattern, handler) {
+    const segments = segmentsOf(pattern);
+    let node = root;
+    for (const segment of segments) {
+      if (segment.startsWith(':')) {
+        const name = segment.slice(1);
+        if (node.param && node.param.name !== name) {
+          throw new Error(`Route ${pattern} names parameter :${name}, already :${node.param.name}`);
+        }
+        node.param = node.param || { name, node: createNode() };
+        node = node.param.node;
+      } else {
+        if (!node.children.has(segment)) {
+          node.children.set(segment, createNode());
+        }
+        node = node.children.get(segment);
+      }
+    }
+    if (node.handlers.has(method)) {
+      throw new Error(`Duplicate route ${method} ${pattern}`);
+    }
+    node.handlers.set(method, { handler, pattern });
+    if (!pattern.includes(':')) {
+      exact.set(`${method} /${segments.join('/')}`, { handler, pattern });
+    }
+  }
+
+  // { handler, pattern, params } or null when no route has this method and path
+  function match(method, path) {
+    const route = exact.get(`${method} ${path}`);
+    if (route) {
+      return { ...route, params: {} };
+    }
+    const params = {};
+    const found = find(root, method, segmentsOf(path), 0, params);
+    return found ? { ...found, params } : null;
+  }
+
+  for (const [method, pattern, handler] of routes) {
+    add(method, pattern, handler);
+  }
+  return { add, match };
+}
@@ -0,0 +1,175 @@
+// Slot engine: a turf's schedule compiled into a slot template, stamped per date.
+//
+// compileSlotTemplate() turns operatingHours, the pricing bands and
+// customSlots into one list of slots per day type (weekday, weekend), the
+// granularity the vendor form prices at. Turf writes store the result on the
+// turf as `slotTemplate`, so serving /api/slots only stamps the date and the
+// availability bitmap onto it. Turfs written before templates existed (and
+// the mock turfs) are compiled on first read and kept in memory.
+//
+// Schedule rules:
+// - A day type with valid customSlots uses them. A custom slot is
+//   { dayType: 'weekday'|'weekend', startTime: 'HH:00', endTime, price } and
+//   lasts exactly one hour (endTime is startTime + 1h, 24:00 for the last),
+//   because a booking takes one bit of the hour availability bitmap. Turf
+//   writes reject other shapes (customSlotsError); stored ones are skipped.
+//   Of two slots with the same start the first listed wins. A slot without
+//   a valid price gets the band price of its hour.
+// - Otherwise hourly slots fill operatingHours (default 06:00-23:00), from
+//   the first whole hour after opening to the last one ending by closing;
+//   a closing time at or before opening means midnight.
+// - Hourly prices: morning (06:00-12:00) and evening (18:00-23:00) bands of
+//   `pricing`, else `pricing.basePrice` (or `pricePerHour` on mock turfs).
+//
+// This module has no imports so tests/slot_check.py can load it with plain node.
+
+// 2: multi-hour custom slots are no longer compiled
+export const SLOT_TEMPLATE_VERSION = 2;
+
+const DEFAULT_OPENING = 6 * 60;
+const DEFAULT_CLOSING = 23 * 60;
+const BANDS = [
+  { name: 'Morning', from: 6, to: 12 },
+  { name: 'Evening', from: 18, to: 23 }
+];
+const COMPILED_CACHE_SIZE = 1000;
+
+// "HH:MM" -> minutes after midnight, or null
+function minutesOf(time) {
+  const match = /^(\d{1,2}):(\d{2})$/.exec(String(time ?? '').trim());
+  if (!match) return null;
+  const minutes = Number(match[1]) * 60 + Number(match[2]);
+  return Number(match[2]) < 60 && minutes <= 24 * 60 ? minutes : null;
+}
+
+function label(minutes) {
+  const pad = value => String(value).padStart(2, '0');
+  return `${pad(Math.floor(minutes / 60))}:${pad(minutes % 60)}`;
+}
+
+// A number, or a decimal string as the vendor form sends it; negative and
+// non-numeric prices count as unset
+function priceOf(value) {
+  if (typeof value === 'string' && /^\d+(\.\d+)?$/.test(value.trim())) {
+    value = Number(value);
+  }
+  return typeof value === 'number' && Number.isFinite(value) && value >= 0 ? value : null;
+}
+
+function bandPrice(turf, dayType, hour) {
+  const base = priceOf(turf.pricing?.basePrice) ?? priceOf(turf.pricePerHour) ?? 0;
+  const band = BANDS.find(b => hour >= b.from && hour < b.to);
+  return (band && priceOf(turf.pricing?.[`${dayType}${band.name}`])) ?? base;
+}
+
+function hourlySlots(turf, dayType) {
+  let opening = minutesOf(turf.operatingHours?.opening);
+  let closing = minutesOf(turf.operatingHours?.closing);
+  if (opening === null || closing === null) {
+    opening = DEFAULT_OPENING;
+    closing = DEFAULT_CLOSING;
+  }
+  if (closing <= opening) {
+    closing = 24 * 60;
+  }
+  const slots = [];
+  for (let hour = Math.ceil(opening / 60); (hour + 1) * 60 <= closing; hour++) {
+    slots.push({ hour, time: label(hour * 60), endTime: label((hour + 1) * 60), price: bandPrice(turf, dayType, hour) });
+  }
+  return slots;
+}
+
+// { dayType, hour } of a well-formed custom slot, or null
+function customSlotOf(slot) {
+  if (!slot || typeof slot !== 'object' || !['weekday', 'weekend'].includes(slot.dayType)) return null;
+  const start = minutesOf(slot.startTime);
+  const end = minutesOf(slot.endTime);
+  if (start === null || end === null || start % 60 !== 0 || end !== start + 60) return null;
+  return { dayType: slot.dayType, hour: start / 60 };
+}
+
+// Why a turf write's customSlots are invalid, or null when they are fine
+export function customSlotsError(customSlots) {
+  if (customSlots === undefined || customSlots === null) return null;
+  if (!Array.isArray(customSlots)) return 'customSlots must be a list';
+  const index = customSlots.findIndex(slot =>
+    !customSlotOf(slot) || (slot.price !== undefined && priceOf(slot.price) === null));
+  if (index === -1) return null;
+  return `customSlots[${index}] must be one hour on the hour: ` +
+    "{ dayType: 'weekday' | 'weekend', startTime: 'HH:00', endTime: one hour later, price }";
+}
+
+function customSlots(turf, dayType) {
+  const byHour = new Map();
+  for (const slot of Array.isArray(turf.customSlots) ? turf.customSlots : []) {
+    const custom = customSlotOf(slot);
+    if (custom && custom.dayType === dayType && !byHour.has(custom.hour)) {
+      byHour.set(custom.hour, priceOf(slot.price));
+    }
+  }
+  return [...byHour.keys()].sort((a, b) => a - b).map(hour => ({
+    hour,
+    time: label(hour * 60),
+    endTime: label((hour + 1) * 60),
+    price: byHour.get(hour) ?? bandPrice(turf, dayType, hour)
+  }));
+}
+
+export function compileSlotTemplate(turf) {
+  const template = { version: SLOT_TEMPLATE_VERSION };
+  for (const dayType of ['weekday', 'weekend']) {
+    const custom = customSlots(turf, dayType);
+    template[dayType] = custom.length > 0 ? custom : hourlySlots(turf, dayType);
+  }
+  return template;
+}
+
+// Compiled templates of turfs that have none stored, by turf and revision
+const compiled = new Map();
+
+// The turf's stored template, or one compiled now for older turfs
+export function slotTemplateOf(turf) {
+  if (turf.slotTemplate?.version === SLOT_TEMPLATE_VERSION) {
+    return turf.slotTemplate;
+  }
+  const key = `${turf.turfId || turf.id}|${new Date(turf.updatedAt || turf.createdAt || 0).getTime()}`;
+  let template = compiled.get(key);
+  if (!template) {
+    template = compileSlotTemplate(turf);
+    compiled.set(key, template);
+    if (compiled.size > COMPILED_CACHE_SIZE) {
+      compiled.delete(compiled.keys().next().value);
+    }
+  }
+  return template;
+}
+
+export function dayTypeOf(date) {
+  const day = new Date(`${date}T00:00:00Z`).getUTCDay();
+  return day === 0 || day === 6 ? 'weekend' : 'weekday';
+}
+
+// Price of `slotId` on `date`, or null when the turf does not offer that
+// slot (unknown hour, or an id for another date)
+export function slotPrice(template, date, slotId) {
+  const match = /^slot-(\d{4}-\d{2}-\d{2})-(\d{1,2})$/.exec(String(slotId));
+  if (!match || match[1] !== date) return null;
+  const slot = template[dayTypeOf(date)].find(entry => entry.hour === Number(match[2]));
+  return slot ? slot.price : null;
+}
+
+// Slots for one date. `isBooked(hour)` marks taken slots; with
+// `currentTime` (today), slots that have already started are left out.
+export function stampSlots(template, date, isBooked = () => false, currentTime = null) {
+  const slots = [];
+  for (const { hour, time, endTime, price } of template[dayTypeOf(date)]) {
+    if (currentTime) {
+      // Local midnight of `date`; new Date(date) alone is UTC midnight
+      const start = new Date(`${date}T00:00:00`);
+      start.setHours(hour);
+      if (start <= currentTime) continue;
+    }
+    slots.push({ id: `slot-${date}-${hour}`, time, endTime, price, available: !isBooked(hour) });
+  }
+  return slots;
+}
@@ -0,0 +1,76 @@
+// Per-request timing spans, reported as a Server-Timing header and a log line.
+//
+// Each API request runs inside timeRequest(), which keeps a span table in
+// AsyncLocalStorage so code anywhere below the handler can add to it without
+// passing anything around: lib/db.js records `db` from the driver's command
+// events, lib/payments.js records `gateway`, and route.js records `format`
+// around JSON serialization. A span's duration is the sum over its calls, so
+// concurrent queries can add up to more than `total`. Set
+// REQUEST_TIMING_LOG=0 to keep the header but drop the log line.
+
+import { AsyncLocalStorage } from 'node:async_hooks';
+
+const LOG_ENABLED = process.env.REQUEST_TIMING_LOG !== '0';
+
+const storage = new AsyncLocalStorage();
+
+// Timing of the request being handled, or undefined outside timeRequest()
+export function currentTiming() {
+  return storage.getStore();
+}
+
+export function addSpan(timing, name, ms) {
+  if (!timing) return;
+  const span = timing.spans.get(name) || { ms: 0, count: 0 };
+  span.ms += ms;
+  span.count += 1;
+  timing.spans.set(name, span);
+}
+
+export async function measure(name, fn) {
+  const timing = storage.getStore();
+  const started = performance.now();
+  try {
+    return await fn();
+  } finally {
+    addSpan(timing, name, performance.now() - started);
+  }
+}
+
+export function measureSync(name, fn) {
+  const timing = storage.getStore();
+  const started = performance.now();
+  try {
+    return fn();
+  } finally {
+    addSpan(timing, name, performance.now() - started);
+  }
+}
+
+// Runs `fn` with a fresh span table; resolves to { result, timing }
+export async function timeRequest(fn) {
+  const timing = { started: performance.now(), spans: new Map(), totalMs: 0 };
+  const result = await storage.run(timing, fn);
+  timing.totalMs = performance.now() - timing.started;
+  return { result, timing };
+}
+
+function round(ms) {
+  return Math.round(ms * 100) / 100;
+}
+
+// e.g. "db;dur=12.4, format;dur=0.31, total;dur=14.02"
+export function serverTimingHeader(timing) {
+  const parts = [...timing.spans].map(([name, span]) => `${name};dur=${round(span.ms)}`);
+  parts.push(`total;dur=${round(timing.totalMs)}`);
+  return parts.join(', ');
+}
+
+export function logTiming(fields, timing) {
+  if (!LOG_ENABLED) return;
+  const spans = {};
+  for (const [name, span] of timing.spans) {
+    spans[name] = { ms: round(span.ms), count: span.count };
+  }
+  console.log(JSON.stringify({ msg: 'request', ...fields, totalMs: round(timing.totalMs), spans }));
+}
@@ -0,0 +1,76 @@
+// Turf lookups by id for the detail and slot endpoints, mock and database alike.
+//
+// One id-keyed index serves both: the mock turfs are seeded into it and never
+// expire, so their ids never reach MongoDB. Database turfs are loaded on first
+// request and kept for `ttlMs`; ids with no approved turf are remembered as
+// misses for `missTtlMs`, so repeated requests for unknown or pending turfs
+// do not query either. Turf writes call invalidate() for the ids they touch,
+// the TTLs cover writes made by other server instances. Concurrent lookups
+// of one id share a load, and a load overtaken by an invalidation is returned
+// to its callers but never stored.
+export function createTurfRepository({ load, seed = [], ttlMs, missTtlMs, maxEntries = 5000 }) {
+  const pinned = new Map(seed);
+  const entries = new Map();   // turfId -> { value, expiresAt }, oldest first
+  const inflight = new Map();  // turfId -> { promise, generation }
+  const counters = { hits: 0, missHits: 0, loads: 0 };
+  let generation = 0;
+
+  function remember(turfId, value) {
+    entries.delete(turfId);
+    entries.set(turfId, { value, expiresAt: Date.now() + (value ? ttlMs : missTtlMs) });
+    if (entries.size > maxEntries) {
+      entries.delete(entries.keys().next().value);
+    }
+  }
+
+  // The turf record for `turfId`, or null when there is no approved turf
+  async function get(turfId) {
+    if (pinned.has(turfId)) {
+      counters.hits += 1;
+      return pinned.get(turfId);
+    }
+    const entry = entries.get(turfId);
+    if (entry && entry.expiresAt > Date.now()) {
+      counters[entry.value ? 'hits' : 'missHits'] += 1;
+      return entry.value;
+    }
+    const pending = inflight.get(turfId);
+    if (pending && pending.generation === generation) {
+      return pending.promise;
+    }
+
+    counters.loads += 1;
+    const loadGeneration = generation;
+    const promise = load(turfId).then(value => {
+      if (loadGeneration === generation) {
+        remember(turfId, value ?? null);
+      }
+      return value ?? null;
+    }).finally(() => {
+      if (inflight.get(turfId)?.promise === promise) {
+        inflight.delete(turfId);
+      }
+    });
+    inflight.set(turfId, { promise, generation: loadGeneration });
+    return promise;
+  }
+
+  // Drop the given ids, or every database turf when called without any
+  function invalidate(...turfIds) {
+    generation += 1;
+    if (turfIds.length === 0) {
+      entries.clear();
+    }
+    turfIds.forEach(turfId => entries.delete(turfId));
+  }
+
+  function stats() {
+    let cachedMisses = 0;
+    for (const entry of entries.values()) {
+      if (!entry.value) cachedMisses += 1;
+    }
+    return { pinned: pinned.size, cached: entries.size - cachedMisses, cachedMisses, ...counters };
+  }
+
+  return { get, invalidate, stats };
+}
@@ -1,15 +1,18 @@
 #!/usr/bin/env python3
 
-import requests
 import json
 import os
 from datetime import datetime, timedelta
+from tests.http_client import ApiClient
+from tests.stand_in_server import start_if_requested
 
 # Configuration
-BASE_URL = "https://turf-hub-1.preview.emergentagent.com/api"
 PROFILE_TEST_MOBILE = "6666666666"  # New mobile for profile testing
 TEST_OTP = "123456"
 
+# Shared keep-alive client for every API call in this script
+api = ApiClient()
+
 def log_test(test_name, success, details=""):
     """Log test results"""
     status = "✅ PASS" if success else "❌ FAIL"
@@ -22,7 +25,7 @@ def test_profile_creation_with_new_fields():
     """Test 1: Profile Creation with New Fields"""
     try:
         # Send OTP
-        otp_response = requests.post(f"{BASE_URL}/auth/send-otp", 
+        otp_response = api.post("/auth/send-otp", 
                                    json={"mobile": PROFILE_TEST_MOBILE})
         
         if otp_response.status_code != 200:
@@ -30,7 +33,7 @@ def test_profile_creation_with_new_fields():
             return None, None
             
         # Verify OTP and get token
-        verify_response = requests.post(f"{BASE_URL}/auth/verify-otp",
+        verify_response = api.post("/auth/verify-otp",
                                       json={"mobile": PROFILE_TEST_MOBILE, "otp": TEST_OTP})
         
         if verify_response.status_code != 200:
@@ -86,7 +89,7 @@ def test_profile_update(token):
             "dob": "1995-05-15"
         }
         
-        response = requests.put(f"{BASE_URL}/profile",
+        response = api.put("/profile",
                                headers=headers, json=profile_data)
         
         if response.status_code != 200:
@@ -138,7 +141,7 @@ def test_date_filtering_fix():
         # Test yesterday's date (2026-02-25)
         yesterday = "2026-02-25"
         
-        response = requests.get(f"{BASE_URL}/slots/turf-001", 
+        response = api.get("/slots/turf-001", 
                                params={"date": yesterday})
         
         if response.status_code != 200:
@@ -162,7 +165,7 @@ def test_date_filtering_fix():
         # Test today's date (2026-02-26)
         today = current_time.strftime("%Y-%m-%d")
         
-        response = requests.get(f"{BASE_URL}/slots/turf-001", 
+        response = api.get("/slots/turf-001", 
                                params={"date": today})
         
         if response.status_code != 200:
@@ -180,7 +183,7 @@ def test_date_filtering_fix():
         # Test tomorrow's date (2026-02-27)
         tomorrow = (current_time + timedelta(days=1)).strftime("%Y-%m-%d")
         
-        response = requests.get(f"{BASE_URL}/slots/turf-001", 
+        response = api.get("/slots/turf-001", 
                                params={"date": tomorrow})
         
         if response.status_code != 200:
@@ -213,7 +216,7 @@ def test_profile_persistence(token):
     """Test 4: Profile Persistence"""
     try:
         # Login again with same mobile to verify profile fields are retained
-        otp_response = requests.post(f"{BASE_URL}/auth/send-otp", 
+        otp_response = api.post("/auth/send-otp", 
                                    json={"mobile": PROFILE_TEST_MOBILE})
         
         if otp_response.status_code != 200:
@@ -221,7 +224,7 @@ def test_profile_persistence(token):
             return False
             
         # Verify OTP and get user data again
-        verify_response = requests.post(f"{BASE_URL}/auth/verify-otp",
+        verify_response = api.post("/auth/verify-otp",
                                       json={"mobile": PROFILE_TEST_MOBILE, "otp": TEST_OTP})
         
         if verify_response.status_code != 200:
@@ -264,7 +267,7 @@ def test_early_morning_scenario():
         # Test slots for "yesterday" date in early morning
         feb_25 = "2026-02-25"
         
-        response = requests.get(f"{BASE_URL}/slots/turf-001", 
+        response = api.get("/slots/turf-001", 
                                params={"date": feb_25})
         
         if response.status_code != 200:
@@ -368,4 +371,13 @@ def main():
     print("• Early morning time scenarios handled properly")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    local_server = start_if_requested()
+    if local_server:
+        api.base_url = local_server.base_url
+    try:
+        main()
+    finally:
+        api.print_timings()
+        api.close()
+        if local_server:
+            local_server.stop()
\ No newline at end of file
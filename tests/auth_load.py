@@ -0,0 +1,134 @@
+"""Server CPU per request on authenticated endpoints, with and without the token cache.
+
+Replays GET /bookings, /vendor/turfs and /vendor/profile (plus the public
+GET /cities as a control) and reads the server process's CPU time from
+/proc before and after each endpoint, so the cost of token verification
+shows up as CPU microseconds per request. Linux only.
+
+Pass the server's pid and compare two runs, one against a server started
+with AUTH_CACHE_SIZE=0::
+
+    python -m tests.auth_load --server-pid 4242 --save test_reports/auth_uncached.json
+    python -m tests.auth_load --server-pid 4343 --baseline test_reports/auth_uncached.json
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from tests.bench import save_baseline
+from tests.http_client import ApiClient, login
+from tests.load import percentile
+
+ENDPOINTS = [
+    ("GET /cities (public)", "/cities", None),
+    ("GET /bookings", "/bookings", "customer"),
+    ("GET /vendor/turfs", "/vendor/turfs", "vendor"),
+    ("GET /vendor/profile", "/vendor/profile", "vendor"),
+]
+CUSTOMER_MOBILE = "9300000001"
+VENDOR_MOBILE = "8300000001"
+
+
+def process_cpu_seconds(pid):
+    """User + system CPU of ``pid`` from /proc/<pid>/stat"""
+    with open(f"/proc/{pid}/stat") as handle:
+        # The command name may contain spaces; fields after it are fixed
+        fields = handle.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def prepare_context(client):
+    """Log in a customer with a few bookings and a vendor with a turf; returns auth headers"""
+    customer_headers = {"Authorization": f"Bearer {login(client, '/auth', CUSTOMER_MOBILE)}"}
+    date = (datetime.now() + timedelta(days=800)).strftime("%Y-%m-%d")
+    for hour in range(6, 11):
+        client.post("/payment/create-order", headers=customer_headers, json={
+            "turfId": "turf-001", "slots": [{"slotId": f"slot-{date}-{hour}", "date": date}], "amount": 1500})
+
+    client.post("/vendor/register", json={"businessName": "Auth Load Turfs", "ownerName": "Auth Load",
+                                          "mobile": VENDOR_MOBILE, "email": "auth-load@example.com"})
+    vendor_headers = {"Authorization": f"Bearer {login(client, '/vendor', VENDOR_MOBILE)}"}
+    client.post("/vendor/turfs", headers=vendor_headers, json={
+        "name": "Auth Load Turf", "city": "Pune", "location": "Baner", "pricing": {"basePrice": 1200}})
+    return {"customer": customer_headers, "vendor": vendor_headers}
+
+
+def measure(client, pid, path, headers, requests, concurrency, warmup):
+    def call(_):
+        response = client.get(path, headers=headers)
+        response.raise_for_status()
+        return response.elapsed.total_seconds() * 1000
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(call, range(warmup)))
+        cpu_before = process_cpu_seconds(pid)
+        latencies = list(pool.map(call, range(requests)))
+        cpu_used = process_cpu_seconds(pid) - cpu_before
+    return {
+        "requests": requests,
+        "cpu_us_per_request": round(cpu_used / requests * 1e6, 1),
+        "p50_ms": round(percentile(sorted(latencies), 50), 2),
+    }
+
+
+def run(base_url, pid, requests, concurrency, warmup):
+    client = ApiClient(base_url, pool_size=concurrency, retries=0, keep_timings=False)
+    try:
+        headers = prepare_context(client)
+        return {name: measure(client, pid, path, headers.get(role) or {}, requests, concurrency, warmup)
+                for name, path, role in ENDPOINTS}
+    finally:
+        client.close()
+
+
+def print_results(results, baseline=None):
+    header = f"{'Endpoint':<26}{'CPU us/req':>12}{'p50 ms':>9}"
+    if baseline:
+        header += f"{'baseline us':>13}{'saved':>9}"
+    print(header)
+    print("-" * len(header))
+    for name, row in results.items():
+        line = f"{name:<26}{row['cpu_us_per_request']:>12.1f}{row['p50_ms']:>9.2f}"
+        base = (baseline or {}).get(name)
+        if base:
+            saved = base["cpu_us_per_request"] - row["cpu_us_per_request"]
+            share = saved / base["cpu_us_per_request"] * 100 if base["cpu_us_per_request"] else 0
+            line += f"{base['cpu_us_per_request']:>13.1f}{share:>8.0f}%"
+        print(line)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Measure server CPU per request on authenticated endpoints")
+    parser.add_argument("--base-url", default=None, help="API base URL (default: TURFHUB_BASE_URL)")
+    parser.add_argument("--server-pid", type=int, required=True, help="pid of the server process behind --base-url")
+    parser.add_argument("--requests", type=int, default=2000, help="measured requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--baseline", default=None, help="earlier run (e.g. AUTH_CACHE_SIZE=0) to compare with")
+    parser.add_argument("--save", default=None, help="write this run's results as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    print(f"🚀 Measuring server pid {args.server_pid}")
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as handle:
+            baseline = json.load(handle)
+    results = run(args.base_url, args.server_pid, args.requests, args.concurrency, args.warmup)
+
+    print()
+    print_results(results, baseline)
+    if args.save:
+        save_baseline(args.save, results)
+        print(f"\n💾 Saved results to {args.save}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
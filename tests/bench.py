@@ -0,0 +1,285 @@
+"""Endpoint latency benchmarks with stored baselines.
+
+Seeds each data-set size with tests/seed.py, times every GET route of the
+API, writes the results to a JSON baseline and compares later runs against
+it. Each route's mean latency is split into the server's Server-Timing spans
+(db, gateway, format), the rest of the handler, and the network/client
+overhead outside the server. The home page's first render is timed both
+ways it can load: the three concurrent /cities, /sports and /turfs calls the
+page used to make, and the single /bootstrap call it makes now. A route whose
+p50 or p95 grew past the threshold fails the run::
+
+    python -m tests.bench --update-baseline
+    python -m tests.bench --threshold 0.5
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from tests.http_client import ApiClient, login, parse_server_timing
+from tests.load import percentile
+from tests.seed import RUN_FIELD, SeedConfig, connect, seed, teardown
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                "test_reports", "bench_baseline.json")
+SPANS = ("db", "gateway", "format")
+
+SIZES = {
+    "small": SeedConfig(vendors=20, turfs_per_vendor=3, users=200, days=3),
+    "medium": SeedConfig(vendors=100, turfs_per_vendor=4, users=1000, days=5),
+    "large": SeedConfig(vendors=400, turfs_per_vendor=5, users=4000, days=7),
+}
+
+# (name, path template, auth) - templates are filled from the seeded context
+ROUTES = [
+    ("GET /turfs", "/turfs", None),
+    ("GET /turfs?city", "/turfs?city={city}", None),
+    ("GET /turfs/:id", "/turfs/{turf_id}", None),
+    ("GET /turfs/:id (mock)", "/turfs/turf-001", None),
+    ("GET /slots/:turfId", "/slots/{turf_id}?date={date}", None),
+    ("GET /slots/:turfId/range", "/slots/{turf_id}/range?from={date}&days=7", None),
+    ("GET /bootstrap", "/bootstrap", None),
+    ("GET /cities", "/cities", None),
+    ("GET /sports", "/sports", None),
+    ("GET /bookings", "/bookings", "customer"),
+    ("GET /vendor/profile", "/vendor/profile", "vendor"),
+    ("GET /vendor/turfs", "/vendor/turfs", "vendor"),
+    ("GET /vendor/turfs/:id", "/vendor/turfs/{turf_id}", "vendor"),
+    ("GET /admin/vendors", "/admin/vendors", None),
+    ("GET /admin/turfs", "/admin/turfs", None),
+]
+
+# Requests the home page waits on before its first render, sent concurrently like a browser
+FIRST_RENDERS = {
+    "first render (3 calls)": ("/cities", "/sports", "/turfs"),
+    "first render (bootstrap)": ("/bootstrap",),
+}
+
+
+def prepare_context(client, db, run_id):
+    """Pick a seeded approved turf, log in as its vendor and as a busy customer"""
+    turf = db.turfs.find_one({RUN_FIELD: run_id, "status": "approved"})
+    vendor = db.vendors.find_one({"vendorId": turf["vendorId"]})
+    booking = db.bookings.find_one({RUN_FIELD: run_id})
+    user = db.users.find_one({"userId": booking["userId"]}) if booking else db.users.find_one({RUN_FIELD: run_id})
+    tomorrow = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+    # Seeding bypasses the API, so re-approve one turf to drop the cached catalogue
+    client.post("/admin/turfs/approve", json={"turfId": turf["turfId"], "action": "approve"}).raise_for_status()
+    return {
+        "turf_id": turf["turfId"],
+        "city": turf["city"],
+        "date": tomorrow,
+        "tokens": {
+            "vendor": login(client, "/vendor", vendor["mobile"]),
+            "customer": login(client, "/auth", user["mobile"]),
+        },
+    }
+
+
+def measure(client, path, headers, iterations, warmup):
+    for _ in range(warmup):
+        client.get(path, headers=headers)
+    samples = []
+    errors = 0
+    server = defaultdict(float)
+    timed = 0
+    for _ in range(iterations):
+        start = time.perf_counter()
+        response = client.get(path, headers=headers)
+        samples.append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            errors += 1
+        spans = parse_server_timing(response.headers.get("Server-Timing"))
+        if "total" in spans:
+            timed += 1
+            for name, ms in spans.items():
+                server[name] += ms
+    mean_ms = sum(samples) / len(samples) * 1000
+    samples.sort()
+    return {
+        "count": iterations,
+        "errors": errors,
+        "mean_ms": mean_ms,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "breakdown_ms": breakdown({name: ms / timed for name, ms in server.items()}, mean_ms) if timed else None,
+    }
+
+
+def measure_page(client, paths, iterations, warmup):
+    """Wall time until every request of a page load has answered, plus the server time they cost"""
+    with ThreadPoolExecutor(max_workers=len(paths)) as pool:
+        def load():
+            return list(pool.map(client.get, paths))
+
+        for _ in range(warmup):
+            load()
+        samples = []
+        errors = 0
+        server_ms = 0.0
+        for _ in range(iterations):
+            start = time.perf_counter()
+            responses = load()
+            samples.append(time.perf_counter() - start)
+            errors += sum(1 for response in responses if response.status_code >= 400)
+            server_ms += sum(parse_server_timing(response.headers.get("Server-Timing")).get("total", 0.0)
+                             for response in responses)
+    mean_ms = sum(samples) / len(samples) * 1000
+    samples.sort()
+    return {
+        "count": iterations,
+        "errors": errors,
+        "requests": len(paths),
+        "mean_ms": mean_ms,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "server_ms": server_ms / iterations,
+        "breakdown_ms": None,
+    }
+
+
+def print_first_render(results):
+    before, after = (results.get(name) for name in FIRST_RENDERS)
+    if not before or not after:
+        return
+    saved = before["p50_ms"] - after["p50_ms"]
+    print(f"   First render: {before['requests']} calls p50 {before['p50_ms']:.2f} ms "
+          f"({before['server_ms']:.2f} ms server) -> bootstrap p50 {after['p50_ms']:.2f} ms "
+          f"({after['server_ms']:.2f} ms server), {saved:+.2f} ms saved")
+
+
+def breakdown(server, mean_ms):
+    """Mean latency attributed to server spans, the rest of the handler and the network"""
+    parts = {name: server.get(name, 0.0) for name in SPANS}
+    total = server["total"]
+    # Spans of concurrent queries can overlap, so their sum may exceed the total
+    parts["handler"] = max(total - sum(parts.values()), 0.0)
+    parts["network"] = max(mean_ms - total, 0.0)
+    return parts
+
+
+def print_breakdown(results):
+    columns = SPANS + ("handler", "network")
+    print(f"   {'Mean ms by part':<28}" + "".join(f"{name:>10}" for name in columns) + f"{'mean':>10}")
+    for name, row in results.items():
+        parts = row.get("breakdown_ms")
+        if parts:
+            print(f"   {name:<28}" + "".join(f"{parts[column]:>10.2f}" for column in columns)
+                  + f"{row['mean_ms']:>10.2f}")
+
+
+def run_size(client, db, size, config, iterations, warmup, routes=ROUTES):
+    summary = seed(db, config)
+    run_id = summary["runId"]
+    print(f"🌱 {size}: {summary}")
+    try:
+        context = prepare_context(client, db, run_id)
+        results = {}
+        for name, template, auth in routes:
+            headers = {"Authorization": f"Bearer {context['tokens'][auth]}"} if auth else {}
+            results[name] = measure(client, template.format(**context), headers, iterations, warmup)
+            row = results[name]
+            print(f"   {name:<28} p50 {row['p50_ms']:8.2f} ms   p95 {row['p95_ms']:8.2f} ms"
+                  + (f"   ⚠️ {row['errors']} errors" if row["errors"] else ""))
+        for name, paths in FIRST_RENDERS.items():
+            results[name] = measure_page(client, paths, iterations, warmup)
+        print_first_render(results)
+        print_breakdown(results)
+        return results
+    finally:
+        teardown(db, run_id)
+
+
+def run_benchmarks(client, db, sizes, iterations=30, warmup=3):
+    return {
+        "generatedAt": datetime.now(timezone.utc).isoformat(),
+        "baseUrl": client.base_url,
+        "iterations": iterations,
+        "sizes": {size: run_size(client, db, size, SIZES[size], iterations, warmup) for size in sizes},
+    }
+
+
+def compare(current, baseline, threshold, min_delta_ms=2.0):
+    """Routes whose p50 or p95 regressed by more than ``threshold`` (0.5 = +50%)"""
+    regressions = []
+    for size, routes in current["sizes"].items():
+        for route, row in routes.items():
+            base = baseline.get("sizes", {}).get(size, {}).get(route)
+            if not base:
+                continue
+            for metric in ("p50_ms", "p95_ms"):
+                limit = base[metric] * (1 + threshold)
+                # Ignore sub-millisecond jitter on very fast routes
+                if row[metric] > limit and row[metric] - base[metric] > min_delta_ms:
+                    regressions.append((size, route, metric, base[metric], row[metric]))
+    return regressions
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as handle:
+        return json.load(handle)
+
+
+def save_baseline(path, results):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as handle:
+        json.dump(results, handle, indent=2, sort_keys=True)
+        handle.write("\n")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark TurfHub GET endpoints against a stored baseline")
+    parser.add_argument("--base-url", default=None, help="API base URL (default: TURFHUB_BASE_URL)")
+    parser.add_argument("--sizes", default="small,medium", help=f"comma separated subset of {', '.join(SIZES)}")
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.5, help="allowed slowdown before failing (0.5 = +50%%)")
+    parser.add_argument("--update-baseline", action="store_true", help="write this run as the new baseline")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    sizes = [size.strip() for size in args.sizes.split(",") if size.strip()]
+    unknown = [size for size in sizes if size not in SIZES]
+    if unknown:
+        print(f"❌ Unknown size(s): {', '.join(unknown)}")
+        return 2
+
+    mongo_client, db = connect()
+
+    client = ApiClient(args.base_url, retries=0, keep_timings=False)
+    try:
+        print(f"🚀 Benchmarking {client.base_url} ({', '.join(sizes)})")
+        results = run_benchmarks(client, db, sizes, args.iterations, args.warmup)
+    finally:
+        client.close()
+        mongo_client.close()
+
+    baseline = load_baseline(args.baseline)
+    if args.update_baseline or baseline is None:
+        save_baseline(args.baseline, results)
+        print(f"💾 Baseline written to {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n❌ {len(regressions)} latency regression(s) beyond +{args.threshold * 100:.0f}%:")
+        for size, route, metric, before, after in regressions:
+            print(f"   [{size}] {route} {metric}: {before:.2f} ms -> {after:.2f} ms ({after / before:.1f}x)")
+        return 1
+    print(f"\n🎉 No regressions beyond +{args.threshold * 100:.0f}% against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
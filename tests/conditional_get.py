@@ -0,0 +1,107 @@
+"""Bytes on the wire per catalogue request: plain, compressed and revalidated.
+
+Fetches GET /turfs, /turfs/:id, /bootstrap, /cities and /sports three ways and counts
+the response bytes as sent (status line, headers and the still-encoded
+body):
+
+* plain       - ``Accept-Encoding: identity``, no validator (an old client)
+* compressed  - ``Accept-Encoding: br, gzip`` (first visit)
+* revalidated - compressed plus ``If-None-Match`` with the ETag from the
+                previous response, as a returning client with an unchanged
+                catalogue sends it; a 304 has no body
+
+Seed the server's database first (``python -m tests.seed seed``) for a
+realistic catalogue size::
+
+    python -m tests.conditional_get --base-url https://turf-hub.example.com/api
+"""
+
+import argparse
+import sys
+
+from tests.http_client import ApiClient
+
+MODES = ("plain", "compressed", "revalidated")
+
+
+def endpoints(client):
+    """(name, path) for each catalogue endpoint, with the busiest city and a listed turf"""
+    turfs = client.get("/turfs").json()["turfs"]
+    counts = {}
+    for turf in turfs:
+        counts[turf["city"]] = counts.get(turf["city"], 0) + 1
+    city = max(counts, key=counts.get)
+    return [
+        ("GET /turfs", "/turfs"),
+        (f"GET /turfs?city={city}", f"/turfs?city={city}"),
+        ("GET /turfs/:id", f"/turfs/{turfs[0]['id']}"),
+        ("GET /bootstrap", "/bootstrap"),
+        ("GET /cities", "/cities"),
+        ("GET /sports", "/sports"),
+    ]
+
+
+def wire_bytes(client, path, headers):
+    """(status, bytes as sent, ETag) of one GET; the body is counted before decoding"""
+    response = client.get(path, headers=headers, stream=True)
+    body = response.raw.read(decode_content=False)
+    head = len(f"HTTP/1.1 {response.status_code} {response.reason}\r\n") + 2
+    head += sum(len(name) + len(value) + 4 for name, value in response.raw.headers.items())
+    return response.status_code, head + len(body), response.headers.get("ETag")
+
+
+def measure(client, path, requests):
+    totals = dict.fromkeys(MODES, 0)
+    statuses = {mode: set() for mode in MODES}
+    for _ in range(requests):
+        status, size, _ = wire_bytes(client, path, {"Accept-Encoding": "identity"})
+        totals["plain"] += size
+        statuses["plain"].add(status)
+        status, size, etag = wire_bytes(client, path, {"Accept-Encoding": "br, gzip"})
+        totals["compressed"] += size
+        statuses["compressed"].add(status)
+        status, size, _ = wire_bytes(client, path, {"Accept-Encoding": "br, gzip", "If-None-Match": etag or ""})
+        totals["revalidated"] += size
+        statuses["revalidated"].add(status)
+    row = {mode: totals[mode] / requests for mode in MODES}
+    row["revalidated_status"] = sorted(statuses["revalidated"])
+    return row
+
+
+def print_results(results):
+    print(f"{'Endpoint':<30}{'plain B':>10}{'compressed B':>14}{'revalidated B':>15}{'saved/req':>11}{'saved':>8}")
+    print("-" * 88)
+    for name, row in results.items():
+        saved = row["plain"] - row["revalidated"]
+        share = saved / row["plain"] * 100 if row["plain"] else 0
+        print(f"{name:<30}{row['plain']:>10.0f}{row['compressed']:>14.0f}{row['revalidated']:>15.0f}"
+              f"{saved:>11.0f}{share:>7.0f}%")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Measure bytes saved by compression and ETag revalidation")
+    parser.add_argument("--base-url", default=None, help="API base URL (default: TURFHUB_BASE_URL)")
+    parser.add_argument("--requests", type=int, default=5, help="requests per endpoint and mode")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    client = ApiClient(args.base_url, retries=0, keep_timings=False)
+    try:
+        print(f"🚀 Measuring catalogue responses from {client.base_url}\n")
+        results = {name: measure(client, path, args.requests) for name, path in endpoints(client)}
+    finally:
+        client.close()
+
+    print_results(results)
+    stale = [name for name, row in results.items() if row["revalidated_status"] != [304]]
+    if stale:
+        print(f"\n❌ Revalidation did not return 304 for: {', '.join(stale)}")
+        return 1
+    print("\n🎉 Every unchanged catalogue response revalidated with 304")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
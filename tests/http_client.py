@@ -0,0 +1,154 @@
+"""Pooled HTTP client shared by the TurfHub test scripts.
+
+One keep-alive ``requests.Session`` per client with a bounded connection
+pool, retries with exponential backoff on 5xx for idempotent methods, a
+timeout on every request and automatic per-call timing.
+"""
+
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+BASE_URL = os.getenv("TURFHUB_BASE_URL", "https://turf-hub-1.preview.emergentagent.com/api")
+POOL_SIZE = int(os.getenv("TURFHUB_POOL_SIZE", "10"))
+RETRIES = int(os.getenv("TURFHUB_RETRIES", "3"))
+BACKOFF = float(os.getenv("TURFHUB_BACKOFF", "0.3"))
+TIMEOUT = float(os.getenv("TURFHUB_TIMEOUT", "15"))
+
+# Accepted by every dev and test deployment's OTP check
+OTP = "123456"
+
+# POST is left out on purpose: retrying create-order after a 5xx could
+# double-book a slot, so only idempotent calls are retried.
+RETRY_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRY_STATUSES = (500, 502, 503, 504)
+
+SERVER_TIMING_DURATION = re.compile(r"(?:^|;)\s*dur=([0-9.]+)")
+UUID_SEGMENT = re.compile(r"/[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}")
+
+
+def parse_server_timing(value):
+    """``db;dur=12.4, total;dur=14`` -> {"db": 12.4, "total": 14.0}; metrics without dur are skipped"""
+    spans = {}
+    for metric in (value or "").split(","):
+        name, _, params = metric.strip().partition(";")
+        match = SERVER_TIMING_DURATION.search(params)
+        if name and match:
+            spans[name] = spans.get(name, 0.0) + float(match.group(1))
+    return spans
+
+
+@dataclass
+class CallTiming:
+    method: str
+    endpoint: str
+    status: int  # 0 when the request raised before a response arrived
+    elapsed: float
+
+
+class ApiClient:
+    """Keep-alive API client with retries, timeouts and call timing"""
+
+    def __init__(self, base_url=None, pool_size=None, retries=None, backoff=None,
+                 timeout=None, keep_timings=True):
+        self.base_url = (base_url or BASE_URL).rstrip("/")
+        self.timeout = TIMEOUT if timeout is None else timeout
+        self.keep_timings = keep_timings
+        self.timings = []
+        self.listeners = []
+        self.lock = threading.Lock()
+
+        pool_size = POOL_SIZE if pool_size is None else pool_size
+        retry = Retry(
+            total=RETRIES if retries is None else retries,
+            backoff_factor=BACKOFF if backoff is None else backoff,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=RETRY_METHODS,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def url(self, path):
+        if path.startswith("http://") or path.startswith("https://"):
+            return path
+        return f"{self.base_url}{path}"
+
+    def add_listener(self, callback):
+        """Register ``callback(CallTiming)`` to be invoked after every call"""
+        self.listeners.append(callback)
+
+    def request(self, method, path, endpoint=None, **kwargs):
+        """Send a request; ``endpoint`` overrides the label used for timings"""
+        kwargs.setdefault("timeout", self.timeout)
+        label = endpoint or f"{method} {UUID_SEGMENT.sub('/:id', path.split('?')[0])}"
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, self.url(path), **kwargs)
+        except requests.RequestException:
+            self._record(CallTiming(method, label, 0, time.perf_counter() - start))
+            raise
+        self._record(CallTiming(method, label, response.status_code, time.perf_counter() - start))
+        return response
+
+    def get(self, path, **kwargs):
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request("POST", path, **kwargs)
+
+    def put(self, path, **kwargs):
+        return self.request("PUT", path, **kwargs)
+
+    def _record(self, timing):
+        if self.keep_timings:
+            with self.lock:
+                self.timings.append(timing)
+        for callback in self.listeners:
+            callback(timing)
+
+    def timing_summary(self):
+        """Call count, total and mean/max milliseconds grouped by endpoint"""
+        grouped = defaultdict(list)
+        with self.lock:
+            for timing in self.timings:
+                grouped[timing.endpoint].append(timing.elapsed)
+        return {
+            endpoint: {
+                "count": len(values),
+                "total_ms": sum(values) * 1000,
+                "mean_ms": sum(values) / len(values) * 1000,
+                "max_ms": max(values) * 1000,
+            }
+            for endpoint, values in grouped.items()
+        }
+
+    def print_timings(self):
+        summary = self.timing_summary()
+        if not summary:
+            return
+        print(f"\n⏱️  API call timings ({self.base_url})")
+        print(f"{'Endpoint':<40}{'Calls':>7}{'Total ms':>11}{'Mean ms':>10}{'Max ms':>10}")
+        for endpoint in sorted(summary, key=lambda e: -summary[e]["total_ms"]):
+            row = summary[endpoint]
+            print(f"{endpoint:<40}{row['count']:>7}{row['total_ms']:>11.1f}{row['mean_ms']:>10.1f}{row['max_ms']:>10.1f}")
+
+    def close(self):
+        self.session.close()
+
+
+def login(client, path_prefix, mobile):
+    """OTP login under ``path_prefix`` (``/auth`` or ``/vendor``); returns the bearer token"""
+    client.post(f"{path_prefix}/send-otp", json={"mobile": mobile}).raise_for_status()
+    response = client.post(f"{path_prefix}/verify-otp", json={"mobile": mobile, "otp": OTP})
+    response.raise_for_status()
+    return response.json()["token"]
@@ -0,0 +1,182 @@
+"""Index advisor and explain-plan checker for the TurfHub collections.
+
+Runs ``explain()`` for every query shape route.js issues, flags plans that
+fall back to a COLLSCAN and can create the compound indexes that serve them::
+
+    python -m tests.index_advisor            # report only
+    python -m tests.index_advisor --apply    # create missing indexes, then re-check
+
+Seed the database first (``python -m tests.seed seed``) so the planner has
+realistic data to choose from.
+"""
+
+import argparse
+import sys
+from dataclasses import dataclass, field
+
+
+@dataclass
+class QueryShape:
+    name: str
+    collection: str
+    build_filter: object         # callable(samples) -> filter document
+    index: list                  # recommended index keys
+    sort: list = None
+    unique: bool = False
+    options: dict = field(default_factory=dict)
+
+    @property
+    def index_name(self):
+        return "_".join(f"{key}_{direction}" for key, direction in self.index)
+
+
+# Every find/findOne shape in app/api/[[...path]]/route.js
+QUERY_SHAPES = [
+    QueryShape("catalogue: approved turfs ($match before the vendor $lookup)", "turfs",
+               lambda s: {"status": "approved"}, [("status", 1), ("vendorId", 1)]),
+    QueryShape("turf details / slots: turf by id", "turfs",
+               lambda s: {"turfId": s["turf_id"], "status": "approved"},
+               [("turfId", 1)], unique=True),
+    QueryShape("vendor dashboard: turfs by vendor", "turfs",
+               lambda s: {"vendorId": s["vendor_id"]},
+               [("vendorId", 1), ("createdAt", -1), ("_id", -1)], sort=[("createdAt", -1), ("_id", -1)]),
+    QueryShape("admin: all turfs newest first", "turfs",
+               lambda s: {}, [("createdAt", -1), ("_id", -1)], sort=[("createdAt", -1), ("_id", -1)]),
+    QueryShape("slots: active bookings for a turf-date", "bookings",
+               lambda s: {"turfId": s["turf_id"], "date": s["date"], "status": {"$in": ["confirmed", "pending"]}},
+               [("turfId", 1), ("date", 1), ("status", 1)]),
+    QueryShape("booking history: bookings by user", "bookings",
+               lambda s: {"userId": s["user_id"]},
+               [("userId", 1), ("createdAt", -1), ("_id", -1)], sort=[("createdAt", -1), ("_id", -1)]),
+    QueryShape("payment verify: bookings by id", "bookings",
+               lambda s: {"bookingId": {"$in": s["booking_ids"]}},
+               [("bookingId", 1)], unique=True),
+    QueryShape("customer login: user by mobile", "users",
+               lambda s: {"mobile": s["user_mobile"]}, [("mobile", 1)]),
+    QueryShape("profile: user by id", "users",
+               lambda s: {"userId": s["user_id"]}, [("userId", 1)], unique=True),
+    QueryShape("vendor login: vendor by mobile", "vendors",
+               lambda s: {"mobile": s["vendor_mobile"]}, [("mobile", 1)]),
+    QueryShape("vendor profile / catalogue $lookup: vendor by id", "vendors",
+               lambda s: {"vendorId": s["vendor_id"]}, [("vendorId", 1)], unique=True),
+    QueryShape("admin: all vendors newest first", "vendors",
+               lambda s: {}, [("createdAt", -1), ("_id", -1)], sort=[("createdAt", -1), ("_id", -1)]),
+]
+
+
+def sample_values(db):
+    """Real ids from the database so explain() sees representative selectivity"""
+    turf = db.turfs.find_one({"status": "approved"}) or {}
+    booking = db.bookings.find_one({"turfId": turf.get("turfId")}) or db.bookings.find_one() or {}
+    user = db.users.find_one({"userId": booking.get("userId")}) or db.users.find_one() or {}
+    vendor = db.vendors.find_one({"vendorId": turf.get("vendorId")}) or db.vendors.find_one() or {}
+    return {
+        "vendor_id": vendor.get("vendorId", ""),
+        "vendor_mobile": vendor.get("mobile", ""),
+        "turf_id": turf.get("turfId", ""),
+        "date": booking.get("date", ""),
+        "user_id": user.get("userId", ""),
+        "user_mobile": user.get("mobile", ""),
+        "booking_ids": [booking.get("bookingId", "")],
+    }
+
+
+def plan_stages(node):
+    """Every ``stage`` name anywhere in an explain plan tree"""
+    stages = []
+    if isinstance(node, dict):
+        if "stage" in node:
+            stages.append(node["stage"])
+        for value in node.values():
+            stages.extend(plan_stages(value))
+    elif isinstance(node, list):
+        for value in node:
+            stages.extend(plan_stages(value))
+    return stages
+
+
+def explain_shape(db, shape, samples):
+    cursor = db[shape.collection].find(shape.build_filter(samples))
+    if shape.sort:
+        cursor = cursor.sort(shape.sort)
+    explain = cursor.explain()
+    planner = explain.get("queryPlanner", {})
+    stats = explain.get("executionStats", {})
+    stages = plan_stages(planner.get("winningPlan", {}))
+    return {
+        "shape": shape,
+        "stages": stages,
+        "collscan": "COLLSCAN" in stages,
+        "in_memory_sort": "SORT" in stages,
+        "docs_examined": stats.get("totalDocsExamined"),
+        "returned": stats.get("nReturned"),
+        "millis": stats.get("executionTimeMillis"),
+    }
+
+
+def analyse(db):
+    samples = sample_values(db)
+    return [explain_shape(db, shape, samples) for shape in QUERY_SHAPES]
+
+
+def create_indexes(db, shapes=QUERY_SHAPES):
+    """Create the recommended index for each shape; returns the names created"""
+    from pymongo.errors import OperationFailure
+
+    created = []
+    for shape in shapes:
+        existing = db[shape.collection].index_information()
+        if any(list(info.get("key", [])) == shape.index for info in existing.values()):
+            continue
+        try:
+            created.append(db[shape.collection].create_index(shape.index, unique=shape.unique, **shape.options))
+        except OperationFailure as exc:
+            # Typically duplicate ids in old data blocking a unique index
+            print(f"❌ Could not create {shape.collection}.{shape.index_name}: {exc}")
+    return created
+
+
+def print_report(findings):
+    print(f"{'Query shape':<48}{'Plan':<28}{'Examined':>10}{'Returned':>10}  Recommended index")
+    print("-" * 130)
+    for finding in findings:
+        shape = finding["shape"]
+        flag = "❌" if finding["collscan"] else ("⚠️ " if finding["in_memory_sort"] else "✅")
+        plan = " > ".join(dict.fromkeys(finding["stages"]))
+        recommended = f"{shape.collection}.{shape.index_name}" + (" (unique)" if shape.unique else "")
+        print(f"{flag} {shape.name:<45}{plan[:27]:<28}{finding['docs_examined'] or 0:>10}"
+              f"{finding['returned'] or 0:>10}  {recommended if finding['collscan'] or finding['in_memory_sort'] else ''}")
+
+
+def run(db, apply=False):
+    """Print the explain report; with ``apply`` create indexes and re-check. True when no COLLSCAN is left"""
+    findings = analyse(db)
+    print_report(findings)
+    if apply:
+        created = create_indexes(db)
+        print(f"\n🛠️  Created {len(created)} index(es): {', '.join(created) or 'none needed'}\n")
+        findings = analyse(db)
+        print_report(findings)
+    scans = [f for f in findings if f["collscan"]]
+    if scans:
+        print(f"\n⚠️  {len(scans)} query shape(s) still scan a whole collection")
+        return False
+    print("\n🎉 Every query shape is served by an index")
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Explain TurfHub query shapes and recommend indexes")
+    parser.add_argument("--apply", action="store_true", help="create the recommended indexes")
+    args = parser.parse_args(argv)
+
+    from tests.seed import connect
+    client, db = connect()
+    try:
+        return 0 if run(db, args.apply) else 1
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,451 @@
+"""Behaviour checks for lib/*.js, run under node.
+
+Each check imports its lib module on its own, so one whose npm package is
+not installed (``razorpay`` for lib/payments.js, ``next`` for
+lib/responses.js, ``jsonwebtoken`` for lib/auth.js) is reported as skipped
+and the rest still run; ``yarn install`` first to run them all. The route
+and slot contracts are covered end to end by backend_test.py, and the slot
+engine by tests/slot_check.py::
+
+    python -m tests.lib_check
+    python -m tests.lib_check --only router,turfs
+"""
+
+import argparse
+import subprocess
+import sys
+
+from tests.node_runner import run_node
+
+MODULES = ["router", "slots", "availability", "turfs", "catalog", "metrics", "timing", "feed", "payments",
+           "responses", "auth"]
+
+NODE_SCRIPT = r"""
+import { readFileSync } from 'fs';
+
+const { only } = JSON.parse(readFileSync(0, 'utf8'));
+const checks = [];
+
+function check(name, fn) {
+  checks.push({ name, fn });
+}
+
+function assert(condition, message) {
+  if (!condition) throw new Error(message);
+}
+
+function equal(actual, expected, message) {
+  const got = JSON.stringify(actual);
+  const want = JSON.stringify(expected);
+  if (got !== want) throw new Error(`${message}: expected ${want}, got ${got}`);
+}
+
+function deferred() {
+  let resolve, reject;
+  const promise = new Promise((done, fail) => { resolve = done; reject = fail; });
+  return { promise, resolve, reject };
+}
+
+const sleep = ms => new Promise(resolve => setTimeout(resolve, ms));
+
+// Resolves with the next value pushed to `queue`, or rejects after `ms`
+function next(queue, ms = 2000) {
+  return new Promise((resolve, reject) => {
+    const timer = setTimeout(() => reject(new Error(`nothing received within ${ms} ms`)), ms);
+    queue.waiters.push(value => { clearTimeout(timer); resolve(value); });
+    queue.flush();
+  });
+}
+
+function queue() {
+  const items = [];
+  const q = {
+    waiters: [],
+    push(value) { items.push(value); q.flush(); },
+    flush() { while (items.length && q.waiters.length) q.waiters.shift()(items.shift()); }
+  };
+  return q;
+}
+
+check('router', async () => {
+  const { createRouter } = await import('./router.mjs');
+  const router = createRouter([
+    ['GET', '/api', 'index'],
+    ['GET', '/api/turfs/featured', 'featured'],
+    ['PUT', '/api/turfs/:turfId', 'updateTurf'],
+    ['GET', '/api/slots/:turfId', 'slots'],
+    ['GET', '/api/slots/:turfId/range', 'range']
+  ]);
+  const hit = (method, path) => {
+    const found = router.match(method, path);
+    return found && [found.handler, found.params];
+  };
+  equal(hit('GET', '/api/'), ['index', {}], 'empty segments are ignored');
+  equal(hit('GET', '/api/turfs/featured'), ['featured', {}], 'static route');
+  // The static branch has no PUT, so the walk falls back to the parameter
+  equal(hit('PUT', '/api/turfs/featured'), ['updateTurf', { turfId: 'featured' }], 'method matched in the walk');
+  equal(hit('GET', '/api/slots/t-1/range'), ['range', { turfId: 't-1' }], 'deeper static segment');
+  equal(hit('GET', '/api/slots/range'), ['slots', { turfId: 'range' }], 'parameter named like a segment');
+  equal(hit('DELETE', '/api/turfs/t-1'), null, 'unknown method');
+  equal(hit('GET', '/api/slots/t-1/range/extra'), null, 'too deep');
+  let threw = false;
+  try { router.add('GET', '/api/slots/:id', 'clash'); } catch (error) { threw = true; }
+  assert(threw, 'a second parameter name at one level is rejected');
+  threw = false;
+  try { router.add('GET', '/api/turfs/featured', 'again'); } catch (error) { threw = true; }
+  assert(threw, 'duplicate routes are rejected');
+});
+
+check('slots', async () => {
+  const { compileSlotTemplate, customSlotsError, slotPrice } = await import('./slots.mjs');
+  equal(customSlotsError(undefined), null, 'no customSlots');
+  equal(customSlotsError('06:00-07:00'), 'customSlots must be a list', 'not a list');
+  equal(customSlotsError([{ dayType: 'weekday', startTime: '18:00', endTime: '19:00', price: '2000' }]), null,
+    'one-hour slot');
+  for (const [slots, index] of [
+    [[{ dayType: 'weekday', startTime: '18:00', endTime: '20:00' }], 0],
+    [[{ dayType: 'weekday', startTime: '18:30', endTime: '19:30' }], 0],
+    [[{ dayType: 'holiday', startTime: '18:00', endTime: '19:00' }], 0],
+    [[{ dayType: 'weekend', startTime: '23:00', endTime: '24:00' }, { dayType: 'weekend', startTime: '06:00', endTime: '07:00', price: 'abc' }], 1]
+  ]) {
+    const message = customSlotsError(slots) || '';
+    assert(message.startsWith(`customSlots[${index}] `), `expected customSlots[${index}] rejected, got ${message}`);
+  }
+
+  // 2025-01-06 is a Monday, 2025-01-04 a Saturday
+  const template = compileSlotTemplate({ pricing: { basePrice: 1000, weekendEvening: 1800 } });
+  equal(slotPrice(template, '2025-01-06', 'slot-2025-01-06-18'), 1000, 'weekday base price');
+  equal(slotPrice(template, '2025-01-04', 'slot-2025-01-04-18'), 1800, 'weekend evening band');
+  equal(slotPrice(template, '2025-01-06', 'slot-2025-01-06-23'), null, 'hour after closing');
+  equal(slotPrice(template, '2025-01-06', 'slot-2025-01-07-18'), null, 'id for another date');
+  equal(slotPrice(template, '2025-01-06', 'slot-18'), null, 'malformed id');
+});
+
+check('availability', async () => {
+  const { hourMask, isBooked, slotHour } = await import('./availability.mjs');
+  equal(slotHour('slot-2025-01-06-18'), 18, 'hour of a slot id');
+  equal([slotHour('slot-2025-01-06-24'), slotHour('bad')], [null, null], 'out of range and malformed');
+  equal(hourMask(['slot-2025-01-06-6', 'slot-2025-01-06-7', 'bad']), (1 << 6) | (1 << 7), 'mask of slot ids');
+
+  const now = new Date('2025-01-06T10:00:00Z');
+  const later = new Date(now.getTime() + 60000);
+  const earlier = new Date(now.getTime() - 60000);
+  const availability = { confirmed: 1 << 6, pending: (1 << 7) | (1 << 8) | (1 << 9), holdUntil: { 7: later, 8: earlier } };
+  equal([6, 7, 8, 9, 10].map(hour => isBooked(availability, hour, now)), [true, true, false, true, false],
+    'confirmed, live hold, lapsed hold, hold without holdUntil, free');
+  equal([isBooked(null, 6, now), isBooked(availability, null, now)], [false, false], 'no document or hour');
+});
+
+check('turfs', async () => {
+  const { createTurfRepository } = await import('./turfs.mjs');
+  const loads = [];
+  const pending = new Map();
+  const repository = createTurfRepository({
+    seed: [['turf-001', { id: 'turf-001' }]],
+    ttlMs: 60000,
+    missTtlMs: 60000,
+    load: turfId => {
+      loads.push(turfId);
+      const wait = deferred();
+      pending.set(turfId, wait);
+      return wait.promise;
+    }
+  });
+
+  equal(await repository.get('turf-001'), { id: 'turf-001' }, 'pinned mock turf');
+  equal(loads, [], 'pinned turfs never load');
+
+  const together = [repository.get('t-1'), repository.get('t-1'), repository.get('t-1')];
+  pending.get('t-1').resolve({ turfId: 't-1' });
+  equal(await Promise.all(together), [{ turfId: 't-1' }, { turfId: 't-1' }, { turfId: 't-1' }], 'shared load');
+  await repository.get('t-1');
+  equal(loads, ['t-1'], 'concurrent and repeated lookups load once');
+
+  const miss = repository.get('missing');
+  pending.get('missing').resolve(null);
+  equal([await miss, await repository.get('missing')], [null, null], 'unknown id');
+  equal(loads.filter(id => id === 'missing').length, 1, 'misses are remembered');
+
+  // An invalidation during a load: the caller gets the value, the cache does not
+  const overtaken = repository.get('t-2');
+  repository.invalidate('t-2');
+  pending.get('t-2').resolve({ turfId: 't-2', name: 'old' });
+  equal(await overtaken, { turfId: 't-2', name: 'old' }, 'overtaken load still answers its caller');
+  const fresh = repository.get('t-2');
+  pending.get('t-2').resolve({ turfId: 't-2', name: 'new' });
+  equal(await fresh, { turfId: 't-2', name: 'new' }, 'overtaken load was not stored');
+
+  repository.invalidate();
+  const reload = repository.get('t-1');
+  pending.get('t-1').resolve({ turfId: 't-1' });
+  await reload;
+  equal(loads.filter(id => id === 't-1').length, 2, 'invalidate() drops every database turf');
+});
+
+check('catalog', async () => {
+  const { createCatalogCache, indexBy } = await import('./catalog.mjs');
+  let loads = 0;
+  let wait = deferred();
+  const cache = createCatalogCache({ ttlMs: 60000, load: () => { loads += 1; return wait.promise; } });
+  const together = [cache.get(), cache.get()];
+  wait.resolve(['v1']);
+  equal(await Promise.all(together), [['v1'], ['v1']], 'shared load');
+  equal([await cache.get(), loads], [['v1'], 1], 'cached after the load');
+
+  wait = deferred();
+  cache.invalidate();
+  const overtaken = cache.get();
+  cache.invalidate();
+  wait.resolve(['v2']);
+  equal(await overtaken, ['v2'], 'overtaken load answers its caller');
+  wait = deferred();
+  const fresh = cache.get();
+  wait.resolve(['v3']);
+  equal([await fresh, loads], [['v3'], 3], 'overtaken load was not stored');
+
+  const index = indexBy([{ id: 1, sports: ['a', 'b'] }, { id: 2, sports: ['b'] }], turf => turf.sports);
+  equal([...index].map(([key, turfs]) => [key, turfs.map(t => t.id)]), [['a', [1]], ['b', [1, 2]]], 'indexBy');
+});
+
+check('metrics', async () => {
+  const { createRegistry } = await import('./metrics.mjs');
+  const registry = createRegistry();
+  const requests = registry.counter('t_requests_total', 'Requests', ['route']);
+  const latency = registry.histogram('t_seconds', 'Latency', ['route'], [0.1, 1]);
+  registry.collect('t_broken', 'Fails on scrape', 'gauge', () => { throw new Error('boom'); });
+  registry.collect('t_pool', 'Pool size', 'gauge', () => [[{ pool: 'main' }, 4]]);
+  requests.inc({ route: '/api/turfs/:turfId' });
+  requests.inc({ route: '/api/turfs/:turfId' }, 2);
+  requests.inc({ route: 'say "hi"\n' });
+  [0.05, 0.5, 5].forEach(value => latency.observe({ route: '/a' }, value));
+
+  const originalError = console.error;
+  console.error = () => {};
+  let text;
+  try {
+    text = registry.render();
+  } finally {
+    console.error = originalError;
+  }
+  for (const line of [
+    '# TYPE t_requests_total counter',
+    't_requests_total{route="/api/turfs/:turfId"} 3',
+    't_requests_total{route="say \\"hi\\"\\n"} 1',
+    '# TYPE t_seconds histogram',
+    't_seconds_bucket{route="/a",le="0.1"} 1',
+    't_seconds_bucket{route="/a",le="1"} 2',
+    't_seconds_bucket{route="/a",le="+Inf"} 3',
+    't_seconds_sum{route="/a"} 5.55',
+    't_seconds_count{route="/a"} 3',
+    't_pool{pool="main"} 4'
+  ]) {
+    assert(text.split('\n').includes(line), `missing line ${line}`);
+  }
+  assert(!text.includes('t_broken'), 'a failing collector drops only its own metric');
+});
+
+check('timing', async () => {
+  const { addSpan, currentTiming, measure, measureSync, serverTimingHeader, timeRequest } = await import('./timing.mjs');
+  equal(currentTiming(), undefined, 'no timing outside a request');
+  addSpan(undefined, 'db', 1);
+  const { result, timing } = await timeRequest(async () => {
+    await measure('db', () => sleep(5));
+    await measure('db', async () => 'second');
+    return measureSync('format', () => currentTiming() !== undefined);
+  });
+  assert(result === true, 'spans are visible below the handler');
+  equal([timing.spans.get('db').count, timing.spans.get('format').count], [2, 1], 'span counts');
+  assert(timing.spans.get('db').ms >= 4, 'db span covers the awaited work');
+  const header = serverTimingHeader(timing);
+  assert(/^db;dur=[\d.]+, format;dur=[\d.]+, total;dur=[\d.]+$/.test(header), `Server-Timing header ${header}`);
+});
+
+check('feed', async () => {
+  const { createSlotFeed } = await import('./feed.mjs');
+  const { markPending } = await import('./availability.mjs');
+  const docs = new Map();
+  let reads = 0;
+  const db = {
+    collection: () => ({
+      // No change streams here, as on a standalone mongod: the feed polls
+      watch() { throw new Error('change streams need a replica set'); },
+      find: ({ _id }) => ({ toArray: async () => { reads += 1; return _id.$in.filter(id => docs.has(id)).map(id => docs.get(id)); } }),
+      async bulkWrite(operations) {
+        for (const { updateOne } of operations) {
+          const doc = docs.get(updateOne.filter._id) || { _id: updateOne.filter._id, pending: 0, confirmed: 0, holdUntil: {} };
+          doc.pending |= updateOne.update.$bit.pending?.or || 0;
+          for (const [field, value] of Object.entries(updateOne.update.$max || {})) {
+            doc.holdUntil[field.split('.')[1]] = value;
+          }
+          docs.set(doc._id, doc);
+        }
+      }
+    })
+  };
+  const feed = createSlotFeed({ connect: async () => db, pollMs: 50 });
+  const first = queue();
+  const second = queue();
+  const date = '2030-01-07';
+  const a = feed.subscribe('t-1', date, changes => first.push(changes));
+  const b = feed.subscribe('t-1', date, changes => second.push(changes));
+  equal(feed.stats().subscribers, 2, 'two subscribers on one topic');
+
+  const expiresAt = new Date(Date.now() + 300);
+  const readsBefore = reads;
+  await markPending(db, 't-1', [{ date, slotId: `slot-${date}-18` }, { date, slotId: `slot-${date}-19` }], expiresAt);
+  equal(await next(first), [{ hour: 18, available: false }, { hour: 19, available: false }], 'hold pushed');
+  equal(await next(second), [{ hour: 18, available: false }, { hour: 19, available: false }], 'to every subscriber');
+  assert(reads - readsBefore <= 2, 'a write is read once for all subscribers');
+
+  // Nothing writes when a hold lapses; the poll notices
+  equal(await next(first), [{ hour: 18, available: true }, { hour: 19, available: true }], 'lapsed hold pushed');
+  equal(feed.stats().upstream, 'poll', 'falls back to polling without change streams');
+
+  a.unsubscribe();
+  b.unsubscribe();
+  b.unsubscribe();
+  equal([feed.stats().upstream, feed.stats().topics], ['idle', 0], 'upstream stops with the last subscriber');
+});
+
+check('payments', async () => {
+  const { createCircuitBreaker, PaymentGatewayError } = await import('./payments.mjs');
+  const breaker = createCircuitBreaker({ failureThreshold: 2, resetMs: 200 });
+  let calls = 0;
+  const fail = error => () => { calls += 1; return Promise.reject(error); };
+  const ok = () => { calls += 1; return Promise.resolve('order'); };
+  const outcome = promise => promise.then(() => 'ok', error => error);
+
+  for (let i = 0; i < 3; i++) {
+    await outcome(breaker.call(fail({ statusCode: 400 })));
+  }
+  equal(breaker.state(), 'closed', 'client errors do not open the circuit');
+
+  await outcome(breaker.call(fail(new Error('down'))));
+  equal(await outcome(breaker.call(ok)), 'ok', 'a success resets the failure count');
+  await outcome(breaker.call(fail(new Error('down'))));
+  await outcome(breaker.call(fail(new PaymentGatewayError('Payment provider timed out', 1))));
+  equal(breaker.state(), 'open', 'opens after the threshold');
+
+  const before = calls;
+  const rejected = await outcome(breaker.call(ok));
+  assert(rejected instanceof PaymentGatewayError && rejected.retryAfterSeconds >= 1, 'open circuit fails fast');
+  equal(calls, before, 'open circuit does not call the provider');
+
+  await sleep(220);
+  equal(breaker.state(), 'half-open', 'half-open after resetMs');
+  const trial = deferred();
+  const trialCall = breaker.call(() => { calls += 1; return trial.promise; });
+  assert(await outcome(breaker.call(ok)) instanceof PaymentGatewayError, 'one trial call at a time');
+  trial.reject(new Error('still down'));
+  await outcome(trialCall);
+  equal(breaker.state(), 'open', 'a failed trial reopens the circuit');
+
+  await sleep(220);
+  equal(await outcome(breaker.call(ok)), 'ok', 'a successful trial');
+  equal(breaker.state(), 'closed', 'closes the circuit');
+});
+
+check('responses', async () => {
+  const { cachedJson, etagOf, isNotModified } = await import('./responses.mjs');
+  const request = headers => ({ headers: new Headers(headers) });
+  const etag = etagOf('catalog', 7, 'city=Mumbai');
+  equal(etag, etagOf('catalog', 7, 'city=Mumbai'), 'ETags are stable');
+  assert(etag !== etagOf('catalog', 8, 'city=Mumbai'), 'a new version is a new ETag');
+  const variant = etag.replace(/"$/, '-gz"');
+  equal([
+    isNotModified(request({}), etag),
+    isNotModified(request({ 'If-None-Match': etag }), etag),
+    isNotModified(request({ 'If-None-Match': `"other", W/${variant}` }), etag),
+    isNotModified(request({ 'If-None-Match': '*' }), etag)
+  ], [false, true, true, true], 'If-None-Match matching');
+
+  const body = { turfs: Array.from({ length: 100 }, (_, i) => ({ id: `turf-${i}`, name: 'Arena' })) };
+  const notModified = cachedJson(request({ 'If-None-Match': etag }), () => { throw new Error('built a 304 body'); }, { etag });
+  equal(notModified.status, 304, 'revalidated without building the body');
+  const compressed = cachedJson(request({ 'Accept-Encoding': 'gzip, br' }), body, { etag });
+  equal([compressed.headers.get('Content-Encoding'), compressed.headers.get('ETag')], ['br', etag.replace(/"$/, '-br"')],
+    'brotli preferred, with its own ETag');
+});
+
+check('auth', async () => {
+  const { default: jwt } = await import('jsonwebtoken');
+  const { createAuth, createTokenCache } = await import('./auth.mjs');
+  const secret = 'lib-check-secret';
+  const token = jwt.sign({ userId: 'u-1' }, secret, { expiresIn: '1h' });
+  const cache = createTokenCache({ secret, maxEntries: 10 });
+  equal([cache.verify(token).userId, cache.verify(token).userId], ['u-1', 'u-1'], 'claims');
+  equal(cache.stats(), { hits: 1, misses: 1 }, 'second verify is a cache hit');
+  let threw = false;
+  try { cache.verify(jwt.sign({ userId: 'u-2' }, 'wrong-secret')); } catch (error) { threw = true; }
+  equal([threw, cache.size()], [true, 1], 'bad signatures throw and are not cached');
+
+  const uncached = createTokenCache({ secret, maxEntries: 0 });
+  uncached.verify(token);
+  uncached.verify(token);
+  equal([uncached.stats(), uncached.size()], [{ hits: 0, misses: 2 }, 0], 'AUTH_CACHE_SIZE=0 disables the cache');
+
+  const auth = createAuth({ secret, maxEntries: 10 });
+  const vendorToken = jwt.sign({ vendorId: 'v-1', role: 'vendor' }, secret);
+  const request = { headers: new Headers({ Authorization: `Bearer ${vendorToken}` }) };
+  equal(auth.authenticate(request).vendor.vendorId, 'v-1', 'vendor role');
+  equal(auth.authenticate({ headers: new Headers({ Authorization: 'Bearer junk' }) }), { user: null, vendor: null },
+    'invalid tokens are anonymous');
+});
+
+const results = [];
+for (const { name, fn } of checks) {
+  if (only.length && !only.includes(name)) continue;
+  try {
+    await fn();
+    results.push({ name, status: 'passed' });
+  } catch (error) {
+    const missing = error.code === 'ERR_MODULE_NOT_FOUND' && /Cannot find package '([^']+)'/.exec(error.message);
+    results.push(missing
+      ? { name, status: 'skipped', detail: `npm package ${missing[1]} not installed` }
+      : { name, status: 'failed', detail: error.stack || String(error) });
+  }
+}
+process.stdout.write(JSON.stringify(results));
+"""
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Check lib/*.js behaviour under node")
+    parser.add_argument("--only", default="", help=f"comma separated subset of {', '.join(MODULES)}")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    only = [name.strip() for name in args.only.split(",") if name.strip()]
+    unknown = sorted(set(only) - set(MODULES))
+    if unknown:
+        print(f"❌ Unknown check(s): {', '.join(unknown)}")
+        return 2
+    try:
+        results = run_node(MODULES, NODE_SCRIPT, {"only": only})
+    except subprocess.CalledProcessError as exc:
+        print(f"❌ node exited with {exc.returncode}\n{exc.stderr}")
+        return 1
+    if results is None:
+        print("❌ node not found; install node to check lib/*.js")
+        return 1
+
+    for result in results:
+        if result["status"] == "passed":
+            print(f"✅ lib/{result['name']}.js")
+        elif result["status"] == "skipped":
+            print(f"⚠️  lib/{result['name']}.js skipped: {result['detail']} (run yarn install)")
+        else:
+            print(f"❌ lib/{result['name']}.js\n   " + result["detail"].replace("\n", "\n   "))
+    failed = [result for result in results if result["status"] == "failed"]
+    skipped = [result for result in results if result["status"] == "skipped"]
+    if failed:
+        print(f"\n⚠️  {len(failed)} lib check(s) failed")
+        return 1
+    print(f"\n🎉 {len(results) - len(skipped)} lib check(s) passed" + (f", {len(skipped)} skipped" if skipped else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
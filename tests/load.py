@@ -0,0 +1,317 @@
+"""Concurrent load generation for the TurfHub booking API.
+
+Replays the customer journey exercised by TurfHubTester
+(customer login -> slots -> create-order -> bookings) as N virtual users
+on a thread pool, with a linear ramp-up, a fixed run duration and an
+optional global requests-per-second ceiling. While it runs, GET /health is
+polled every ``health_interval`` seconds so database pool wait time can be
+charted against the request rate.
+"""
+
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+import requests
+
+from tests.http_client import OTP, ApiClient
+
+MOCK_TURF_IDS = ["turf-001", "turf-002", "turf-003", "turf-004", "turf-005", "turf-006"]
+
+
+@dataclass
+class LoadConfig:
+    base_url: str
+    users: int = 50
+    ramp_up: float = 10.0      # seconds until the last virtual user has started
+    duration: float = 60.0     # total run time in seconds, ramp-up included
+    target_rps: float = 0.0    # global request ceiling, 0 = unthrottled
+    turf_ids: list = field(default_factory=lambda: list(MOCK_TURF_IDS))
+    mobile_prefix: str = "95"  # virtual user n logs in as <prefix><n zero-padded>
+    booking_days: int = 5      # create-order picks a date within the next N days
+    timeout: float = 10.0
+    health_interval: float = 1.0  # seconds between GET /health polls, 0 = off
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class RateLimiter:
+    """Token bucket shared by all virtual users"""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.burst = max(1.0, rate * 0.1)
+        self.tokens = 0.0
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class LoadStats:
+    """Thread-safe latency and error collector keyed by endpoint"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.conflicts = defaultdict(int)
+        self.started = time.monotonic()
+        self.finished = None
+
+    def record(self, endpoint, elapsed, ok, conflict=False):
+        with self.lock:
+            self.latencies[endpoint].append(elapsed)
+            if conflict:
+                self.conflicts[endpoint] += 1
+            elif not ok:
+                self.errors[endpoint] += 1
+
+    def on_call(self, timing):
+        """ApiClient listener; a 409 is a lost slot race, not an error"""
+        conflict = timing.status == 409
+        self.record(timing.endpoint, timing.elapsed, 0 < timing.status < 400, conflict)
+
+    def total(self):
+        with self.lock:
+            return sum(len(values) for values in self.latencies.values())
+
+    def summary(self):
+        elapsed = (self.finished or time.monotonic()) - self.started
+        report = {}
+        with self.lock:
+            for endpoint, values in self.latencies.items():
+                ordered = sorted(values)
+                count = len(ordered)
+                report[endpoint] = {
+                    "count": count,
+                    "errors": self.errors[endpoint],
+                    "error_rate": self.errors[endpoint] / count if count else 0.0,
+                    "conflicts": self.conflicts[endpoint],
+                    "rps": count / elapsed if elapsed > 0 else 0.0,
+                    "p50_ms": percentile(ordered, 50) * 1000,
+                    "p95_ms": percentile(ordered, 95) * 1000,
+                    "p99_ms": percentile(ordered, 99) * 1000,
+                }
+        return report
+
+
+class VirtualUser:
+    """One simulated customer replaying the booking journey in a loop"""
+
+    def __init__(self, index, config, limiter, client, stats):
+        self.index = index
+        self.config = config
+        self.limiter = limiter
+        self.client = client
+        self.stats = stats
+        self.token = None
+        width = 10 - len(config.mobile_prefix)
+        self.mobile = f"{config.mobile_prefix}{index:0{width}d}"
+        self.rng = random.Random(index)
+
+    def call(self, endpoint, method, path, **kwargs):
+        self.limiter.acquire()
+        headers = kwargs.pop("headers", {})
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        try:
+            return self.client.request(method, path, endpoint=endpoint, headers=headers, **kwargs)
+        except requests.RequestException:
+            return None
+
+    def login(self):
+        self.token = None
+        response = self.call("POST /auth/send-otp", "POST", "/auth/send-otp", json={"mobile": self.mobile})
+        if response is None or response.status_code != 200:
+            return False
+        response = self.call("POST /auth/verify-otp", "POST", "/auth/verify-otp",
+                             json={"mobile": self.mobile, "otp": OTP})
+        if response is None or response.status_code != 200:
+            return False
+        self.token = response.json().get("token")
+        return bool(self.token)
+
+    def iteration(self):
+        turf_id = self.rng.choice(self.config.turf_ids)
+        day = datetime.now() + timedelta(days=self.rng.randint(1, self.config.booking_days))
+        date = day.strftime("%Y-%m-%d")
+
+        response = self.call("GET /slots/:turfId", "GET", f"/slots/{turf_id}", params={"date": date})
+        if response is None or response.status_code != 200:
+            return
+        available = [s for s in response.json().get("slots", []) if s.get("available")]
+        if not available:
+            return
+
+        slot = self.rng.choice(available)
+        order = {"turfId": turf_id, "slots": [{"slotId": slot["id"], "date": date}], "amount": slot["price"]}
+        self.call("POST /payment/create-order", "POST", "/payment/create-order", json=order)
+        self.call("GET /bookings", "GET", "/bookings")
+
+    def run(self, start_at, deadline):
+        delay = start_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        # One "login" row per user, so a user that never got a token counts
+        # against the error budget instead of silently dropping out
+        start = time.perf_counter()
+        logged_in = self.login()
+        self.stats.record("login", time.perf_counter() - start, logged_in)
+        if not logged_in:
+            return
+        while time.monotonic() < deadline:
+            self.iteration()
+
+
+def pool_stats(health):
+    """The connection pool counters of a /health body, or None when it has none (degraded or older server)"""
+    mongo = (health or {}).get("mongo")
+    pool = mongo.get("pool") if isinstance(mongo, dict) else None
+    return pool if isinstance(pool, dict) else None
+
+
+class HealthPoller(threading.Thread):
+    """Samples GET /health while the load runs: RPS vs. pool wait per interval
+
+    Pool counters are cumulative, so each sample diffs them against the
+    previous poll; ``wait_ms`` is the mean wait per connection check-out in
+    that interval.
+    """
+
+    def __init__(self, base_url, stats, interval, timeout):
+        super().__init__(daemon=True)
+        # A separate client, so the polls are not counted as load
+        self.client = ApiClient(base_url, retries=0, timeout=timeout, keep_timings=False)
+        self.stats = stats
+        self.interval = interval
+        self.stopping = threading.Event()
+        self.samples = []
+
+    def poll(self):
+        try:
+            response = self.client.get("/health")
+            return response.json() if response.status_code == 200 else None
+        except (requests.RequestException, ValueError):
+            return None
+
+    def run(self):
+        previous = self.poll()
+        previous_total = self.stats.total()
+        previous_at = time.monotonic()
+        while not self.stopping.wait(self.interval):
+            health = self.poll()
+            total = self.stats.total()
+            at = time.monotonic()
+            pool, before = pool_stats(health), pool_stats(previous)
+            if pool and before:
+                checkouts = pool.get("checkOuts", 0) - before.get("checkOuts", 0)
+                waited = pool.get("waitTimeMsTotal", 0) - before.get("waitTimeMsTotal", 0)
+                self.samples.append({
+                    "t": round(at - self.stats.started, 1),
+                    "rps": (total - previous_total) / (at - previous_at),
+                    "wait_ms": waited / checkouts if checkouts > 0 else 0.0,
+                    "in_use": pool.get("inUse", 0),
+                    "wait_queue": pool.get("waitQueueSize", 0),
+                    "ping_ms": health["mongo"].get("pingMs", 0.0),
+                })
+            previous, previous_total, previous_at = health if pool else previous, total, at
+
+    def stop(self):
+        self.stopping.set()
+        self.join()
+        self.client.close()
+
+
+def run_load(config, health_samples=None):
+    """Run the load scenario and return the per-endpoint summary
+
+    When ``health_samples`` is a list, the HealthPoller samples are appended to it.
+    """
+    stats = LoadStats()
+    limiter = RateLimiter(config.target_rps)
+    # Failed calls are part of the measurement, so the load client never retries
+    client = ApiClient(config.base_url, pool_size=config.users, retries=0,
+                       timeout=config.timeout, keep_timings=False)
+    client.add_listener(stats.on_call)
+    begin = time.monotonic()
+    deadline = begin + config.duration
+    step = config.ramp_up / config.users if config.users else 0
+    poller = None
+    if health_samples is not None and config.health_interval > 0:
+        poller = HealthPoller(config.base_url, stats, config.health_interval, config.timeout)
+        poller.start()
+
+    with ThreadPoolExecutor(max_workers=config.users) as pool:
+        futures = [pool.submit(VirtualUser(index, config, limiter, client, stats).run, begin + index * step, deadline)
+                   for index in range(config.users)]
+
+    stats.finished = time.monotonic()
+    client.close()
+    if poller:
+        poller.stop()
+        health_samples.extend(poller.samples)
+    # A virtual user that crashed is a harness bug, not load; re-raise it
+    for future in futures:
+        future.result()
+    return stats.summary()
+
+
+def print_report(report):
+    """Print the per-endpoint summary as a table"""
+    print(f"{'Endpoint':<32}{'Count':>8}{'RPS':>9}{'Err%':>8}{'409s':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    print("-" * 94)
+    for endpoint in sorted(report):
+        row = report[endpoint]
+        print(f"{endpoint:<32}{row['count']:>8}{row['rps']:>9.1f}{row['error_rate'] * 100:>7.1f}%{row['conflicts']:>7}"
+              f"{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}{row['p99_ms']:>10.1f}")
+
+
+def print_health_chart(samples, buckets=8, width=40):
+    """Chart mean pool wait per check-out against RPS, bucketed by request rate"""
+    if not samples:
+        print("No /health samples (endpoint unavailable or run too short)")
+        return
+    low = min(sample["rps"] for sample in samples)
+    high = max(sample["rps"] for sample in samples)
+    span = (high - low) / buckets or 1.0
+    grouped = defaultdict(list)
+    for sample in samples:
+        grouped[min(int((sample["rps"] - low) / span), buckets - 1)].append(sample)
+    rows = []
+    for bucket in sorted(grouped):
+        group = grouped[bucket]
+        rows.append((low + bucket * span, low + (bucket + 1) * span, len(group),
+                     sum(s["wait_ms"] for s in group) / len(group),
+                     max(s["wait_queue"] for s in group)))
+    scale = max(row[3] for row in rows) or 1.0
+    print(f"{'RPS':>15}{'Samples':>9}{'Wait ms':>10}{'Queue':>7}  Pool wait per check-out")
+    print("-" * 94)
+    for start, end, count, wait_ms, queue in rows:
+        bar = "█" * round(wait_ms / scale * width)
+        print(f"{start:>7.0f}-{end:<7.0f}{count:>9}{wait_ms:>10.3f}{queue:>7}  {bar}")
+    peak = max(samples, key=lambda s: s["in_use"])
+    print(f"Peak in use: {peak['in_use']} at {peak['t']}s | ping p50: "
+          f"{percentile(sorted(s['ping_ms'] for s in samples), 50):.2f} ms")
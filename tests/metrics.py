@@ -0,0 +1,254 @@
+"""Scrape GET /metrics and diff two snapshots.
+
+A snapshot is the parsed Prometheus text of one scrape. The diff of two is
+what the server did in between: per-route request counts, 5xx rate and
+p50/p95/p99 latency (estimated from the histogram buckets), MongoDB command
+timings, payment gateway outcomes, booking throughput and cache hit ratios.
+Counters that went backwards mean the server restarted in between; those are
+counted from zero. The load mode of backend_test.py scrapes before and after
+every run and prints this diff; on its own::
+
+    python -m tests.metrics --base-url https://turf-hub.example.com/api --save before.json
+    python -m tests.metrics --base-url https://turf-hub.example.com/api --save after.json
+    python -m tests.metrics --diff before.json after.json
+    python -m tests.metrics --base-url https://turf-hub.example.com/api --watch 60
+
+Set METRICS_TOKEN when the server requires it.
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import sys
+import time
+from collections import defaultdict
+
+import requests
+
+from tests.http_client import ApiClient
+
+SAMPLE = re.compile(r"([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})?\s+(\S+)")
+LABEL = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"')
+UNESCAPE = {"\\\\": "\\", '\\"': '"', "\\n": "\n"}
+HISTOGRAM_SUFFIXES = ("_bucket", "_sum", "_count")
+
+
+def parse_metrics(text):
+    """{"types": {metric: type}, "samples": [[sample name, labels, value]]} of one exposition"""
+    types, samples = {}, []
+    for line in text.splitlines():
+        if line.startswith("# TYPE "):
+            _, _, name, kind = line.split(None, 3)
+            types[name] = kind.strip()
+        elif line and not line.startswith("#"):
+            match = SAMPLE.fullmatch(line.strip())
+            if not match:
+                continue
+            name, labels, value = match.groups()
+            labels = {key: re.sub(r"\\[\\\"n]", lambda m: UNESCAPE[m.group()], raw)
+                      for key, raw in LABEL.findall(labels or "")}
+            samples.append([name, labels, float(value)])
+    return {"types": types, "samples": samples}
+
+
+def scrape(client):
+    """Snapshot of GET /metrics, or None when the server does not serve it"""
+    token = os.getenv("METRICS_TOKEN")
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    try:
+        response = client.get("/metrics", headers=headers)
+    except requests.RequestException:
+        return None
+    if response.status_code != 200:
+        return None
+    return {"at": time.time(), **parse_metrics(response.text)}
+
+
+def key_of(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def type_of(snapshot, name):
+    if name in snapshot["types"]:
+        return snapshot["types"][name]
+    for suffix in HISTOGRAM_SUFFIXES:
+        if name.endswith(suffix) and snapshot["types"].get(name[:-len(suffix)]) == "histogram":
+            return "histogram"
+    return "untyped"
+
+
+def start_time(snapshot):
+    return next((value for name, _, value in snapshot["samples"] if name == "process_start_time_seconds"), None)
+
+
+def diff(before, after):
+    """Counter and histogram increases from ``before`` to ``after``; gauges as of ``after``"""
+    old = {key_of(name, labels): value for name, labels, value in before["samples"]}
+    restarted = start_time(before) != start_time(after)
+    changes = {}
+    for name, labels, value in after["samples"]:
+        key = key_of(name, labels)
+        if type_of(after, name) in ("counter", "histogram"):
+            previous = old.get(key, 0.0)
+            changes[key] = value if restarted or value < previous else value - previous
+        else:
+            changes[key] = value
+    return {"seconds": after["at"] - before["at"], "restarted": restarted, "values": changes}
+
+
+def series(changes, name, *group_by):
+    """{group label values: {other labels: value}} of one sample name"""
+    grouped = defaultdict(dict)
+    for (sample, labels), value in changes["values"].items():
+        if sample == name:
+            labels = dict(labels)
+            grouped[tuple(labels.get(label, "") for label in group_by)][
+                tuple((k, v) for k, v in labels.items() if k not in group_by)] = value
+    return grouped
+
+
+def quantile(q, buckets):
+    """histogram_quantile(): ``buckets`` is [(upper bound, cumulative count)], +Inf last"""
+    buckets = sorted(buckets)
+    total = buckets[-1][1] if buckets else 0
+    if total == 0:
+        return math.nan
+    rank = q * total
+    lower, below = 0.0, 0.0
+    for bound, count in buckets:
+        if count >= rank:
+            if math.isinf(bound):
+                return lower
+            return lower + (bound - lower) * (rank - below) / (count - below) if count > below else bound
+        lower, below = bound, count
+    return lower
+
+
+def latency(changes, name, *group_by):
+    """{group: (count, sum, p50, p95, p99)} of a histogram's increase, in seconds"""
+    buckets = series(changes, name + "_bucket", *group_by)
+    sums = series(changes, name + "_sum", *group_by)
+    result = {}
+    for group, by_le in buckets.items():
+        points = [(float(dict(labels)["le"]), count) for labels, count in by_le.items()]
+        count = max(count for _, count in points)
+        if count:
+            result[group] = (count, sum(sums.get(group, {}).values()),
+                             *(quantile(q, points) for q in (0.5, 0.95, 0.99)))
+    return result
+
+
+def totals(changes, name, *group_by):
+    return {group: sum(values.values()) for group, values in series(changes, name, *group_by).items()}
+
+
+def print_diff(changes):
+    seconds = changes["seconds"] or 1.0
+    print(f"⏱️  {changes['seconds']:.1f} s between scrapes"
+          + (" (server restarted: counters taken from zero)" if changes["restarted"] else ""))
+
+    requests_by_status = series(changes, "turfhub_http_requests_total", "method", "route")
+    rows = [(group, stats) for group, stats in latency(changes, "turfhub_http_request_duration_seconds",
+                                                        "method", "route").items() if group[1] != "/api/metrics"]
+    print(f"\n{'Route':<40}{'Count':>8}{'RPS':>8}{'5xx%':>7}{'mean ms':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    print("-" * 99)
+    for (method, route), (count, total, p50, p95, p99) in sorted(rows, key=lambda row: -row[1][0]):
+        errors = sum(value for labels, value in requests_by_status[(method, route)].items()
+                     if dict(labels).get("status", "").startswith("5"))
+        print(f"{method + ' ' + route:<40}{count:>8.0f}{count / seconds:>8.1f}{errors / count * 100:>6.1f}%"
+              f"{total / count * 1000:>9.2f}{p50 * 1000:>9.2f}{p95 * 1000:>9.2f}{p99 * 1000:>9.2f}")
+    unhandled = sum(totals(changes, "turfhub_http_unhandled_errors_total").values())
+    if unhandled:
+        print(f"⚠️  {unhandled:.0f} unhandled handler errors")
+
+    commands = latency(changes, "turfhub_mongo_command_duration_seconds", "command")
+    failures = totals(changes, "turfhub_mongo_command_failures_total", "command")
+    if commands:
+        print(f"\n{'MongoDB command':<24}{'Count':>8}{'mean ms':>9}{'p95 ms':>9}{'Failed':>8}")
+        print("-" * 58)
+        for (command,), (count, total, _, p95, _) in sorted(commands.items(), key=lambda item: -item[1][0]):
+            print(f"{command:<24}{count:>8.0f}{total / count * 1000:>9.2f}{p95 * 1000:>9.2f}"
+                  f"{failures.get((command,), 0):>8.0f}")
+    checkouts = sum(totals(changes, "turfhub_mongo_pool_checkouts_total").values())
+    if checkouts:
+        waited = sum(totals(changes, "turfhub_mongo_pool_wait_seconds_total").values())
+        print(f"Pool: {checkouts:.0f} check-outs, {waited / checkouts * 1000:.3f} ms mean wait, "
+              f"{sum(totals(changes, 'turfhub_mongo_pool_checkout_failures_total').values()):.0f} failed")
+
+    gateway = totals(changes, "turfhub_payment_gateway_calls_total", "outcome")
+    if gateway:
+        timings = latency(changes, "turfhub_payment_gateway_call_duration_seconds", "outcome")
+        outcomes = ", ".join(
+            f"{outcome} {count:.0f}" + (f" ({timings[(outcome,)][1] / timings[(outcome,)][0] * 1000:.0f} ms mean)"
+                                       if (outcome,) in timings else "")
+            for (outcome,), count in sorted(gateway.items()) if count)
+        print(f"\n💳 Gateway calls: {outcomes or 'none'}")
+    for name, label, title in (("turfhub_orders_total", "result", "Orders"),
+                               ("turfhub_payment_verifications_total", "result", "Verifications"),
+                               ("turfhub_booking_slots_total", "status", "Slots")):
+        counts = {group[0]: value for group, value in totals(changes, name, label).items() if value}
+        if counts:
+            print(f"📦 {title}: " + ", ".join(f"{label} {value:.0f} ({value / seconds:.1f}/s)"
+                                             for label, value in sorted(counts.items())))
+    expired = sum(totals(changes, "turfhub_holds_expired_total").values())
+    if expired:
+        print(f"⌛ Holds expired: {expired:.0f}")
+
+    caches = series(changes, "turfhub_cache_lookups_total", "cache")
+    if caches:
+        print(f"\n{'Cache':<12}{'Lookups':>10}{'Hit ratio':>11}")
+        print("-" * 33)
+        for (cache,), results in sorted(caches.items()):
+            lookups = sum(results.values())
+            hits = sum(value for labels, value in results.items() if dict(labels)["result"] != "miss")
+            ratio = f"{hits / lookups * 100:.1f}%" if lookups else "-"
+            print(f"{cache:<12}{lookups:>10.0f}{ratio:>11}")
+    deliveries = sum(totals(changes, "turfhub_slot_feed_deliveries_total").values())
+    if deliveries:
+        print(f"📡 Slot feed: {sum(totals(changes, 'turfhub_slot_feed_events_total').values()):.0f} changes, "
+              f"{deliveries:.0f} deliveries, {sum(totals(changes, 'turfhub_slot_feed_reads_total').values()):.0f} reads")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape /metrics and diff snapshots")
+    parser.add_argument("--base-url", default=None, help="API base URL (default: TURFHUB_BASE_URL)")
+    parser.add_argument("--save", default=None, help="write the scraped snapshot to this JSON file")
+    parser.add_argument("--watch", type=float, default=0.0, help="scrape again after N seconds and print the diff")
+    parser.add_argument("--diff", nargs=2, metavar=("BEFORE", "AFTER"), help="diff two saved snapshots")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.diff:
+        with open(args.diff[0]) as before, open(args.diff[1]) as after:
+            print_diff(diff(json.load(before), json.load(after)))
+        return 0
+
+    client = ApiClient(args.base_url, retries=0, keep_timings=False)
+    try:
+        snapshot = scrape(client)
+        if snapshot is None:
+            print(f"❌ No metrics at {client.url('/metrics')}")
+            return 1
+        if args.watch:
+            time.sleep(args.watch)
+            later = scrape(client)
+            if later is None:
+                print("❌ Second scrape failed")
+                return 1
+            print_diff(diff(snapshot, later))
+            snapshot = later
+        if args.save:
+            with open(args.save, "w") as handle:
+                json.dump(snapshot, handle)
+            print(f"💾 {len(snapshot['samples'])} samples saved to {args.save}")
+    finally:
+        client.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
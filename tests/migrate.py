@@ -0,0 +1,44 @@
+"""One-off data migrations, run by hand against MONGO_URL/DB_NAME.
+
+Migrations are idempotent, so running one twice is harmless::
+
+    python -m tests.migrate active-flag
+"""
+
+import argparse
+
+from tests.seed import connect
+
+
+def active_flag(db):
+    """Flag bookings made before ``active`` existed, so the active-slot unique index covers them.
+
+    Run once before deploying booking holds; until then those bookings do not
+    hold their slots against new create-order calls.
+    """
+    result = db.bookings.update_many(
+        {"status": {"$in": ["pending", "confirmed"]}, "active": {"$exists": False}},
+        {"$set": {"active": True}},
+    )
+    return f"{result.modified_count} booking(s) flagged active"
+
+
+MIGRATIONS = {
+    "active-flag": active_flag,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a one-off TurfHub data migration")
+    parser.add_argument("migration", choices=sorted(MIGRATIONS))
+    args = parser.parse_args()
+
+    client, db = connect()
+    try:
+        print(f"🔧 {args.migration}: {MIGRATIONS[args.migration](db)}")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
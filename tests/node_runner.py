@@ -0,0 +1,55 @@
+"""Run a small ES module script against lib/*.js under node.
+
+The package is not "type": "module", so the requested lib modules (and the
+``@/lib/...`` modules they import) are copied as .mjs files into a scratch
+directory inside the repo, with ``@/lib/x`` rewritten to ``./x.mjs``. Bare
+package imports such as ``razorpay`` still resolve through the repo's
+node_modules. The script reads its JSON input from stdin and prints JSON.
+"""
+
+import json
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LIB_DIR = os.path.join(REPO_ROOT, "lib")
+LIB_IMPORT = re.compile(r"""(from\s+|import\s*\(\s*)(['"])@/lib/([\w-]+)\2""")
+
+
+def node_path():
+    return shutil.which("node")
+
+
+def _copy_module(name, workdir, copied):
+    if name in copied:
+        return
+    copied.add(name)
+    with open(os.path.join(LIB_DIR, f"{name}.js")) as handle:
+        source = handle.read()
+    for match in LIB_IMPORT.finditer(source):
+        _copy_module(match.group(3), workdir, copied)
+    with open(os.path.join(workdir, f"{name}.mjs"), "w") as handle:
+        handle.write(LIB_IMPORT.sub(lambda m: f"{m.group(1)}{m.group(2)}./{m.group(3)}.mjs{m.group(2)}", source))
+
+
+def run_node(modules, script, payload=None):
+    """Parsed stdout of ``script`` run with ``payload`` on stdin, or None when node is not installed.
+
+    ``modules`` names the lib modules the script imports as ``./<name>.mjs``.
+    """
+    node = node_path()
+    if node is None:
+        return None
+    with tempfile.TemporaryDirectory(prefix=".node-check-", dir=REPO_ROOT) as workdir:
+        copied = set()
+        for name in modules:
+            _copy_module(name, workdir, copied)
+        path = os.path.join(workdir, "check.mjs")
+        with open(path, "w") as handle:
+            handle.write(script)
+        output = subprocess.run([node, path], input=json.dumps(payload), capture_output=True,
+                                text=True, check=True, cwd=workdir).stdout
+    return json.loads(output)
@@ -0,0 +1,163 @@
+"""Routing micro-benchmark: lookup cost as the route table grows.
+
+Pads the API's route table (read from route.js) with synthetic vendor/admin
+routes and times lookups in lib/router.js, under node, against a linear scan
+of the same table, which is how route.js matched requests before (one
+comparison per route until a match). Trie lookups should stay flat as routes
+are added, and the run fails when they grow past ``--max-growth``::
+
+    python -m tests.route_bench
+    python -m tests.route_bench --route-counts 27,300,3000 --max-growth 3
+"""
+
+import argparse
+import os
+import re
+import sys
+
+from tests.node_runner import REPO_ROOT, run_node
+
+ROUTE_JS = os.path.join(REPO_ROOT, "app", "api", "[[...path]]", "route.js")
+
+NODE_SCRIPT = """
+import { readFileSync } from 'fs';
+import { createRouter } from './router.mjs';
+
+const { tables, sampleNs, repeat } = JSON.parse(readFileSync(0, 'utf8'));
+
+function linearRouter(routes) {
+  const compiled = routes.map(([method, pattern]) => pattern.includes(':')
+    ? { method, test: new RegExp('^' + pattern.replace(/:[^/]+/g, '[^/]+') + '/?$') }
+    : { method, path: pattern });
+  return {
+    match(method, path) {
+      for (const route of compiled) {
+        if (route.method === method && (route.test ? route.test.test(path) : route.path === path)) return route;
+      }
+      return null;
+    }
+  };
+}
+
+// Like timeit.autorange: double the loop count until a sample takes sampleNs
+function time(match, method, path) {
+  let number = 1;
+  let elapsed = 0;
+  for (;;) {
+    const start = process.hrtime.bigint();
+    for (let i = 0; i < number; i++) match(method, path);
+    elapsed = Number(process.hrtime.bigint() - start);
+    if (elapsed >= sampleNs) break;
+    number *= 2;
+  }
+  let best = elapsed / number;
+  for (let r = 1; r < repeat; r++) {
+    const start = process.hrtime.bigint();
+    for (let i = 0; i < number; i++) match(method, path);
+    best = Math.min(best, Number(process.hrtime.bigint() - start) / number);
+  }
+  return best;
+}
+
+const results = {};
+for (const [count, { routes, probes }] of Object.entries(tables)) {
+  const trie = createRouter(routes.map(([method, pattern]) => [method, pattern, pattern]));
+  const linear = linearRouter(routes);
+  results[count] = {};
+  for (const [name, method, path] of probes) {
+    results[count][name] = {
+      linear_ns: time(linear.match, method, path),
+      trie_ns: time(trie.match, method, path)
+    };
+  }
+}
+console.log(JSON.stringify(results));
+"""
+
+
+def api_routes():
+    """(method, pattern) for each entry of the createRouter() table in route.js"""
+    with open(ROUTE_JS) as handle:
+        return re.findall(r"\['(GET|POST|PUT|DELETE)', '(/api[^']*)', \w+\]", handle.read())
+
+
+def route_table(count):
+    """The API's routes padded to ``count`` with vendor/admin routes, added last like new branches"""
+    routes = api_routes()
+    for index in range(count - len(routes)):
+        if index % 2:
+            routes.append(("GET", f"/api/vendor/inventory-{index}/:itemId"))
+        else:
+            routes.append(("POST", f"/api/admin/reports/report-{index}"))
+    return routes
+
+
+def probes(routes):
+    """(name, method, path): the first route, a late API route, the last added route and a miss"""
+    last_method, last_pattern = routes[-1]
+    return [
+        ("first route", "GET", "/api"),
+        ("PUT /vendor/turfs/:id", "PUT", "/api/vendor/turfs/turf-123"),
+        ("last route", last_method, last_pattern.replace(":itemId", "item-1")),
+        ("not found", "GET", "/api/does-not-exist"),
+    ]
+
+
+def bench_node(counts, repeat):
+    """lib/router.js timings from node, or None when node is not installed"""
+    tables = {}
+    for count in counts:
+        routes = route_table(count)
+        tables[count] = {"routes": routes, "probes": probes(routes)}
+    output = run_node(["router"], NODE_SCRIPT, {"tables": tables, "sampleNs": 50_000_000, "repeat": repeat})
+    if output is None:
+        return None
+    return {int(count): rows for count, rows in output.items()}
+
+
+def growth(results):
+    """Trie lookup time over all probes at the largest table, relative to the smallest"""
+    def total(count):
+        return sum(row["trie_ns"] for row in results[count].values())
+    return total(max(results)) / total(min(results))
+
+
+def print_results(title, results):
+    print(f"\n⏱️  {title} (ns per lookup)")
+    print(f"{'Routes':>7}  {'Probe':<24}{'linear':>10}{'trie':>10}")
+    for count, rows in sorted(results.items()):
+        for name, row in rows.items():
+            print(f"{count:>7}  {name:<24}{row['linear_ns']:>10.0f}{row['trie_ns']:>10.0f}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark route table lookups as routes are added")
+    parser.add_argument("--route-counts", default=f"{len(api_routes())},300,3000",
+                        help="comma separated route table sizes")
+    parser.add_argument("--repeat", type=int, default=3, help="timings per probe; the fastest is kept")
+    parser.add_argument("--max-growth", type=float, default=3.0,
+                        help="allowed trie slowdown from the smallest to the largest table")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    minimum = len(api_routes())
+    counts = sorted({max(int(count), minimum) for count in args.route_counts.split(",") if count.strip()})
+
+    results = bench_node(counts, args.repeat)
+    if results is None:
+        print("❌ node not found; install node to benchmark lib/router.js")
+        return 1
+    print_results("lib/router.js", results)
+    if len(results) > 1:
+        ratio = growth(results)
+        ok = ratio <= args.max_growth
+        print(f"{'✅' if ok else '❌'} trie lookups {ratio:.2f}x from {min(results)} to {max(results)} routes"
+              f" (limit {args.max_growth:.1f}x)")
+        return 0 if ok else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
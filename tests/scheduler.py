@@ -0,0 +1,106 @@
+"""Dependency-aware parallel scheduler for test scenarios.
+
+Scenarios declare the scenarios they depend on; everything whose
+dependencies have passed runs concurrently on a shared thread pool, and
+dependents of a failed scenario are skipped instead of run.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+
+PASSED = "passed"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+
+@dataclass
+class Scenario:
+    name: str
+    run: object               # callable returning True on success
+    depends_on: tuple = ()
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    status: str
+    elapsed: float = 0.0
+    error: str = ""
+
+
+def validate(scenarios):
+    """Reject unknown dependencies and cycles before anything runs"""
+    by_name = {scenario.name: scenario for scenario in scenarios}
+    if len(by_name) != len(scenarios):
+        raise ValueError("Scenario names must be unique")
+    for scenario in scenarios:
+        missing = [dep for dep in scenario.depends_on if dep not in by_name]
+        if missing:
+            raise ValueError(f"{scenario.name} depends on unknown scenario(s): {', '.join(missing)}")
+
+    state = {}
+
+    def visit(name, path):
+        if state.get(name) == "done":
+            return
+        if state.get(name) == "visiting":
+            raise ValueError(f"Dependency cycle: {' -> '.join(path + [name])}")
+        state[name] = "visiting"
+        for dep in by_name[name].depends_on:
+            visit(dep, path + [name])
+        state[name] = "done"
+
+    for scenario in scenarios:
+        visit(scenario.name, [])
+
+
+def default_workers():
+    # Scenarios spend most of their time waiting on HTTP, so oversubscribe cores
+    return (os.cpu_count() or 1) * 4
+
+
+def run_scenarios(scenarios, max_workers=None, on_start=None, on_finish=None):
+    """Run ``scenarios`` respecting dependencies; returns results in input order"""
+    validate(scenarios)
+    results = {}
+    pending = {scenario.name: scenario for scenario in scenarios}
+    lock = threading.Lock()
+
+    def execute(scenario):
+        if on_start:
+            on_start(scenario)
+        start = time.perf_counter()
+        try:
+            status, message = (PASSED if scenario.run() else FAILED), ""
+        except Exception as exc:
+            status, message = FAILED, str(exc)
+        result = ScenarioResult(scenario.name, status, time.perf_counter() - start, message)
+        if on_finish:
+            with lock:
+                on_finish(result)
+        return result
+
+    with ThreadPoolExecutor(max_workers=max_workers or default_workers()) as pool:
+        running = {}
+        while pending or running:
+            for name, scenario in list(pending.items()):
+                deps = [results.get(dep) for dep in scenario.depends_on]
+                if any(dep is not None and dep.status != PASSED for dep in deps):
+                    results[name] = ScenarioResult(name, SKIPPED, error="dependency did not pass")
+                    del pending[name]
+                    if on_finish:
+                        with lock:
+                            on_finish(results[name])
+                elif all(dep is not None for dep in deps):
+                    running[pool.submit(execute, scenario)] = name
+                    del pending[name]
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[running.pop(future)] = future.result()
+
+    return [results[scenario.name] for scenario in scenarios]
@@ -0,0 +1,288 @@
+"""Bulk seeding and teardown of TurfHub fixture data.
+
+Generates realistic vendors, turfs, customers and bookings and writes them
+with batched ``insert_many`` calls. Every seeded document carries the run's
+``seedRunId`` so teardown is one indexed ``delete_many`` per collection::
+
+    python -m tests.seed seed --vendors 2000 --turfs-per-vendor 5 --days 14
+    python -m tests.seed teardown --run-id <run id printed by seed>
+"""
+
+import argparse
+import os
+import random
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+
+RUN_FIELD = "seedRunId"
+SEED_COLLECTIONS = ("vendors", "turfs", "users", "bookings")
+
+CITIES = {
+    "Mumbai": ["Andheri West", "Bandra East", "Powai", "Goregaon", "Dadar"],
+    "Delhi": ["Dwarka", "Rohini", "Saket", "Karol Bagh", "Vasant Kunj"],
+    "Bangalore": ["Koramangala", "Whitefield", "Indiranagar", "HSR Layout", "Jayanagar"],
+    "Pune": ["Baner", "Kothrud", "Viman Nagar", "Hinjewadi"],
+    "Hyderabad": ["Gachibowli", "Madhapur", "Kondapur", "Banjara Hills"],
+    "Chennai": ["Velachery", "Anna Nagar", "Adyar", "OMR"],
+}
+SPORTS = ["Football", "Cricket", "Badminton", "Tennis", "Basketball", "Volleyball"]
+AMENITIES = ["Floodlights", "Parking", "Changing Room", "Washroom", "Cafeteria", "First Aid", "Pro Shop"]
+SURFACES = ["Artificial Grass", "Natural Grass", "Hybrid Grass", "Premium Artificial Grass"]
+
+# Share of each hour's slots that are booked at density 1.0: quiet middays,
+# a morning bump and a packed 6-10 PM peak.
+HOURLY_DEMAND = {
+    6: 0.35, 7: 0.45, 8: 0.4, 9: 0.25, 10: 0.15, 11: 0.1, 12: 0.1, 13: 0.1,
+    14: 0.12, 15: 0.18, 16: 0.3, 17: 0.55, 18: 0.8, 19: 0.9, 20: 0.85, 21: 0.7, 22: 0.45,
+}
+
+
+@dataclass
+class SeedConfig:
+    vendors: int = 100
+    turfs_per_vendor: int = 5
+    users: int = 1000
+    days: int = 7                  # booking horizon starting today
+    density: float = 1.0           # multiplier on HOURLY_DEMAND
+    approved_share: float = 0.9    # remaining turfs stay pending
+    active_share: float = 0.95     # remaining vendors are deactivated
+    custom_slot_share: float = 0.3
+    batch_size: int = 1000
+    seed: int = 0
+    cities: dict = field(default_factory=lambda: dict(CITIES))
+
+
+def new_run_id():
+    return f"seed-{datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def ensure_run_indexes(db):
+    """Index seedRunId everywhere so teardown never scans a collection"""
+    for name in SEED_COLLECTIONS:
+        db[name].create_index([(RUN_FIELD, 1)], sparse=True)
+
+
+class Seeder:
+    """Generates one seed run's documents and bulk-inserts them"""
+
+    def __init__(self, db, config, run_id=None):
+        self.db = db
+        self.config = config
+        self.run_id = run_id or new_run_id()
+        self.rng = random.Random(config.seed)
+        # Keeps mobiles unique across runs that share a database
+        self.mobile_tag = int(uuid.uuid5(uuid.NAMESPACE_DNS, self.run_id).hex[:6], 16) % 1000
+        self.now = datetime.now(timezone.utc)
+        self.vendor_ids = []
+        self.user_ids = []
+        self.approved_turfs = []
+
+    def insert(self, collection, documents):
+        count = 0
+        for batch in batched(documents, self.config.batch_size):
+            self.db[collection].insert_many(batch, ordered=False)
+            count += len(batch)
+        return count
+
+    def vendors(self):
+        for index in range(self.config.vendors):
+            vendor_id = str(uuid.uuid4())
+            self.vendor_ids.append(vendor_id)
+            yield {
+                "vendorId": vendor_id,
+                "businessName": f"Seed Sports {index}",
+                "ownerName": f"Seed Owner {index}",
+                "mobile": f"6{self.mobile_tag:03d}{index:06d}",
+                "email": f"seed{index}@vendor.test",
+                "gst": "",
+                "pan": "",
+                "status": "approved",
+                "isActive": self.rng.random() < self.config.active_share,
+                "bankDetails": {},
+                "createdAt": self.now - timedelta(days=self.rng.randint(30, 720)),
+                RUN_FIELD: self.run_id,
+            }
+
+    def users(self):
+        for index in range(self.config.users):
+            user_id = str(uuid.uuid4())
+            self.user_ids.append(user_id)
+            yield {
+                "userId": user_id,
+                "mobile": f"5{self.mobile_tag:03d}{index:06d}",
+                "name": f"Seed Player {index}",
+                "email": "",
+                "dob": "",
+                "createdAt": self.now - timedelta(days=self.rng.randint(1, 365)),
+                RUN_FIELD: self.run_id,
+            }
+
+    def custom_slots(self, base_price):
+        slots = []
+        for day_type in ("weekday", "weekend"):
+            start = self.rng.choice([6, 7, 8])
+            for hour in range(start, 22):
+                slots.append({
+                    "dayType": day_type,
+                    "startTime": f"{hour:02d}:00",
+                    "endTime": f"{hour + 1:02d}:00",
+                    "price": base_price + (300 if hour >= 17 else 0) + (200 if day_type == "weekend" else 0),
+                })
+        return slots
+
+    def turfs(self):
+        rng = self.rng
+        for vendor_index, vendor_id in enumerate(self.vendor_ids):
+            for index in range(self.config.turfs_per_vendor):
+                city = rng.choice(list(self.config.cities))
+                location = rng.choice(self.config.cities[city])
+                base_price = rng.randrange(800, 3001, 100)
+                approved = rng.random() < self.config.approved_share
+                turf = {
+                    "turfId": str(uuid.uuid4()),
+                    "vendorId": vendor_id,
+                    "name": f"Seed Arena {vendor_index}-{index}",
+                    "description": f"Seeded turf in {location}, {city}",
+                    "location": location,
+                    "city": city,
+                    "area": location,
+                    "pincode": f"{rng.randint(110001, 600099)}",
+                    "sportTypes": rng.sample(SPORTS, rng.randint(1, 3)),
+                    "turfType": rng.choice(["outdoor", "indoor"]),
+                    "surface": rng.choice(SURFACES),
+                    "size": rng.choice(["5-a-side", "7-a-side", "11-a-side"]),
+                    "capacity": rng.choice([10, 14, 22]),
+                    "amenities": rng.sample(AMENITIES, rng.randint(2, 5)),
+                    "pricing": {
+                        "basePrice": base_price,
+                        "weekdayMorning": base_price,
+                        "weekdayEvening": base_price + 300,
+                        "weekendMorning": base_price + 200,
+                        "weekendEvening": base_price + 500,
+                    },
+                    "operatingHours": {"opening": "06:00", "closing": "23:00"},
+                    "customSlots": self.custom_slots(base_price) if rng.random() < self.config.custom_slot_share else [],
+                    "images": [f"https://images.unsplash.com/photo-seed-{rng.randint(1, 10**6)}?w=800"
+                               for _ in range(3)],
+                    "policies": {},
+                    "googleMapsLink": "",
+                    "rating": round(rng.uniform(3.5, 5.0), 1),
+                    "totalBookings": 0,
+                    "status": "approved" if approved else "pending",
+                    "createdAt": self.now - timedelta(days=rng.randint(1, 365)),
+                    RUN_FIELD: self.run_id,
+                }
+                if approved:
+                    self.approved_turfs.append((turf["turfId"], base_price))
+                yield turf
+
+    def bookings(self):
+        rng = self.rng
+        today = self.now.date()
+        for turf_id, price in self.approved_turfs:
+            for offset in range(self.config.days):
+                date = (today + timedelta(days=offset)).isoformat()
+                for hour, demand in HOURLY_DEMAND.items():
+                    if rng.random() >= demand * self.config.density:
+                        continue
+                    confirmed = rng.random() < 0.85
+                    booking = {
+                        "bookingId": str(uuid.uuid4()),
+                        "userId": rng.choice(self.user_ids),
+                        "turfId": turf_id,
+                        "slotId": f"slot-{date}-{hour}",
+                        "date": date,
+                        "amount": price,
+                        "orderId": f"order_seed{uuid.uuid4().hex[:10]}",
+                        "status": "confirmed" if confirmed else "pending",
+                        "active": True,
+                        "createdAt": self.now - timedelta(minutes=rng.randint(1, 60 * 24 * 14)),
+                        RUN_FIELD: self.run_id,
+                    }
+                    if confirmed:
+                        booking["paymentId"] = f"pay_seed{uuid.uuid4().hex[:10]}"
+                        booking["confirmedAt"] = booking["createdAt"] + timedelta(minutes=2)
+                    yield booking
+
+    def run(self):
+        ensure_run_indexes(self.db)
+        # Order matters: turfs need vendor ids, bookings need users and approved turfs
+        return {
+            "runId": self.run_id,
+            "vendors": self.insert("vendors", self.vendors()),
+            "users": self.insert("users", self.users()),
+            "turfs": self.insert("turfs", self.turfs()),
+            "bookings": self.insert("bookings", self.bookings()),
+        }
+
+
+def seed(db, config=None, run_id=None):
+    """Seed one run and return the per-collection document counts"""
+    return Seeder(db, config or SeedConfig(), run_id).run()
+
+
+def teardown(db, run_id):
+    """Delete everything one seed run created, including availability bitmaps built from it"""
+    turf_ids = [turf["turfId"] for turf in db.turfs.find({RUN_FIELD: run_id})]
+    deleted = {name: db[name].delete_many({RUN_FIELD: run_id}).deleted_count for name in SEED_COLLECTIONS}
+    deleted["slotAvailability"] = db.slotAvailability.delete_many({"turfId": {"$in": turf_ids}}).deleted_count
+    return deleted
+
+
+def connect():
+    from dotenv import load_dotenv
+    from pymongo import MongoClient
+
+    load_dotenv()
+    client = MongoClient(os.getenv("MONGO_URL", "mongodb://localhost:27017"))
+    return client, client[os.getenv("DB_NAME", "turfhub")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed or tear down TurfHub load-test data")
+    commands = parser.add_subparsers(dest="command", required=True)
+    seed_cmd = commands.add_parser("seed", help="generate and insert a data set")
+    seed_cmd.add_argument("--run-id", default=None)
+    seed_cmd.add_argument("--vendors", type=int, default=100)
+    seed_cmd.add_argument("--turfs-per-vendor", type=int, default=5)
+    seed_cmd.add_argument("--users", type=int, default=1000)
+    seed_cmd.add_argument("--days", type=int, default=7)
+    seed_cmd.add_argument("--density", type=float, default=1.0)
+    seed_cmd.add_argument("--batch-size", type=int, default=1000)
+    seed_cmd.add_argument("--seed", type=int, default=0)
+    teardown_cmd = commands.add_parser("teardown", help="delete every document of one run")
+    teardown_cmd.add_argument("--run-id", required=True)
+    args = parser.parse_args()
+
+    client, db = connect()
+    try:
+        if args.command == "seed":
+            config = SeedConfig(
+                vendors=args.vendors,
+                turfs_per_vendor=args.turfs_per_vendor,
+                users=args.users,
+                days=args.days,
+                density=args.density,
+                batch_size=args.batch_size,
+                seed=args.seed,
+            )
+            print(f"🌱 Seeded: {seed(db, config, args.run_id)}")
+        else:
+            print(f"🧹 Deleted: {teardown(db, args.run_id)}")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
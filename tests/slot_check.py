@@ -0,0 +1,240 @@
+"""Slot engine check: compiled templates against a naive reference model.
+
+Generates random turf schedules (operatingHours with odd minutes, midnight
+and missing closings, partial or invalid pricing bands, customSlots with
+duplicate starts, half-hour starts, multi-hour spans and unknown field
+names) and stamps each onto several random dates with
+random booked hours and, for some, a current time that hides earlier slots.
+
+The reference model works out every date from scratch, hour by hour, with no
+templates; its output must equal lib/slots.js, run under node, slot for slot.
+tests/stand_in_server.py serves its slots from the same reference model::
+
+    python -m tests.slot_check
+    python -m tests.slot_check --turfs 5000 --dates 6 --seed 7
+"""
+
+import argparse
+import json
+import random
+import sys
+from datetime import date as Date, datetime, timedelta
+
+from tests.node_runner import run_node
+
+NODE_SCRIPT = """
+import { readFileSync } from 'fs';
+import { compileSlotTemplate, slotTemplateOf, stampSlots } from './slots.mjs';
+
+const { turfs, cases } = JSON.parse(readFileSync(0, 'utf8'));
+
+// Stored templates go through JSON like a Mongo round trip; the rest compile on read
+const templates = turfs.map((turf, index) => index % 2
+  ? JSON.parse(JSON.stringify(compileSlotTemplate(turf)))
+  : slotTemplateOf(turf));
+const results = cases.map(({ turf, date, booked, currentTime }) => {
+  const taken = new Set(booked);
+  return stampSlots(templates[turf], date, hour => taken.has(hour), currentTime ? new Date(currentTime) : null);
+});
+process.stdout.write(JSON.stringify(results));
+"""
+
+DAY_TYPES = ("weekday", "weekend")
+BANDS = (("Morning", 6, 12), ("Evening", 18, 23))
+
+
+# -- reference model ---------------------------------------------------------
+
+def ref_minutes(value):
+    if value is None:
+        return None
+    parts = str(value).strip().split(":")
+    if len(parts) != 2:
+        return None
+    hours, minutes = parts
+    if not (1 <= len(hours) <= 2 and len(minutes) == 2 and (hours + minutes).isascii()
+            and hours.isdigit() and minutes.isdigit()):
+        return None
+    total = int(hours) * 60 + int(minutes)
+    return total if int(minutes) < 60 and total <= 24 * 60 else None
+
+
+def ref_price(value):
+    """A price field as an amount: numbers and decimal strings of zero or more"""
+    if isinstance(value, str):
+        text = value.strip()
+        if not text or not all(part.isdigit() and part.isascii() for part in text.split(".", 1)):
+            return None
+        value = float(text)
+    if type(value) not in (int, float) or value != value or value in (float("inf"), float("-inf")):
+        return None
+    return value if value >= 0 else None
+
+
+def ref_hour_price(turf, day_type, hour):
+    pricing = turf.get("pricing") or {}
+    for name, start, end in BANDS:
+        if start <= hour < end and ref_price(pricing.get(day_type + name)) is not None:
+            return ref_price(pricing.get(day_type + name))
+    for base in (pricing.get("basePrice"), turf.get("pricePerHour")):
+        if ref_price(base) is not None:
+            return ref_price(base)
+    return 0
+
+
+def ref_day(turf, day_type):
+    """[(hour, time, endTime, price)] for one day type"""
+    listed = []
+    for slot in turf.get("customSlots") if isinstance(turf.get("customSlots"), list) else []:
+        if not isinstance(slot, dict):
+            continue
+        # Only one-hour slots on the hour; anything longer would span several bitmap bits
+        start, end = ref_minutes(slot.get("startTime")), ref_minutes(slot.get("endTime"))
+        if slot.get("dayType") == day_type and start is not None and start % 60 == 0 and end == start + 60:
+            listed.append((start, slot.get("price")))
+
+    day = []
+    for hour in range(24):
+        first = next((slot for slot in listed if slot[0] == hour * 60), None)
+        if first:
+            price = ref_price(first[1])
+            day.append((hour, f"{hour:02d}:00", f"{hour + 1:02d}:00",
+                        ref_hour_price(turf, day_type, hour) if price is None else price))
+    if day:
+        return day
+
+    hours = turf.get("operatingHours") or {}
+    opening, closing = ref_minutes(hours.get("opening")), ref_minutes(hours.get("closing"))
+    if opening is None or closing is None:
+        opening, closing = 6 * 60, 23 * 60
+    if closing <= opening:
+        closing = 24 * 60
+    return [(hour, f"{hour:02d}:00", f"{hour + 1:02d}:00", ref_hour_price(turf, day_type, hour))
+            for hour in range(24) if hour * 60 >= opening and (hour + 1) * 60 <= closing]
+
+
+def reference_slots(turf, date, booked, current_time):
+    midnight = datetime.strptime(date, "%Y-%m-%d")
+    day_type = "weekend" if midnight.isoweekday() in (6, 7) else "weekday"
+    return [{"id": f"slot-{date}-{hour}", "time": time, "endTime": end_time, "price": price,
+             "available": hour not in booked}
+            for hour, time, end_time, price in ref_day(turf, day_type)
+            if not (current_time and midnight + timedelta(hours=hour) <= current_time)]
+
+
+# -- random schedules --------------------------------------------------------
+
+def random_time(rng):
+    if rng.random() < 0.15:
+        return rng.choice([None, "", "6", "6:00", "7:5", "25:00", "24:30", "ab:cd", " 07:00 ", "06.00", "24:00"])
+    return f"{rng.randint(0, 24):02d}:{rng.choice([0, 0, 0, 30, 15, 59]):02d}"
+
+
+def random_price(rng):
+    roll = rng.random()
+    if roll < 0.6:
+        return rng.randrange(0, 3001, 50)
+    return rng.choice([None, "", " ", "1500", " 900 ", "12.5", 12.5, "abc", -100, "-5", "1e3", "1_000", "0x10",
+                       "12.", ".5", True])
+
+
+def random_slot(rng):
+    start = rng.randint(0, 23)
+    start_text = rng.choice([f"{start:02d}:00"] * 6 + [f"{start:02d}:30", f"{start}:00", None])
+    end = start * 60 + rng.choice([60, 60, 60, 90, 120, 180, 0, -60])
+    # Mostly the documented field names; "day"/"time" must be ignored
+    slot = {
+        rng.choice(["dayType"] * 5 + ["day"]): rng.choice(["weekday", "weekday", "weekend", "weekend", "holiday", None]),
+        rng.choice(["startTime"] * 5 + ["time"]): start_text,
+        "endTime": f"{end // 60:02d}:{end % 60:02d}" if 0 <= end <= 24 * 60 else rng.choice(["", "24:30"]),
+    }
+    if rng.random() < 0.7:
+        slot["price"] = random_price(rng)
+    return slot
+
+
+def random_turf(rng, index):
+    turf = {"turfId": f"check-{index}", "createdAt": "2025-01-01T00:00:00Z"}
+    if rng.random() < 0.8:
+        turf["operatingHours"] = {"opening": random_time(rng), "closing": random_time(rng)}
+    if rng.random() < 0.85:
+        pricing = {}
+        for day_type in DAY_TYPES:
+            for band, _, _ in BANDS:
+                if rng.random() < 0.6:
+                    pricing[day_type + band] = random_price(rng)
+        if rng.random() < 0.8:
+            pricing["basePrice"] = random_price(rng)
+        turf["pricing"] = pricing
+    else:
+        turf["pricePerHour"] = random_price(rng)
+    roll = rng.random()
+    if roll < 0.5:
+        slots = [random_slot(rng) for _ in range(rng.randint(1, 10))]
+        if slots and rng.random() < 0.3:
+            slots.append(dict(slots[0], price=random_price(rng)))  # duplicate start
+        if rng.random() < 0.1:
+            slots.insert(0, None)
+        turf["customSlots"] = slots
+    elif roll < 0.55:
+        turf["customSlots"] = rng.choice([None, [], "weekday 06:00-07:00"])
+    return turf
+
+
+def random_case(rng, turf_index):
+    day = Date(2024, 1, 1) + timedelta(days=rng.randint(0, 4 * 365))
+    date = day.isoformat()
+    current_time = None
+    if rng.random() < 0.3:
+        current_time = datetime(day.year, day.month, day.day, rng.randint(0, 23), rng.choice([0, 0, 30, 59]))
+    booked = sorted(hour for hour in range(24) if rng.random() < 0.2)
+    return {"turf": turf_index, "date": date, "booked": booked,
+            "currentTime": current_time.isoformat() if current_time else None}
+
+
+def compare(name, turfs, cases, expected, actual, show):
+    mismatches = [index for index, (want, got) in enumerate(zip(expected, actual)) if want != got]
+    if len(actual) != len(expected):
+        mismatches.append(len(expected))
+    print(f"{'✅' if not mismatches else '❌'} {name}: {len(cases) - len(mismatches)}/{len(cases)} dates match")
+    for index in mismatches[:show]:
+        if index >= len(cases):
+            print(f"   returned {len(actual)} results for {len(cases)} cases")
+            continue
+        case = cases[index]
+        print(f"   turf {json.dumps(turfs[case['turf']])}")
+        print(f"   date {case['date']} booked {case['booked']} now {case['currentTime']}")
+        print(f"   expected {json.dumps(expected[index])}")
+        print(f"   actual   {json.dumps(actual[index])}")
+    return not mismatches
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Check the slot engine against a reference model")
+    parser.add_argument("--turfs", type=int, default=2000, help="random turf schedules")
+    parser.add_argument("--dates", type=int, default=4, help="random dates stamped per schedule")
+    parser.add_argument("--seed", type=int, default=None, help="random seed (default: random)")
+    parser.add_argument("--show", type=int, default=3, help="mismatches printed per engine")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+    rng = random.Random(seed)
+    turfs = [random_turf(rng, index) for index in range(args.turfs)]
+    cases = [random_case(rng, index) for index in range(args.turfs) for _ in range(args.dates)]
+    print(f"🎲 seed {seed}: {len(turfs)} schedules, {len(cases)} dates")
+
+    expected = [reference_slots(turfs[case["turf"]], case["date"], set(case["booked"]),
+                                datetime.fromisoformat(case["currentTime"]) if case["currentTime"] else None)
+                for case in cases]
+    node_results = run_node(["slots"], NODE_SCRIPT, {"turfs": turfs, "cases": cases})
+    if node_results is None:
+        print("❌ node not found; install node to check lib/slots.js")
+        return 1
+    return 0 if compare("lib/slots.js", turfs, cases, expected, node_results, args.show) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
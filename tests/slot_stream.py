@@ -0,0 +1,212 @@
+"""Live slot fan-out: thousands of concurrent SSE subscriptions to one turf-day.
+
+Opens ``--subscribers`` connections to GET /slots/:turfId/stream from one
+asyncio loop, waits until every one has its snapshot, then books
+``--writes`` free slots one at a time through create-order. Each booking
+must reach every subscriber as a ``slots`` event marking the slot taken; the
+fan-out latency of a delivery is the time from sending create-order to the
+event arriving. Per booking it prints deliveries, p50/p95/max latency and
+the spread between the first and the last subscriber.
+
+A booking's hold lapses after BOOKING_HOLD_SECONDS, so against a shared
+server pick a date nobody books (the default is 90 days out)::
+
+    python -m tests.slot_stream --subscribers 2000
+    python -m tests.slot_stream --base-url https://turf-hub.example.com/api --subscribers 5000 --writes 5
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import resource
+import ssl
+import sys
+import time
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+
+from tests.http_client import ApiClient, login
+from tests.load import percentile
+
+
+class Subscriber:
+    """One SSE connection; records when each slot id was reported taken"""
+
+    def __init__(self):
+        self.ready = asyncio.Event()
+        self.snapshot = []
+        self.taken = {}  # slot id -> perf_counter() of the event
+        self.connect_seconds = None
+        self.error = None
+
+
+async def body_lines(reader, chunked):
+    """Lines of the response body, decoding chunked transfer encoding when the server uses it"""
+    buffer = b""
+    while True:
+        if chunked:
+            size = int((await reader.readline()).split(b";")[0].strip() or b"0", 16)
+            if size == 0:
+                return
+            data = await reader.readexactly(size + 2)
+            buffer += data[:-2]
+        else:
+            data = await reader.read(65536)
+            if not data:
+                return
+            buffer += data
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.rstrip(b"\r").decode()
+
+
+async def subscribe(subscriber, url, connect_slots):
+    parts = urlsplit(url)
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    started = time.perf_counter()
+    try:
+        async with connect_slots:
+            reader, writer = await asyncio.open_connection(
+                parts.hostname, port, ssl=ssl.create_default_context() if parts.scheme == "https" else None,
+                limit=1 << 20)
+            writer.write((f"GET {parts.path}?{parts.query} HTTP/1.1\r\nHost: {parts.netloc}\r\n"
+                          "Accept: text/event-stream\r\nCache-Control: no-cache\r\n\r\n").encode())
+            await writer.drain()
+            status = (await reader.readline()).decode()
+            headers = {}
+            while (line := (await reader.readline()).decode().strip()):
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+        if " 200 " not in status:
+            raise RuntimeError(status.strip())
+    except Exception as exc:  # reported in the summary rather than aborting the run
+        subscriber.error = str(exc) or type(exc).__name__
+        subscriber.ready.set()
+        return
+
+    event, data = None, []
+    try:
+        async for line in body_lines(reader, headers.get("transfer-encoding") == "chunked"):
+            if line.startswith("event:"):
+                event = line[6:].strip()
+            elif line.startswith("data:"):
+                data.append(line[5:].strip())
+            elif not line:
+                if event and data:
+                    payload = json.loads("\n".join(data))
+                    if event == "snapshot":
+                        subscriber.snapshot = payload["slots"]
+                        subscriber.connect_seconds = time.perf_counter() - started
+                        subscriber.ready.set()
+                    elif event == "slots":
+                        received = time.perf_counter()
+                        for slot in payload["slots"]:
+                            if not slot["available"]:
+                                subscriber.taken.setdefault(slot["id"], received)
+                event, data = None, []
+    except (asyncio.CancelledError, ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+        subscriber.ready.set()
+
+
+def raise_file_limit(connections):
+    """Each subscription holds a socket; lift the soft fd limit if needed"""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = connections + 256
+    if soft < wanted:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(wanted, hard), hard))
+
+
+async def run(args, base_url):
+    client = ApiClient(base_url, retries=0, keep_timings=False)
+    loop = asyncio.get_running_loop()
+    mobile = f"7{random.randrange(10 ** 9):09d}"
+    token = await loop.run_in_executor(None, login, client, "/auth", mobile)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    url = f"{client.base_url}/slots/{args.turf}/stream?date={args.date}"
+    connect_slots = asyncio.Semaphore(args.connect_concurrency)
+    subscribers = [Subscriber() for _ in range(args.subscribers)]
+    started = time.perf_counter()
+    tasks = [asyncio.create_task(subscribe(subscriber, url, connect_slots)) for subscriber in subscribers]
+    await asyncio.wait_for(asyncio.gather(*(s.ready.wait() for s in subscribers)), args.timeout * 6)
+    connected = [s for s in subscribers if s.connect_seconds is not None and not s.error]
+    connect_times = sorted(s.connect_seconds for s in connected)
+    print(f"🔌 {len(connected)}/{len(subscribers)} subscribed in {time.perf_counter() - started:.2f} s "
+          f"(connect+snapshot p50 {percentile(connect_times, 50) * 1000:.1f} ms, "
+          f"p95 {percentile(connect_times, 95) * 1000:.1f} ms)")
+    errors = sorted({s.error for s in subscribers if s.error})
+    if errors:
+        print(f"   ⚠️ {len(subscribers) - len(connected)} failed: {'; '.join(errors[:3])}")
+
+    results = []
+    free = [slot for slot in (connected[0].snapshot if connected else []) if slot["available"]]
+    for slot in free[:args.writes]:
+        sent = time.perf_counter()
+        order = {"turfId": args.turf, "slots": [{"slotId": slot["id"], "date": args.date}],
+                 "amount": slot["price"]}
+        response = await loop.run_in_executor(
+            None, lambda: client.post("/payment/create-order", json=order, headers=headers))
+        if response.status_code != 200:
+            print(f"   ⚠️ create-order for {slot['id']} returned {response.status_code}: {response.text[:120]}")
+            continue
+        deadline = time.perf_counter() + args.timeout
+        while time.perf_counter() < deadline and any(slot["id"] not in s.taken for s in connected):
+            await asyncio.sleep(0.01)
+        arrivals = sorted(s.taken[slot["id"]] - sent for s in connected if slot["id"] in s.taken)
+        results.append((slot["id"], len(arrivals), arrivals))
+        await asyncio.sleep(args.pause)
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    client.close()
+    return len(connected), results
+
+
+def print_results(connected, results):
+    print(f"\n{'Slot':<26}{'delivered':>12}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'spread ms':>11}")
+    print("-" * 79)
+    for slot_id, delivered, arrivals in results:
+        if arrivals:
+            print(f"{slot_id:<26}{f'{delivered}/{connected}':>12}{percentile(arrivals, 50) * 1000:>10.1f}"
+                  f"{percentile(arrivals, 95) * 1000:>10.1f}{arrivals[-1] * 1000:>10.1f}"
+                  f"{(arrivals[-1] - arrivals[0]) * 1000:>11.1f}")
+        else:
+            print(f"{slot_id:<26}{f'0/{connected}':>12}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Measure live slot fan-out to many SSE subscribers")
+    parser.add_argument("--base-url", default=None, help="API base URL (default: TURFHUB_BASE_URL)")
+    parser.add_argument("--subscribers", type=int, default=1000, help="concurrent stream subscriptions")
+    parser.add_argument("--writes", type=int, default=3, help="slots booked while everyone listens")
+    parser.add_argument("--turf", default="turf-001", help="turf id to watch and book")
+    parser.add_argument("--date", default=(datetime.now() + timedelta(days=90)).strftime("%Y-%m-%d"),
+                        help="date to watch and book (YYYY-MM-DD)")
+    parser.add_argument("--connect-concurrency", type=int, default=200, help="connections opened at once")
+    parser.add_argument("--timeout", type=float, default=10.0, help="seconds to wait for each fan-out")
+    parser.add_argument("--pause", type=float, default=0.2, help="seconds between bookings")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    raise_file_limit(args.subscribers)
+    print(f"🚀 {args.subscribers} subscribers to {args.turf} on {args.date}")
+    connected, results = asyncio.run(run(args, args.base_url))
+
+    print_results(connected, results)
+    missed = sum(connected - delivered for _, delivered, _ in results)
+    if not connected or not results or missed:
+        print(f"\n❌ {missed} deliveries missing" if results else "\n❌ Nothing was booked")
+        return 1
+    print(f"\n🎉 Every booking reached all {connected} subscribers")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+"""Soak test for expiring booking holds.
+
+Creates thousands of create-order holds that are never paid for, checks the
+slots show as booked, then waits for the holds to lapse and checks every
+slot is bookable again within the hold window plus a grace period. With
+database access it also checks the reaper marked every hold ``expired``, and
+when RAZORPAY_KEY_SECRET is set, that a payment for a reaped hold is kept
+for a refund::
+
+    python -m tests.soak --orders 2000 --hold-seconds 30 --reaper-interval 1
+    python -m tests.soak --orders 2000 --hold-seconds 600 --reaper-interval 30 --check-db
+
+``--hold-seconds``/``--reaper-interval`` must match the server's
+BOOKING_HOLD_SECONDS/HOLD_REAPER_INTERVAL_SECONDS.
+"""
+
+import argparse
+import hashlib
+import hmac
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from tests.http_client import ApiClient, login
+
+# Mock turfs and their flat hourly prices; create-order rejects any other amount
+TURF_PRICES = {"turf-001": 1500, "turf-002": 2000, "turf-003": 1200,
+               "turf-004": 1800, "turf-005": 2200, "turf-006": 1000}
+HOURS = range(6, 23)
+RANGE_DAYS = 14  # the range endpoint's per-request maximum
+
+
+def plan_slots(orders, start):
+    """``orders`` distinct (turfId, date, slotId), spread over the mock turfs from ``start``"""
+    days = math.ceil(orders / (len(TURF_PRICES) * len(HOURS)))
+    slots = []
+    for offset in range(days):
+        date = (start + timedelta(days=offset)).strftime("%Y-%m-%d")
+        for turf_id in TURF_PRICES:
+            slots.extend((turf_id, date, f"slot-{date}-{hour}") for hour in HOURS)
+    return slots[:orders]
+
+
+def parse_expiry(value):
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def place_holds(client, tokens, slots, concurrency):
+    """(status, expiresAt) for one single-slot create-order per slot"""
+    def hold(index):
+        turf_id, date, slot_id = slots[index]
+        headers = {"Authorization": f"Bearer {tokens[index % len(tokens)]}"}
+        order = {"turfId": turf_id, "slots": [{"slotId": slot_id, "date": date}], "amount": TURF_PRICES[turf_id]}
+        response = client.post("/payment/create-order", json=order, headers=headers)
+        if response.status_code != 200:
+            return response.status_code, None
+        return 200, parse_expiry(response.json()["expiresAt"])
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(hold, range(len(slots))))
+
+
+def booked_slots(client, slots):
+    """The subset of ``slots`` the range endpoint currently reports as unavailable"""
+    wanted = {slot_id for _, _, slot_id in slots}
+    dates = sorted({date for _, date, _ in slots})
+    booked = set()
+    for turf_id in sorted({turf_id for turf_id, _, _ in slots}):
+        for chunk in range(0, len(dates), RANGE_DAYS):
+            response = client.get(f"/slots/{turf_id}/range?from={dates[chunk]}&days={RANGE_DAYS}",
+                                  endpoint="GET /slots/:turfId/range")
+            response.raise_for_status()
+            for day in response.json()["days"]:
+                booked.update((turf_id, s["id"]) for s in day["slots"] if not s["available"] and s["id"] in wanted)
+    return {slot for slot in slots if (slot[0], slot[2]) in booked}
+
+
+def wait_for_release(client, slots, deadline, poll=1.0):
+    """Seconds until every slot is free again, or None if ``deadline`` passes first"""
+    start = time.monotonic()
+    while True:
+        remaining = booked_slots(client, slots)
+        if not remaining:
+            return time.monotonic() - start
+        if time.monotonic() >= deadline:
+            print(f"   still booked: {len(remaining)} slot(s), e.g. {sorted(remaining)[:3]}")
+            return None
+        time.sleep(poll)
+
+
+def wait_for_reaper(db, slots, deadline, poll=1.0):
+    """True once no soak booking is still an active pending hold"""
+    query = {"status": "pending", "active": True, "slotId": {"$in": [slot_id for _, _, slot_id in slots]}}
+    while db.bookings.count_documents(query):
+        if time.monotonic() >= deadline:
+            print(f"   {db.bookings.count_documents(query)} hold(s) not reaped yet")
+            return False
+        time.sleep(poll)
+    return True
+
+
+def payment_signer(key_secret):
+    """Razorpay's checkout signature for (order id, payment id), or None without the key secret"""
+    if not key_secret:
+        return None
+    return lambda order_id, payment_id: hmac.new(
+        key_secret.encode(), f"{order_id}|{payment_id}".encode(), hashlib.sha256).hexdigest()
+
+
+def pay_late(client, db, token, slot, sign_payment):
+    """Verify a payment for a reaped hold; True if it got a 409 and was recorded for a refund"""
+    booking = db.bookings.find_one({"slotId": slot[2], "status": "expired"})
+    if booking is None:
+        print(f"   no expired booking for {slot[2]}")
+        return False
+    payment_id = f"pay_late_{booking['bookingId'][:8]}"
+    response = client.post("/payment/verify", json={
+        "razorpay_order_id": booking["orderId"],
+        "razorpay_payment_id": payment_id,
+        "razorpay_signature": sign_payment(booking["orderId"], payment_id),
+        "bookingIds": [booking["bookingId"]],
+    }, headers={"Authorization": f"Bearer {token}"})
+    if response.status_code != 409:
+        print(f"   late payment answered {response.status_code}, expected 409")
+        return False
+    stored = db.bookings.find_one({"bookingId": booking["bookingId"]})
+    return (stored["paymentId"] == payment_id and stored.get("paidAfterExpiry") is True
+            and "expiredAt" not in stored)
+
+
+def run_soak(client, db, args, sign_payment=None):
+    start = datetime.now() + timedelta(days=random.randint(400, 700))
+    slots = plan_slots(args.orders, start)
+    tokens = [login(client, "/auth", f"94{index:08d}") for index in range(args.customers)]
+
+    print(f"🛒 Placing {len(slots)} abandoned holds ({args.concurrency} at a time)...")
+    began = time.monotonic()
+    results = place_holds(client, tokens, slots, args.concurrency)
+    statuses = [status for status, _ in results]
+    expiries = {slot: expires for slot, (status, expires) in zip(slots, results) if status == 200}
+    print(f"   {len(expiries)} held, {statuses.count(409)} conflicts, "
+          f"{len(statuses) - len(expiries) - statuses.count(409)} errors in {time.monotonic() - began:.1f}s")
+    if len(expiries) != len(slots):
+        print("❌ Every planned slot should have been held")
+        return False
+    held = list(expiries)
+
+    # Holds that lapse while the check runs may already read as free
+    checked_at = datetime.now(timezone.utc) + timedelta(seconds=5)
+    live = [slot for slot in held if expiries[slot] > checked_at]
+    booked = booked_slots(client, live)
+    if len(booked) != len(live):
+        print(f"❌ Only {len(booked)}/{len(live)} live holds show as booked")
+        return False
+    print(f"✅ {len(live)} live holds show as booked")
+
+    # Reads ignore lapsed holds, so every slot should be free soon after the last expiry
+    last_expiry = max(expiries.values())
+    wait = max((last_expiry - datetime.now(timezone.utc)).total_seconds(), 0)
+    deadline = time.monotonic() + wait + args.grace
+    if wait:
+        time.sleep(wait)
+    released_in = wait_for_release(client, held, deadline)
+    if released_in is None:
+        print(f"❌ Slots not released within {args.grace:.0f}s of their holds expiring")
+        return False
+    print(f"✅ All {len(held)} slots bookable again {released_in:.1f}s after the last hold expired")
+
+    if db is not None:
+        if not wait_for_reaper(db, held, deadline + args.reaper_interval):
+            print("❌ Reaper did not expire every abandoned hold")
+            return False
+        print("✅ Reaper marked every abandoned hold expired")
+        if sign_payment:
+            owner = tokens[1 % len(tokens)]
+            if len(held) < 2 or not pay_late(client, db, owner, held[1], sign_payment):
+                print("❌ A payment for a reaped hold was not recorded for a refund")
+                return False
+            print("✅ A payment for a reaped hold answers 409 and is kept for a refund")
+
+    turf_id, date, slot_id = held[0]
+    order = {"turfId": turf_id, "slots": [{"slotId": slot_id, "date": date}], "amount": TURF_PRICES[turf_id]}
+    response = client.post("/payment/create-order", json=order, headers={"Authorization": f"Bearer {tokens[0]}"})
+    if response.status_code != 200:
+        print(f"❌ Released slot could not be booked again: {response.status_code} {response.text}")
+        return False
+    print("✅ A released slot can be held again")
+    return True
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Soak-test expiring booking holds")
+    parser.add_argument("--base-url", default=None, help="API base URL (default: TURFHUB_BASE_URL)")
+    parser.add_argument("--orders", type=int, default=2000, help="abandoned create-order calls")
+    parser.add_argument("--customers", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--hold-seconds", type=float, default=30.0, help="server BOOKING_HOLD_SECONDS")
+    parser.add_argument("--reaper-interval", type=float, default=1.0, help="server HOLD_REAPER_INTERVAL_SECONDS")
+    parser.add_argument("--grace", type=float, default=10.0, help="extra seconds allowed past each deadline")
+    parser.add_argument("--check-db", action="store_true", help="also check the reaper through MONGO_URL")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    mongo_client = db = None
+    if args.check_db:
+        from tests.seed import connect
+        mongo_client, db = connect()
+
+    client = ApiClient(args.base_url, pool_size=args.concurrency, retries=0, keep_timings=True)
+    try:
+        print(f"🚀 Soak-testing booking holds on {client.base_url}")
+        success = run_soak(client, db, args, payment_signer(os.getenv("RAZORPAY_KEY_SECRET")))
+        client.print_timings()
+    finally:
+        client.close()
+        if mongo_client:
+            mongo_client.close()
+    print("\n🎉 HOLDS EXPIRE AS CONFIGURED" if success else "\n⚠️  SOAK TEST FAILED")
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
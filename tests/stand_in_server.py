@@ -0,0 +1,1069 @@
+"""In-process stand-in for the TurfHub /api routes the test scripts use.
+
+Serves the request/response contract of app/api/[[...path]]/route.js for
+auth, profile, vendor, turf, slot, city, payment and booking routes on top of
+an in-memory, pymongo-shaped store and a fake Razorpay, so the suites and the
+load mode can run on one machine with no network access. It models what the
+routes answer, not how route.js gets there: nothing is cached, availability
+is read from the bookings and slots follow the reference model in
+tests/slot_check.py. The lib/*.js internals are checked by tests/lib_check.py.
+
+Run it on its own for load tests from another process::
+
+    python -m tests.stand_in_server --port 8001
+
+or start it in-process from a script with ``StandInServer().start()``.
+"""
+
+import argparse
+import base64
+import copy
+import hashlib
+import hmac
+import itertools
+import json
+import os
+import re
+import secrets
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlsplit
+
+from tests.slot_check import ref_minutes, ref_price, reference_slots
+
+JWT_SECRET = os.getenv("JWT_SECRET", "turfhub_secret_key_2025")
+RAZORPAY_KEY_SECRET = os.getenv("RAZORPAY_KEY_SECRET", "stand_in_razorpay_secret")
+BOOKING_HOLD_SECONDS = float(os.getenv("BOOKING_HOLD_SECONDS", "600"))
+OTP = "123456"
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+CARD_AMENITIES = 3
+TURF_SORT_KEYS = {"price": "pricePerHour", "rating": "rating"}
+
+MOCK_TURFS = [
+    {
+        "id": "turf-001",
+        "name": "PlayGround Arena",
+        "city": "Mumbai",
+        "location": "Andheri West",
+        "pricePerHour": 1500,
+        "images": [
+            "https://images.unsplash.com/photo-1529900748604-07564a03e7a6?w=800",
+            "https://images.unsplash.com/photo-1551958219-acbc608c6377?w=800",
+            "https://images.unsplash.com/photo-1624880357913-a8539238245b?w=800"
+        ],
+        "amenities": ["Floodlights", "Parking", "Changing Room", "Washroom"],
+        "rating": 4.5,
+        "surface": "Artificial Grass"
+    },
+    {
+        "id": "turf-002",
+        "name": "Champions Turf",
+        "city": "Mumbai",
+        "location": "Bandra East",
+        "pricePerHour": 2000,
+        "images": [
+            "https://images.unsplash.com/photo-1577223625816-7546f8977065?w=800",
+            "https://images.unsplash.com/photo-1459865264687-595d652de67e?w=800",
+            "https://images.unsplash.com/photo-1543326727-cf6c39e8f84c?w=800"
+        ],
+        "amenities": ["Floodlights", "Parking", "Changing Room", "Cafeteria", "First Aid"],
+        "rating": 4.8,
+        "surface": "Natural Grass"
+    },
+    {
+        "id": "turf-003",
+        "name": "Sports Hub",
+        "city": "Delhi",
+        "location": "Dwarka",
+        "pricePerHour": 1200,
+        "images": [
+            "https://images.unsplash.com/photo-1487466365202-1afdb86c764e?w=800",
+            "https://images.unsplash.com/photo-1560272564-c83b66b1ad12?w=800",
+            "https://images.unsplash.com/photo-1574629810360-7efbbe195018?w=800"
+        ],
+        "amenities": ["Floodlights", "Parking", "Washroom"],
+        "rating": 4.3,
+        "surface": "Artificial Grass"
+    },
+    {
+        "id": "turf-004",
+        "name": "Victory Ground",
+        "city": "Bangalore",
+        "location": "Koramangala",
+        "pricePerHour": 1800,
+        "images": [
+            "https://images.unsplash.com/photo-1431324155629-1a6deb1dec8d?w=800",
+            "https://images.unsplash.com/photo-1489944440615-453fc2b6a9a9?w=800",
+            "https://images.unsplash.com/photo-1518604666860-9ed391f76460?w=800"
+        ],
+        "amenities": ["Floodlights", "Parking", "Changing Room", "Washroom", "Cafeteria"],
+        "rating": 4.6,
+        "surface": "Hybrid Grass"
+    },
+    {
+        "id": "turf-005",
+        "name": "Elite Sports Arena",
+        "city": "Bangalore",
+        "location": "Whitefield",
+        "pricePerHour": 2200,
+        "images": [
+            "https://images.unsplash.com/photo-1522778119026-d647f0596c20?w=800",
+            "https://images.unsplash.com/photo-1575361204480-aadea25e6e68?w=800",
+            "https://images.unsplash.com/photo-1486286701208-1d58e9338013?w=800"
+        ],
+        "amenities": ["Floodlights", "Parking", "Changing Room", "Washroom", "Cafeteria", "Pro Shop"],
+        "rating": 4.9,
+        "surface": "Premium Artificial Grass"
+    },
+    {
+        "id": "turf-006",
+        "name": "Goal Kick Arena",
+        "city": "Delhi",
+        "location": "Rohini",
+        "pricePerHour": 1000,
+        "images": [
+            "https://images.unsplash.com/photo-1508098682722-e99c43a406b2?w=800",
+            "https://images.unsplash.com/photo-1556056504-5c7696c4c28d?w=800",
+            "https://images.unsplash.com/photo-1574680096145-d05b474e2155?w=800"
+        ],
+        "amenities": ["Floodlights", "Parking", "Washroom"],
+        "rating": 4.1,
+        "surface": "Artificial Grass"
+    }
+]
+
+
+# ---------------------------------------------------------------------------
+# In-memory store
+# ---------------------------------------------------------------------------
+
+_id_counter = itertools.count(1)
+
+
+def new_object_id():
+    """24-hex id that sorts by creation order, like a Mongo ObjectId"""
+    return f"{int(time.time()):08x}{next(_id_counter):016x}"
+
+
+def _get_field(doc, key):
+    value = doc
+    for part in key.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+def _compare(value, op, arg):
+    if value is None or arg is None:
+        return False
+    try:
+        if op == "$lt":
+            return value < arg
+        if op == "$lte":
+            return value <= arg
+        if op == "$gt":
+            return value > arg
+        return value >= arg
+    except TypeError:
+        return False
+
+
+def _match_value(value, cond):
+    if isinstance(cond, dict) and cond and all(key.startswith("$") for key in cond):
+        for op, arg in cond.items():
+            if op == "$in":
+                ok = value in arg or (isinstance(value, list) and any(v in arg for v in value))
+            elif op == "$nin":
+                ok = not _match_value(value, {"$in": arg})
+            elif op == "$ne":
+                ok = not _match_value(value, arg)
+            elif op in ("$lt", "$lte", "$gt", "$gte"):
+                ok = _compare(value, op, arg)
+            elif op == "$exists":
+                ok = (value is not None) == bool(arg)
+            elif op == "$regex":
+                ok = isinstance(value, str) and re.search(arg, value) is not None
+            else:
+                raise ValueError(f"Unsupported query operator {op}")
+            if not ok:
+                return False
+        return True
+    if isinstance(value, list) and not isinstance(cond, list):
+        return cond in value
+    return value == cond
+
+
+def matches(doc, query):
+    """Evaluate the subset of the Mongo query language the stand-in and tests use"""
+    for key, cond in (query or {}).items():
+        if key == "$or":
+            if not any(matches(doc, sub) for sub in cond):
+                return False
+        elif key == "$and":
+            if not all(matches(doc, sub) for sub in cond):
+                return False
+        elif not _match_value(_get_field(doc, key), cond):
+            return False
+    return True
+
+
+def _set_field(doc, key, value):
+    parts = key.split(".")
+    for part in parts[:-1]:
+        doc = doc.setdefault(part, {})
+    doc[parts[-1]] = value
+
+
+def _unset_field(doc, key):
+    parts = key.split(".")
+    for part in parts[:-1]:
+        doc = doc.get(part)
+        if not isinstance(doc, dict):
+            return
+    doc.pop(parts[-1], None)
+
+
+def apply_update(doc, update, inserting=False):
+    for op, fields in update.items():
+        for key, value in fields.items():
+            if op == "$set" or (op == "$setOnInsert" and inserting):
+                _set_field(doc, key, copy.deepcopy(value))
+            elif op == "$unset":
+                _unset_field(doc, key)
+            elif op == "$inc":
+                _set_field(doc, key, (_get_field(doc, key) or 0) + value)
+            elif op != "$setOnInsert":
+                raise ValueError(f"Unsupported update operator {op}")
+
+
+class DuplicateKeyError(Exception):
+    """Raised like pymongo's when an insert violates a unique index"""
+    code = 11000
+
+
+class BulkWriteError(Exception):
+    """Raised by insert_many like pymongo's; ``details["writeErrors"]`` lists the failed indexes"""
+
+    def __init__(self, details):
+        super().__init__(f"{len(details['writeErrors'])} write error(s)")
+        self.details = details
+
+
+class InMemoryCollection:
+    """Thread-safe list of documents with a pymongo-shaped API"""
+
+    def __init__(self, name, lock):
+        self.name = name
+        self.lock = lock
+        self.docs = []
+        self.unique_indexes = []  # (keys, partial filter)
+
+    def _insert(self, doc):
+        doc.setdefault("_id", new_object_id())
+        with self.lock:
+            for keys, partial in self.unique_indexes:
+                if matches(doc, partial) and any(
+                        matches(other, partial) and all(_get_field(other, key) == _get_field(doc, key) for key in keys)
+                        for other in self.docs):
+                    raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name}")
+            self.docs.append(copy.deepcopy(doc))
+        return doc["_id"]
+
+    def insert_one(self, doc):
+        return SimpleNamespace(inserted_id=self._insert(doc))
+
+    def insert_many(self, docs, ordered=True):
+        ids, errors = [], []
+        for index, doc in enumerate(docs):
+            try:
+                ids.append(self._insert(doc))
+            except DuplicateKeyError as exc:
+                errors.append({"index": index, "code": exc.code, "errmsg": str(exc)})
+                if ordered:
+                    break
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(ids)})
+        return SimpleNamespace(inserted_ids=ids)
+
+    def find(self, query=None, sort=None, limit=0):
+        """Matching documents as a list; ``sort`` is a list of (field, direction)"""
+        with self.lock:
+            found = [copy.deepcopy(doc) for doc in self.docs if matches(doc, query)]
+        for key, direction in reversed(sort or []):
+            found.sort(key=lambda d: (_get_field(d, key) is not None, _get_field(d, key) or 0),
+                       reverse=direction < 0)
+        return found[:limit] if limit else found
+
+    def find_one(self, query=None):
+        with self.lock:
+            for doc in self.docs:
+                if matches(doc, query):
+                    return copy.deepcopy(doc)
+        return None
+
+    def count_documents(self, query):
+        with self.lock:
+            return sum(1 for doc in self.docs if matches(doc, query))
+
+    def _update(self, query, update, many, upsert):
+        matched = 0
+        with self.lock:
+            for doc in self.docs:
+                if matches(doc, query):
+                    apply_update(doc, update)
+                    matched += 1
+                    if not many:
+                        break
+            if matched or not upsert:
+                return SimpleNamespace(matched_count=matched, modified_count=matched, upserted_id=None)
+            doc = {k: v for k, v in query.items() if not k.startswith("$") and not isinstance(v, dict)}
+            apply_update(doc, update, inserting=True)
+            doc.setdefault("_id", new_object_id())
+            self.docs.append(doc)
+            return SimpleNamespace(matched_count=0, modified_count=0, upserted_id=doc["_id"])
+
+    def update_one(self, query, update, upsert=False):
+        return self._update(query, update, many=False, upsert=upsert)
+
+    def update_many(self, query, update, upsert=False):
+        return self._update(query, update, many=True, upsert=upsert)
+
+    def delete_many(self, query):
+        with self.lock:
+            kept = [doc for doc in self.docs if not matches(doc, query)]
+            deleted = len(self.docs) - len(kept)
+            self.docs = kept
+        return SimpleNamespace(deleted_count=deleted)
+
+    def create_index(self, keys, **kwargs):
+        """Unique (optionally partial) indexes are enforced on insert; others are a no-op"""
+        if kwargs.get("unique") and isinstance(keys, list):
+            with self.lock:
+                self.unique_indexes.append(([key for key, _ in keys], kwargs.get("partialFilterExpression") or {}))
+        if kwargs.get("name"):
+            return kwargs["name"]
+        return "_".join(f"{key}_{direction}" for key, direction in keys) if isinstance(keys, list) else f"{keys}_1"
+
+
+class InMemoryStore:
+    """Collections are created on first access, as with ``MongoClient()[db]``"""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.collections = {}
+
+    def __getitem__(self, name):
+        with self.lock:
+            if name not in self.collections:
+                self.collections[name] = InMemoryCollection(name, self.lock)
+            return self.collections[name]
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+
+# ---------------------------------------------------------------------------
+# JWT and Razorpay fakes
+# ---------------------------------------------------------------------------
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def sign_jwt(payload, secret=JWT_SECRET, expires_in=30 * 24 * 3600):
+    now = int(time.time())
+    header = _b64encode(json.dumps({"alg": "HS256", "typ": "JWT"}, separators=(",", ":")).encode())
+    body = _b64encode(json.dumps({**payload, "iat": now, "exp": now + expires_in}, separators=(",", ":")).encode())
+    signature = hmac.new(secret.encode(), f"{header}.{body}".encode(), hashlib.sha256).digest()
+    return f"{header}.{body}.{_b64encode(signature)}"
+
+
+def verify_jwt(token, secret=JWT_SECRET):
+    try:
+        header, body, signature = token.split(".")
+        expected = hmac.new(secret.encode(), f"{header}.{body}".encode(), hashlib.sha256).digest()
+        if not hmac.compare_digest(expected, _b64decode(signature)):
+            return None
+        claims = json.loads(_b64decode(body))
+    except ValueError:
+        return None
+    if claims.get("exp", 0) <= time.time():
+        return None
+    return claims
+
+
+class FakeRazorpay:
+    """Order ids and payment signatures shaped like Razorpay's"""
+
+    def __init__(self, key_secret=RAZORPAY_KEY_SECRET):
+        self.key_secret = key_secret
+
+    def create_order(self, amount, currency, receipt, notes):
+        return {
+            "id": f"order_{secrets.token_hex(7)}",
+            "entity": "order",
+            "amount": amount,
+            "currency": currency,
+            "receipt": receipt,
+            "notes": notes,
+            "status": "created",
+        }
+
+    def sign_payment(self, order_id, payment_id):
+        message = f"{order_id}|{payment_id}".encode()
+        return hmac.new(self.key_secret.encode(), message, hashlib.sha256).hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# API handlers
+# ---------------------------------------------------------------------------
+
+class Request:
+    def __init__(self, method, path, query, headers, body):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        return json.loads(self.body or b"null")
+
+
+def respond(body, status=200, headers=None):
+    return status, body, headers or {}
+
+
+def error(message, status):
+    return respond({"error": message}, status)
+
+
+def now():
+    return datetime.now(timezone.utc)
+
+
+def encode_cursor(doc):
+    """Opaque keyset token for (createdAt, _id)"""
+    payload = json.dumps({"c": doc["createdAt"].isoformat(), "i": doc["_id"]})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        return datetime.fromisoformat(payload["c"]), str(payload["i"])
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def turf_card(turf):
+    """List card for a database or mock turf, the fields of turfCard() in route.js"""
+    images = turf.get("images") or []
+    return {
+        "id": turf.get("turfId") or turf.get("id"),
+        "name": turf.get("name"),
+        "city": turf.get("city"),
+        "location": turf.get("location"),
+        "pricePerHour": turf.get("pricePerHour") or (turf.get("pricing") or {}).get("basePrice") or 0,
+        "rating": turf.get("rating") or 4.5,
+        "image": images[0] if images else None,
+        "amenities": (turf.get("amenities") or [])[:CARD_AMENITIES],
+        "sportTypes": turf.get("sportTypes") or [],
+    }
+
+
+def format_turf(turf):
+    return {
+        "id": turf["turfId"],
+        "name": turf.get("name"),
+        "city": turf.get("city"),
+        "location": turf.get("location"),
+        "area": turf.get("area") or turf.get("location"),
+        "pricePerHour": (turf.get("pricing") or {}).get("basePrice") or 0,
+        "images": turf.get("images") or [],
+        "amenities": turf.get("amenities") or [],
+        "rating": turf.get("rating") or 4.5,
+        "surface": turf.get("surface") or "Artificial Grass",
+        "description": turf.get("description") or "",
+        "capacity": turf.get("capacity") or 0,
+    }
+
+
+def custom_slots_error(custom_slots):
+    """Why a turf write's customSlots are invalid, or None; see customSlotsError() in lib/slots.js"""
+    if custom_slots is None:
+        return None
+    if not isinstance(custom_slots, list):
+        return "customSlots must be a list"
+    for index, slot in enumerate(custom_slots):
+        valid = isinstance(slot, dict) and slot.get("dayType") in ("weekday", "weekend")
+        if valid:
+            start, end = ref_minutes(slot.get("startTime")), ref_minutes(slot.get("endTime"))
+            valid = start is not None and start % 60 == 0 and end == start + 60
+        if not valid or ("price" in slot and ref_price(slot["price"]) is None):
+            return (f"customSlots[{index}] must be one hour on the hour: "
+                    "{ dayType: 'weekday' | 'weekend', startTime: 'HH:00', endTime: one hour later, price }")
+    return None
+
+
+class StandInApi:
+    """Route table and handlers answering like route.js"""
+
+    def __init__(self, store, razorpay, jwt_secret=JWT_SECRET, hold_seconds=BOOKING_HOLD_SECONDS):
+        self.store = store
+        self.razorpay = razorpay
+        self.jwt_secret = jwt_secret
+        self.hold_seconds = hold_seconds
+        self.mock_turfs = {turf["id"]: turf for turf in MOCK_TURFS}
+        # A slot is held by at most one pending or confirmed booking, as in lib/reservations.js
+        self.store.bookings.create_index([("turfId", 1), ("date", 1), ("slotId", 1)], unique=True,
+                                         partialFilterExpression={"active": True}, name="active_slot_unique")
+        self.routes = []
+        for method, pattern, handler in [
+            ("GET", r"/?", self.index),
+            ("GET", r"/turfs", self.list_turfs),
+            ("GET", r"/turfs/([^/]+)", self.turf_details),
+            ("GET", r"/slots/([^/]+)", self.slots),
+            ("GET", r"/cities", self.cities),
+            ("GET", r"/bookings", self.bookings),
+            ("GET", r"/vendor/profile", self.vendor_profile),
+            ("GET", r"/vendor/turfs", self.vendor_turfs),
+            ("GET", r"/vendor/turfs/([^/]+)", self.vendor_turf),
+            ("POST", r"/auth/send-otp", self.send_otp),
+            ("POST", r"/auth/verify-otp", self.verify_otp),
+            ("POST", r"/vendor/register", self.vendor_register),
+            ("POST", r"/vendor/send-otp", self.vendor_send_otp),
+            ("POST", r"/vendor/verify-otp", self.vendor_verify_otp),
+            ("POST", r"/vendor/turfs", self.add_turf),
+            ("POST", r"/admin/turfs/approve", self.approve_turf),
+            ("POST", r"/payment/create-order", self.create_order),
+            ("POST", r"/payment/verify", self.verify_payment),
+            ("PUT", r"/profile", self.update_profile),
+            ("PUT", r"/vendor/profile", self.update_vendor_profile),
+            ("PUT", r"/vendor/turfs/([^/]+)", self.update_turf),
+        ]:
+            self.routes.append((method, re.compile(f"/api{pattern}$"), handler))
+
+    def dispatch(self, request):
+        if request.method == "DELETE":
+            return error("Method not implemented", 501)
+        for method, pattern, handler in self.routes:
+            match = pattern.match(request.path)
+            if method == request.method and match:
+                try:
+                    return handler(request, *match.groups())
+                except Exception as exc:  # route.js turns every handler error into a 500
+                    return error(str(exc), 500)
+        return error("Not found", 404)
+
+    def claims(self, request, role=None):
+        header = request.headers.get("Authorization") or ""
+        if not header.startswith("Bearer "):
+            return None
+        claims = verify_jwt(header.split(" ")[1], self.jwt_secret)
+        if claims is None or (role and claims.get("role") != role):
+            return None
+        return claims
+
+    def list_response(self, request, collection, query, key, transform=lambda docs: docs):
+        """Newest-first list; one keyset page when ``limit`` or ``cursor`` is given"""
+        newest_first = [("createdAt", -1), ("_id", -1)]
+        if "limit" not in request.query and "cursor" not in request.query:
+            return respond({key: transform(collection.find(query, sort=newest_first))})
+        try:
+            limit = int(request.query.get("limit") or DEFAULT_PAGE_SIZE)
+        except ValueError:
+            limit = DEFAULT_PAGE_SIZE
+        limit = min(max(limit, 1), MAX_PAGE_SIZE)
+        if request.query.get("cursor"):
+            after = decode_cursor(request.query["cursor"])
+            if not after:
+                return error("Invalid cursor", 400)
+            query = {"$and": [query, {"$or": [
+                {"createdAt": {"$lt": after[0]}},
+                {"createdAt": after[0], "_id": {"$lt": after[1]}},
+            ]}]}
+        docs = collection.find(query, sort=newest_first, limit=limit + 1)
+        items = docs[:limit]
+        return respond({key: transform(items), "next": encode_cursor(items[-1]) if len(docs) > limit else None})
+
+    # -- catalogue -----------------------------------------------------------
+
+    def index(self, request):
+        return respond({"message": "TurfHub API is running!"})
+
+    def list_turfs(self, request):
+        city = request.query.get("city")
+        sport = request.query.get("sport")
+        sort = request.query.get("sort")
+        order = request.query.get("order") or ("desc" if sort == "rating" else "asc")
+        if sort and sort not in TURF_SORT_KEYS:
+            return error("sort must be one of: price, rating", 400)
+        if order not in ("asc", "desc"):
+            return error("order must be asc or desc", 400)
+        active_vendor_ids = [v["vendorId"] for v in self.store.vendors.find({"isActive": True})]
+        db_turfs = self.store.turfs.find({"status": "approved", "vendorId": {"$in": active_vendor_ids}})
+        turfs = [turf_card(turf) for turf in db_turfs + MOCK_TURFS]
+        if city and city != "All":
+            turfs = [t for t in turfs if t["city"] == city]
+        if sport and sport != "All":
+            turfs = [t for t in turfs if sport in t["sportTypes"]]
+        if sort:
+            turfs.sort(key=lambda t: t[TURF_SORT_KEYS[sort]], reverse=order == "desc")
+        if request.query.get("limit"):
+            try:
+                limit = int(request.query["limit"])
+            except ValueError:
+                limit = DEFAULT_PAGE_SIZE
+            turfs = turfs[:min(max(limit, 1), MAX_PAGE_SIZE)]
+        return respond({"turfs": turfs})
+
+    def bookable_turf(self, turf_id):
+        """The approved database turf or mock turf with ``turf_id``, or None"""
+        return self.store.turfs.find_one({"turfId": turf_id, "status": "approved"}) or self.mock_turfs.get(turf_id)
+
+    def turf_details(self, request, turf_id):
+        turf = self.bookable_turf(turf_id)
+        if not turf:
+            return error("Turf not found", 404)
+        return respond({"turf": format_turf(turf) if "turfId" in turf else turf})
+
+    def slots(self, request, turf_id):
+        turf = self.bookable_turf(turf_id)
+        if not turf:
+            return error("Turf not found", 404)
+        current = datetime.now()
+        today = current.strftime("%Y-%m-%d")
+        date = request.query.get("date") or today
+        held = {
+            b["slotId"] for b in self.store.bookings.find({"turfId": turf_id, "date": date, "$or": [
+                {"status": "confirmed"}, {"status": "pending", "active": True, "expiresAt": {"$gt": now()}}
+            ]})
+        }
+        booked = {hour for hour in range(24) if f"slot-{date}-{hour}" in held}
+        return respond({"slots": reference_slots(turf, date, booked, current if date == today else None),
+                        "date": date})
+
+    def cities(self, request):
+        cities = ["All"]
+        for turf in self.store.turfs.find({"status": "approved"}) + MOCK_TURFS:
+            if turf.get("city") not in cities:
+                cities.append(turf.get("city"))
+        return respond({"cities": cities})
+
+    # -- customer --------------------------------------------------------------
+
+    def send_otp(self, request):
+        mobile = (request.json() or {}).get("mobile")
+        if not mobile or len(mobile) != 10:
+            return error("Invalid mobile number", 400)
+        return respond({"success": True, "message": "OTP sent successfully", "otp": OTP})
+
+    def verify_otp(self, request):
+        body = request.json() or {}
+        mobile = body.get("mobile")
+        if not mobile or len(mobile) != 10:
+            return error("Invalid mobile number", 400)
+        if body.get("otp") != OTP:
+            return error("Invalid OTP", 400)
+        user = self.store.users.find_one({"mobile": mobile})
+        if not user:
+            user = {"userId": str(uuid.uuid4()), "mobile": mobile, "name": "", "email": "", "dob": "",
+                    "createdAt": now()}
+            self.store.users.insert_one(user)
+        token = sign_jwt({"userId": user["userId"], "mobile": mobile}, self.jwt_secret)
+        return respond({"success": True, "token": token, "user": self.public_user(user)})
+
+    @staticmethod
+    def public_user(user):
+        return {
+            "userId": user["userId"],
+            "mobile": user["mobile"],
+            "name": user.get("name") or "",
+            "email": user.get("email") or "",
+            "dob": user.get("dob") or "",
+        }
+
+    def update_profile(self, request):
+        user = self.claims(request)
+        if not user:
+            return error("Unauthorized", 401)
+        body = request.json() or {}
+        self.store.users.update_one({"userId": user["userId"]}, {"$set": {
+            "name": body.get("name") or "",
+            "email": body.get("email") or "",
+            "dob": body.get("dob") or "",
+            "updatedAt": now(),
+        }})
+        updated = self.store.users.find_one({"userId": user["userId"]})
+        return respond({"success": True, "user": self.public_user(updated)})
+
+    def enrich_bookings(self, bookings):
+        for booking in bookings:
+            turf = self.store.turfs.find_one({"turfId": booking["turfId"]}) or self.mock_turfs.get(booking["turfId"])
+            booking["turfDetails"] = {
+                "name": turf["name"], "location": turf["location"], "city": turf["city"]
+            } if turf else None
+        return bookings
+
+    def bookings(self, request):
+        user = self.claims(request)
+        if not user:
+            return error("Unauthorized", 401)
+        return self.list_response(request, self.store.bookings, {"userId": user["userId"]}, "bookings",
+                                  self.enrich_bookings)
+
+    def expire_holds(self, query):
+        """Mark the lapsed pending holds among ``query`` expired, freeing their slots"""
+        self.store.bookings.update_many(
+            {"$and": [query, {"status": "pending", "active": True, "expiresAt": {"$lte": now()}}]},
+            {"$set": {"status": "expired", "expiredAt": now()}, "$unset": {"active": ""}})
+
+    def create_order(self, request):
+        user = self.claims(request)
+        if not user:
+            return error("Unauthorized", 401)
+        body = request.json() or {}
+        turf_id, slots, amount = body.get("turfId"), body.get("slots"), body.get("amount")
+        if not turf_id or not isinstance(slots, list) or not slots or not amount:
+            return error("Missing required fields", 400)
+        turf = self.bookable_turf(turf_id)
+        if not turf:
+            return error("Turf not found", 404)
+        prices = []
+        for slot in slots:
+            try:
+                offered = reference_slots(turf, slot.get("date"), set(), None)
+            except (AttributeError, TypeError, ValueError):
+                offered = []
+            prices.append(next((s["price"] for s in offered if s["id"] == slot.get("slotId")), None))
+        unknown = [slot.get("slotId") if isinstance(slot, dict) else None
+                   for slot, price in zip(slots, prices) if price is None]
+        if unknown:
+            return respond({"error": "Slot not offered by this turf", "unknownSlots": unknown}, 400)
+        total = sum(prices)
+        if not isinstance(amount, (int, float)) or round(amount * 100) != round(total * 100):
+            return respond({"error": "Amount does not match the slot prices", "expectedAmount": total}, 400)
+
+        created_at = now()
+        expires_at = created_at + timedelta(seconds=self.hold_seconds)
+        bookings = [{
+            "bookingId": str(uuid.uuid4()),
+            "userId": user["userId"],
+            "turfId": turf_id,
+            "slotId": slot.get("slotId"),
+            "date": slot.get("date"),
+            "amount": price,
+            "orderId": None,
+            "status": "pending",
+            "active": True,
+            "createdAt": created_at,
+            "expiresAt": expires_at,
+        } for slot, price in zip(slots, prices)]
+        booking_ids = [booking["bookingId"] for booking in bookings]
+        self.expire_holds({"$or": [
+            {"turfId": turf_id, "date": slot.get("date"), "slotId": slot.get("slotId")} for slot in slots
+        ]})
+        try:
+            self.store.bookings.insert_many(bookings, ordered=False)
+        except BulkWriteError as exc:
+            self.store.bookings.delete_many({"bookingId": {"$in": booking_ids}})
+            lost = [bookings[e["index"]]["slotId"] for e in exc.details["writeErrors"]]
+            return respond({"error": "Slot already booked", "unavailableSlots": lost}, 409)
+        order = self.razorpay.create_order(
+            round(total * 100), "INR", f"receipt_{int(time.time() * 1000)}",
+            {"turfId": turf_id, "userId": user["userId"], "slotsCount": len(slots)}
+        )
+        self.store.bookings.update_many({"bookingId": {"$in": booking_ids}}, {"$set": {"orderId": order["id"]}})
+        return respond({"orderId": order["id"], "amount": order["amount"], "currency": order["currency"],
+                        "bookingIds": booking_ids, "expiresAt": expires_at})
+
+    def verify_payment(self, request):
+        user = self.claims(request)
+        if not user:
+            return error("Unauthorized", 401)
+        body = request.json() or {}
+        expected = self.razorpay.sign_payment(body.get("razorpay_order_id"), body.get("razorpay_payment_id"))
+        if body.get("razorpay_signature") != expected:
+            return error("Invalid signature", 400)
+        booking_ids = body.get("bookingIds")
+        selector = {"$in": booking_ids} if isinstance(booking_ids, list) else booking_ids
+        self.expire_holds({"bookingId": selector})
+        update = {"$set": {"status": "confirmed", "paymentId": body.get("razorpay_payment_id"),
+                           "confirmedAt": now()}}
+        self.store.bookings.update_many({"bookingId": selector, "userId": user["userId"], "active": True}, update)
+        bookings = self.store.bookings.find({"bookingId": selector})
+        expired_ids = [booking["bookingId"] for booking in bookings if booking["status"] == "expired"]
+        if expired_ids:
+            return respond({"error": "Booking hold expired", "expiredBookingIds": expired_ids, "bookings": bookings}, 409)
+        return respond({"success": True, "bookings": bookings})
+
+    # -- vendor ----------------------------------------------------------------
+
+    def vendor_register(self, request):
+        body = request.json() or {}
+        if not all(body.get(f) for f in ("businessName", "ownerName", "mobile", "email")):
+            return error("Missing required fields", 400)
+        if self.store.vendors.find_one({"mobile": body["mobile"]}):
+            return error("Vendor already registered with this mobile", 400)
+        vendor_id = str(uuid.uuid4())
+        self.store.vendors.insert_one({
+            "vendorId": vendor_id,
+            "businessName": body["businessName"],
+            "ownerName": body["ownerName"],
+            "mobile": body["mobile"],
+            "email": body["email"],
+            "gst": body.get("gst") or "",
+            "pan": body.get("pan") or "",
+            "status": "pending",
+            "isActive": True,
+            "bankDetails": {},
+            "createdAt": now(),
+        })
+        return respond({"success": True, "message": "Registration successful! Please login with your mobile number.",
+                        "vendorId": vendor_id})
+
+    def vendor_send_otp(self, request):
+        mobile = (request.json() or {}).get("mobile")
+        if not mobile or len(mobile) != 10:
+            return error("Invalid mobile number", 400)
+        if not self.store.vendors.find_one({"mobile": mobile}):
+            return error("Vendor not registered. Please register first.", 404)
+        return respond({"success": True, "message": "OTP sent successfully", "otp": OTP})
+
+    def vendor_verify_otp(self, request):
+        body = request.json() or {}
+        mobile = body.get("mobile")
+        if not mobile or len(mobile) != 10:
+            return error("Invalid mobile number", 400)
+        if body.get("otp") != OTP:
+            return error("Invalid OTP", 400)
+        vendor = self.store.vendors.find_one({"mobile": mobile})
+        if not vendor:
+            return error("Vendor not found", 404)
+        token = sign_jwt({"vendorId": vendor["vendorId"], "mobile": mobile, "role": "vendor"}, self.jwt_secret)
+        return respond({"success": True, "token": token, "vendor": {
+            key: vendor.get(key) for key in ("vendorId", "businessName", "ownerName", "mobile", "email", "status")
+        }})
+
+    def vendor_profile(self, request):
+        vendor = self.claims(request, role="vendor")
+        if not vendor:
+            return error("Unauthorized", 401)
+        data = self.store.vendors.find_one({"vendorId": vendor["vendorId"]})
+        if not data:
+            return error("Vendor not found", 404)
+        profile = {key: data.get(key) for key in
+                   ("vendorId", "businessName", "ownerName", "mobile", "email", "gst", "pan", "status")}
+        profile["bankDetails"] = data.get("bankDetails") or {}
+        return respond({"vendor": profile})
+
+    def update_vendor_profile(self, request):
+        vendor = self.claims(request, role="vendor")
+        if not vendor:
+            return error("Unauthorized", 401)
+        body = request.json() or {}
+        update = {key: body[key] for key in ("businessName", "ownerName", "email", "gst", "pan", "bankDetails")
+                  if body.get(key)}
+        update["updatedAt"] = now()
+        self.store.vendors.update_one({"vendorId": vendor["vendorId"]}, {"$set": update})
+        data = self.store.vendors.find_one({"vendorId": vendor["vendorId"]})
+        return respond({"success": True, "vendor": {key: data.get(key) for key in
+                        ("vendorId", "businessName", "ownerName", "mobile", "email", "gst", "pan", "status")}})
+
+    def vendor_turfs(self, request):
+        vendor = self.claims(request, role="vendor")
+        if not vendor:
+            return error("Unauthorized", 401)
+        return self.list_response(request, self.store.turfs, {"vendorId": vendor["vendorId"]}, "turfs")
+
+    def vendor_turf(self, request, turf_id):
+        vendor = self.claims(request, role="vendor")
+        if not vendor:
+            return error("Unauthorized", 401)
+        turf = self.store.turfs.find_one({"turfId": turf_id, "vendorId": vendor["vendorId"]})
+        if not turf:
+            return error("Turf not found", 404)
+        return respond({"turf": turf})
+
+    def add_turf(self, request):
+        vendor = self.claims(request, role="vendor")
+        if not vendor:
+            return error("Unauthorized", 401)
+        body = request.json() or {}
+        if not all(body.get(f) for f in ("name", "location", "city", "pricing")):
+            return error("Missing required fields", 400)
+        slots_error = custom_slots_error(body.get("customSlots"))
+        if slots_error:
+            return error(slots_error, 400)
+        turf_id = str(uuid.uuid4())
+        turf = {
+            "turfId": turf_id,
+            "vendorId": vendor["vendorId"],
+            "name": body["name"],
+            "description": body.get("description") or "",
+            "location": body["location"],
+            "city": body["city"],
+            "area": body.get("area") or "",
+            "pincode": body.get("pincode") or "",
+            "sportTypes": body.get("sportTypes") or [],
+            "turfType": body.get("turfType") or "outdoor",
+            "surface": body.get("surface") or "Artificial Grass",
+            "size": body.get("size") or "",
+            "capacity": body.get("capacity") or 0,
+            "amenities": body.get("amenities") or [],
+            "pricing": body["pricing"],
+            "operatingHours": body.get("operatingHours") or {"opening": "06:00", "closing": "23:00"},
+            "customSlots": body.get("customSlots") or [],
+            "images": body.get("images") or [],
+            "policies": body.get("policies") or {},
+            "googleMapsLink": body.get("googleMapsLink") or "",
+            "rating": 0,
+            "totalBookings": 0,
+            "status": "pending",
+            "createdAt": now(),
+        }
+        self.store.turfs.insert_one(turf)
+        return respond({"success": True, "message": "Turf added successfully! It will be visible after admin approval.",
+                        "turfId": turf_id, "turf": turf})
+
+    def update_turf(self, request, turf_id):
+        vendor = self.claims(request, role="vendor")
+        if not vendor:
+            return error("Unauthorized", 401)
+        body = request.json() or {}
+        slots_error = custom_slots_error(body.get("customSlots"))
+        if slots_error:
+            return error(slots_error, 400)
+        update = {key: value for key, value in body.items() if key not in ("vendorId", "turfId", "status")}
+        update["updatedAt"] = now()
+        result = self.store.turfs.update_one({"turfId": turf_id, "vendorId": vendor["vendorId"]}, {"$set": update})
+        if result.matched_count == 0:
+            return error("Turf not found", 404)
+        return respond({"success": True, "message": "Turf updated successfully",
+                        "turf": self.store.turfs.find_one({"turfId": turf_id})})
+
+    # -- admin -----------------------------------------------------------------
+
+    def approve_turf(self, request):
+        body = request.json() or {}
+        if not body.get("turfId") or not body.get("action"):
+            return error("Missing required fields", 400)
+        status = "approved" if body["action"] == "approve" else "rejected"
+        self.store.turfs.update_one({"turfId": body["turfId"]}, {"$set": {"status": status, "updatedAt": now()}})
+        return respond({"success": True, "message": f"Turf {status}"})
+
+
+# ---------------------------------------------------------------------------
+# HTTP server
+# ---------------------------------------------------------------------------
+
+def json_default(value):
+    if isinstance(value, datetime):
+        return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.") + f"{value.microsecond // 1000:03d}Z"
+    return str(value)
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    api = None  # bound per server by StandInServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def handle_any(self):
+        url = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        status, payload, headers = self.api.dispatch(Request(self.command, url.path, query, self.headers, body))
+        data = json.dumps(payload, default=json_default).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_PUT = do_DELETE = handle_any
+
+
+class StandInHTTPServer(ThreadingHTTPServer):
+    # Room in the listen backlog for bursts of simultaneous connects (race tests, load mode)
+    request_queue_size = 1024
+
+
+class StandInServer:
+    """Threaded HTTP server serving the stand-in API on ``base_url``"""
+
+    def __init__(self, host="127.0.0.1", port=0):
+        self.store = InMemoryStore()
+        self.razorpay = FakeRazorpay()
+        self.api = StandInApi(self.store, self.razorpay)
+        handler = type("BoundStandInHandler", (StandInHandler,), {"api": self.api})
+        self.httpd = StandInHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/api"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def start_if_requested(argv=None):
+    """Start a stand-in when ``--local`` is passed or TURFHUB_LOCAL is set"""
+    argv = sys.argv[1:] if argv is None else argv
+    if "--local" not in argv and os.getenv("TURFHUB_LOCAL", "") in ("", "0"):
+        return None
+    server = StandInServer().start()
+    print(f"🧪 Using local stand-in API at {server.base_url}")
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the TurfHub stand-in API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    args = parser.parse_args()
+    server = StandInServer(args.host, args.port)
+    print(f"🧪 TurfHub stand-in API listening on {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()